@@ -0,0 +1,254 @@
+# async_transport_api.py
+# Asyncio variant of TransportAPI with a pooled HTTP client and concurrent multi-mode queries
+
+import asyncio
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+from resilience import CircuitOpenError
+from transport_api import DirectionsAPIError, Location, TransportAPI, TransportRoute, get_transport_api
+
+# Travel modes the Directions API accepts
+TRAVEL_MODES = ('transit', 'walking', 'bicycling', 'driving')
+
+# Larger route lists are ranked in a worker thread so the event loop keeps serving
+RANK_IN_THREAD_THRESHOLD = 64
+
+class AsyncTransportAPI:
+    """
+    Non-blocking front end to TransportAPI.
+
+    Directions requests go through one pooled httpx.AsyncClient (keep-alive
+    connections, bounded pool). Several travel modes are queried at once
+    and merged into a single ranked list of TransportRoute objects. Route
+    caching, parsing, mock data and ranking are shared with the wrapped
+    TransportAPI, so both variants return the same routes and warm the same
+    cache. Geocoding awaits the shared geocoder, and real-time lookups and
+    large rankings run in worker threads.
+
+    Usage:
+        async with AsyncTransportAPI() as api:
+            routes = await api.find_best_routes('Times Square', 'JFK Airport', modes=TRAVEL_MODES)
+    """
+
+    def __init__(self, api: Optional[TransportAPI] = None, max_connections: int = 20,
+                 max_keepalive_connections: int = 10, transport=None):
+        """
+        Args:
+            api: TransportAPI to share caches, parsing and fallbacks with (default: the shared one)
+            max_connections: Connection pool size
+            max_keepalive_connections: Idle connections kept open
+            transport: httpx transport to send requests through instead of the pool (e.g. httpx.MockTransport)
+        """
+        self.api = api or get_transport_api()
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.transport = transport
+        self._client = None
+        self._client_loop = None
+        self._inflight: Dict[tuple, asyncio.Task] = {}
+
+    def _get_client(self):
+        # An httpx client's connections belong to one event loop; make a new one per loop
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            import httpx
+            limits = httpx.Limits(max_connections=self.max_connections,
+                                  max_keepalive_connections=self.max_keepalive_connections)
+            self._client = httpx.AsyncClient(
+                # httpx retries only failed connects; 5xx answers go to the circuit breaker
+                transport=self.transport or httpx.AsyncHTTPTransport(limits=limits, retries=self.api.max_retries),
+                timeout=httpx.Timeout(self.api.read_timeout, connect=self.api.connect_timeout)
+            )
+            self._client_loop = loop
+            self._inflight = {}
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close the pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def __aenter__(self) -> 'AsyncTransportAPI':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def get_location_coordinates(self, location_name: str) -> Optional[Location]:
+        """Get coordinates for a location name without blocking on a geocoder miss"""
+        try:
+            return await self.api.geocoder.geocode_async(location_name)
+        except Exception as e:
+            print(f"Error getting coordinates for {location_name}: {e}")
+        return None
+
+    async def get_locations_coordinates(self, location_names: List[str]) -> Dict[str, Optional[Location]]:
+        """Get coordinates for many location names concurrently"""
+        locations = await asyncio.gather(*(self.get_location_coordinates(name) for name in location_names))
+        return dict(zip(location_names, locations))
+
+    async def _fetch_google_maps_routes(self, origin: str, destination: str, transport_mode: str,
+                                        departure_time: Optional[datetime]):
+        """Call the Directions API over the pooled client and return a RouteBatch; raises DirectionsAPIError for failed responses"""
+        response = await self._get_client().get(
+            self.api.google_maps_base_url,
+            params=self.api._directions_params(origin, destination, transport_mode, departure_time)
+        )
+
+        if response.status_code != 200:
+            raise DirectionsAPIError(f"HTTP {response.status_code}", f"HTTP_{response.status_code}")
+        return self.api._batch_from_directions_data(response.json(), transport_mode)
+
+    async def _fetch_and_cache(self, key: tuple, origin: str, destination: str, transport_mode: str,
+                               departure_time: Optional[datetime]):
+        breaker = self.api.directions_breaker
+        if not breaker.allow():
+            raise CircuitOpenError(f"{breaker.name} circuit is {breaker.stats.state}")
+        try:
+            routes = await self._fetch_google_maps_routes(origin, destination, transport_mode, departure_time)
+        except Exception as e:
+            breaker.record_failure(e)
+            raise
+        breaker.record_success()
+        self.api.route_cache.put(key, routes)
+        return routes
+
+    async def _get_routes(self, origin: str, destination: str, transport_mode: str = "transit",
+                          departure_time: Optional[datetime] = None) -> List[TransportRoute]:
+        """Cached routes for one mode; raises on failure instead of falling back to mock data"""
+        route_cache = self.api.route_cache
+        key = route_cache.key(origin, destination, transport_mode, departure_time)
+        # Stale entries are refreshed by the cache's own threads through the synchronous API,
+        # behind the same circuit breaker as every other Directions call
+        routes = route_cache.get(
+            key,
+            lambda: self.api.directions_breaker.call(
+                self.api._fetch_google_maps_routes, origin, destination, transport_mode, departure_time
+            )
+        )
+        if routes is not None:
+            return routes
+
+        self._get_client()  # Also drops in-flight requests left from another event loop
+        task = self._inflight.get(key)
+        if task is None:
+            # Concurrent misses for the same key share one request
+            task = asyncio.ensure_future(
+                self._fetch_and_cache(key, origin, destination, transport_mode, departure_time)
+            )
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield: one caller being cancelled must not cancel the request for the others
+        routes = await asyncio.shield(task)
+        return route_cache.copy_routes(routes)
+
+    async def get_google_maps_routes(self, origin: str, destination: str,
+                                     transport_mode: str = "transit",
+                                     departure_time: Optional[datetime] = None) -> List[TransportRoute]:
+        """Get routes for one travel mode, falling back to cached, timetable or mock data like TransportAPI does"""
+        if not self.api.google_maps_api_key:
+            print("Warning: GOOGLE_MAPS_API_KEY not found. Using offline timetable or mock data.")
+            return await asyncio.to_thread(self.api._offline_routes, origin, destination, transport_mode,
+                                           departure_time)
+
+        try:
+            return await self._get_routes(origin, destination, transport_mode, departure_time)
+        except CircuitOpenError:
+            pass
+        except DirectionsAPIError as e:
+            print(f"Google Maps API error: {e}")
+        except Exception as e:
+            print(f"Error getting Google Maps routes: {e}")
+
+        cache_key = self.api.route_cache.key(origin, destination, transport_mode, departure_time)
+        # Without old routes the fallback plans on the GTFS timetable, which is CPU work; keep it off the loop
+        return await asyncio.to_thread(self.api._fallback_routes, cache_key, origin, destination, transport_mode,
+                                       departure_time)
+
+    async def get_multimodal_routes(self, origin: str, destination: str,
+                                    modes: Sequence[str] = TRAVEL_MODES,
+                                    departure_time: Optional[datetime] = None) -> List[TransportRoute]:
+        """
+        Query several travel modes concurrently and merge the alternatives.
+
+        Args:
+            origin: Starting location
+            destination: Destination location
+            modes: Directions API travel modes to query
+            departure_time: Departure time (None means now)
+
+        Returns:
+            Routes of every mode that answered, without duplicates. A mode
+            that fails contributes its last cached routes if there are any;
+            timetable or mock routes are used only when no mode returned anything
+        """
+        if not self.api.google_maps_api_key:
+            print("Warning: GOOGLE_MAPS_API_KEY not found. Using offline timetable or mock data.")
+            return await asyncio.to_thread(self.api._offline_routes, origin, destination, "transit",
+                                           departure_time)
+
+        results = await asyncio.gather(
+            *(self._get_routes(origin, destination, mode, departure_time) for mode in modes),
+            return_exceptions=True
+        )
+
+        routes = []
+        seen = set()
+        for mode, result in zip(modes, results):
+            if isinstance(result, Exception):
+                if not isinstance(result, CircuitOpenError):
+                    print(f"Error getting {mode} routes: {result}")
+                # A failing mode drops out unless it has old routes; the others still answer
+                cache_key = self.api.route_cache.key(origin, destination, mode, departure_time)
+                result = self.api.route_cache.get_last_known(cache_key) or []
+            for route in result:
+                # Alternatives of one mode often share a transit leg
+                identity = (route.transport_type, route.route_id, route.departure_time, route.platform)
+                if identity not in seen:
+                    seen.add(identity)
+                    routes.append(route)
+
+        if routes:
+            return routes
+        return await asyncio.to_thread(self.api._offline_routes, origin, destination, "transit", departure_time)
+
+    def _add_real_time_info(self, routes: List[TransportRoute], city: Optional[str] = None) -> List[TransportRoute]:
+        self.api._add_real_time_info(routes, city)
+        self.api._add_service_alerts(routes, city)
+        return routes
+
+    async def rank_routes(self, routes: List[TransportRoute], preferences: Dict = None,
+                          limit: Optional[int] = None) -> List[TransportRoute]:
+        """Rank routes with TransportAPI's scoring, off the event loop for large lists"""
+        preferences = preferences or {}
+        if len(routes) > RANK_IN_THREAD_THRESHOLD:
+            return await asyncio.to_thread(self.api._sort_routes_by_preferences, routes, preferences, limit)
+        return self.api._sort_routes_by_preferences(routes, preferences, limit)
+
+    async def find_best_routes(self, origin: str, destination: str, preferences: Dict = None,
+                               modes: Sequence[str] = ('transit',), departure_time: Optional[datetime] = None,
+                               limit: int = 5, city: Optional[str] = None) -> List[TransportRoute]:
+        """
+        Find the best routes between two locations across one or more travel modes.
+
+        Args:
+            origin: Starting location
+            destination: Destination location
+            preferences: Ranking preferences as for TransportAPI.find_best_routes
+            modes: Travel modes to query concurrently
+            departure_time: Departure time (None means now)
+            limit: Number of routes to return
+            city: City for real-time info and service alerts
+
+        Returns:
+            The top routes of all modes as one ranked list
+        """
+        routes = await self.get_multimodal_routes(origin, destination, modes, departure_time)
+        # Real-time lookups may call city transit APIs, so keep them off the loop
+        routes = await asyncio.to_thread(self._add_real_time_info, routes, city)
+
+        if preferences or len(modes) > 1:
+            routes = await self.rank_routes(routes, preferences, limit)
+        return routes[:limit]
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark: service alert lookups as the number of alerts grows.
+
+Alerts name a few routes and stops and have an active window (some
+already ended, some not yet started). The network grows with the alert
+count, so every line carries a few alerts at any size and a flat lookup
+cost shows as a flat join column. Compared, for the same queries:
+- scan: filtering a list of alert dicts, as a consumer of the old
+  get_service_alerts list would have to
+- AlertStore: city/route/stop indexes with a heap of end times
+Also measured: ingesting the alerts as a GTFS-Realtime feed, re-applying
+it unchanged, and evicting the alerts whose window ends.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from typing import Callable, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.gtfs_realtime_fixture import service_alert
+from service_alerts import AlertStore
+
+def network_size(alerts: int):
+    """Routes and stops of a network with this many alerts, so each line has a few alerts at any size."""
+    return max(alerts // 2, 1), max(alerts * 2, 1)
+
+def make_feed(count: int, now: int, seed: int = 0) -> Dict:
+    rng = random.Random(seed)
+    routes, stops = network_size(count)
+    entities = []
+    for index in range(count):
+        start = now + rng.choice([-7200, -600, 600]) if rng.random() < 0.8 else None
+        end = now + rng.choice([-60, 1800, 7200]) if rng.random() < 0.8 else None
+        entities.append(service_alert(
+            f"A{index}", [f"R{rng.randrange(routes)}" for _ in range(rng.randint(1, 3))],
+            [f"S{rng.randrange(stops)}" for _ in range(rng.randint(0, 4))], start, end
+        ))
+    return {'header': {'gtfsRealtimeVersion': '2.0', 'incrementality': 'FULL_DATASET', 'timestamp': str(now)},
+            'entity': entities}
+
+def scan(alerts: List[Dict], route_ids: List[str], now: float) -> List[List[str]]:
+    """The per-route filter over a flat alert list that callers needed before AlertStore."""
+    found = []
+    for route_id in route_ids:
+        matches = []
+        for alert in alerts:
+            if route_id in alert['routes'] and alert['start'] <= now < alert['end']:
+                matches.append(alert['alert_id'])
+        found.append(sorted(matches))
+    return found
+
+def mean_us(fn: Callable, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark service alert lookups as the number of alerts grows')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000], help='Alert counts')
+    parser.add_argument('--routes', type=int, default=5, help='Routes per alerts_for_routes join')
+    args = parser.parse_args()
+
+    now = int(time.time())
+    rng = random.Random(1)
+    print(f"🚨 Alerts for {args.routes} routes (µs per query) and feed ingestion")
+    print(f"  {'alerts':>7} {'scan':>10} {'join':>8} {'stop':>8} {'ingest ms':>10} {'unchanged ms':>13} {'evict ms':>9}")
+    for size in args.sizes:
+        routes, stops = network_size(size)
+        feed = make_feed(size, now)
+        store = AlertStore()
+        ingest = store.apply_feed(feed, source='bench', city=None)
+        unchanged = store.apply_feed(feed, source='bench', city=None)
+        flat = [
+            {'alert_id': alert.alert_id, 'routes': alert.routes, 'start': alert.start or float('-inf'),
+             'end': alert.end or float('inf')}
+            for alert in store.alerts.values()
+        ]
+
+        queries = [[f"R{rng.randrange(routes)}" for _ in range(args.routes)] for _ in range(200)]
+        mismatches = sum(
+            scan(flat, route_ids, now)
+            != [sorted(alert.alert_id for alert in alerts) for alerts in store.alerts_for_routes(route_ids, now=now)]
+            for route_ids in queries[:20]
+        )
+        scan_us = mean_us(lambda: scan(flat, queries[0], now), 3 if size > 10000 else 20)
+        join_us = mean_us(lambda: [store.alerts_for_routes(route_ids, now=now) for route_ids in queries], 5) / len(queries)
+        stop_us = mean_us(lambda: store.for_stop(f"S{rng.randrange(stops)}", now=now), 2000)
+
+        start = time.perf_counter()
+        store.evict_expired(now + 3600)
+        evict_ms = (time.perf_counter() - start) * 1000
+        print(f"  {size:>7} {scan_us:>10.1f} {join_us:>8.1f} {stop_us:>8.1f} {ingest.seconds * 1000:>10.1f} "
+              f"{unchanged.seconds * 1000:>13.1f} {evict_ms:>9.1f}" + (f"  ❌ {mismatches} mismatches" if mismatches else ""))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark: sequential vs concurrent multi-mode route lookups.
+
+Every origin/destination pair is queried for several travel modes against
+the local fake Directions API, once with TransportAPI calling modes and
+pairs one after another, and once with AsyncTransportAPI fanning them all
+out over its pooled client. Each run starts with an empty route cache, so
+every lookup is a real HTTP request.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from async_transport_api import TRAVEL_MODES, AsyncTransportAPI
+from benchmarks.fake_directions_server import FakeDirectionsServer
+from benchmarks.load_test import ROUTE_PAIRS
+from route_cache import RouteCache
+from transport_api import TransportAPI
+
+def make_api(url: str) -> TransportAPI:
+    api = TransportAPI()
+    api.google_maps_api_key = 'benchmark'
+    api.google_maps_base_url = url
+    api._route_cache = RouteCache()
+    return api
+
+def run_sequential(url: str, pairs, modes) -> tuple:
+    api = make_api(url)
+    routes = 0
+    start = time.perf_counter()
+    for origin, destination in pairs:
+        for mode in modes:
+            routes += len(api.get_google_maps_routes(origin, destination, mode))
+    return time.perf_counter() - start, routes
+
+async def run_concurrent(url: str, pairs, modes, max_connections: int) -> tuple:
+    start = time.perf_counter()
+    async with AsyncTransportAPI(make_api(url), max_connections=max_connections) as api:
+        results = await asyncio.gather(*(
+            api.get_multimodal_routes(origin, destination, modes) for origin, destination in pairs
+        ))
+    return time.perf_counter() - start, sum(len(routes) for routes in results)
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare sequential and concurrent multi-mode route lookups')
+    parser.add_argument('--pairs', type=int, default=len(ROUTE_PAIRS), help='Origin/destination pairs to query')
+    parser.add_argument('--modes', nargs='*', default=list(TRAVEL_MODES), help='Travel modes per pair')
+    parser.add_argument('--latency', type=float, default=0.08, help='Fake Directions API median latency in seconds')
+    parser.add_argument('--max-connections', type=int, default=20, help='Async connection pool size')
+    args = parser.parse_args()
+
+    pairs = (ROUTE_PAIRS * (args.pairs // len(ROUTE_PAIRS) + 1))[:args.pairs]
+    requests = len(pairs) * len(args.modes)
+    print(f"🗺️ {len(pairs)} pairs × {len(args.modes)} modes = {requests} Directions requests, "
+          f"{args.latency * 1000:.0f} ms median latency")
+
+    with FakeDirectionsServer(latency=args.latency) as server, contextlib.redirect_stdout(io.StringIO()):
+        sequential, sequential_routes = run_sequential(server.url, pairs, args.modes)
+        concurrent, concurrent_routes = asyncio.run(
+            run_concurrent(server.url, pairs, args.modes, args.max_connections)
+        )
+
+    print(f"  sequential (TransportAPI)       {sequential * 1000:9.1f} ms  {sequential_routes} routes")
+    print(f"  concurrent (AsyncTransportAPI)  {concurrent * 1000:9.1f} ms  {concurrent_routes} routes")
+    print(f"⚡ {sequential / concurrent:.1f}x faster with fan-out")
+
+if __name__ == "__main__":
+    main()
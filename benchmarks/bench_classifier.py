@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark: accuracy and latency of the local content-type classifier.
+
+Accuracy is leave-one-out over the sections of data/raw_tourist_texts: each
+section is classified by a model trained on every other section.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from content_classifier import ContentClassifier, SEED_KEYWORDS, get_classifier, load_training_documents
+
+def leave_one_out_accuracy() -> tuple:
+    """Return (accuracy, per-type confusion counts) over the data file sections."""
+    documents = load_training_documents()
+    seeds = set(SEED_KEYWORDS.values())
+    sections = [(i, doc) for i, doc in enumerate(documents) if doc[0] not in seeds]
+    
+    correct = 0
+    confusion = Counter()
+    for i, (text, expected) in sections:
+        classifier = ContentClassifier().fit(doc for j, doc in enumerate(documents) if j != i)
+        predicted = classifier.predict(text)
+        confusion[(expected, predicted)] += 1
+        correct += predicted == expected
+    return correct / len(sections), confusion
+
+def latency(iterations: int) -> dict:
+    """Classification latency on short and full-section inputs, in microseconds."""
+    classifier = get_classifier()
+    samples = {
+        'short query': "How do I get from the airport to the city centre by train?",
+        'section': load_training_documents()[0][0]
+    }
+    results = {}
+    for name, text in samples.items():
+        timings = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            classifier.predict(text)
+            timings.append((time.perf_counter() - start) * 1e6)
+        timings.sort()
+        results[name] = (statistics.mean(timings), timings[int(len(timings) * 0.99)], len(text))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the local content-type classifier')
+    parser.add_argument('--iterations', type=int, default=2000, help='Classifications per latency sample')
+    args = parser.parse_args()
+    
+    start = time.perf_counter()
+    get_classifier()
+    print(f"🧠 Training from data files: {(time.perf_counter() - start) * 1000:.1f} ms")
+    
+    accuracy, confusion = leave_one_out_accuracy()
+    print(f"🎯 Leave-one-out accuracy: {accuracy * 100:.1f}%")
+    for (expected, predicted), count in sorted(confusion.items()):
+        if expected != predicted:
+            print(f"   {expected} → {predicted}: {count}")
+    
+    for name, (mean_us, p99_us, chars) in latency(args.iterations).items():
+        print(f"⏱️ {name:<12} ({chars:>4} chars): mean {mean_us:7.1f} µs   p99 {p99_us:7.1f} µs")
+
+if __name__ == "__main__":
+    main()
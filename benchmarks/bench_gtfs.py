@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Benchmark: offline GTFS timetable build, load and journey queries.
+
+Generates a street-grid GTFS feed, then measures:
+- the first load, which parses the zip and writes the array tables
+- later loads, which only memory-map the saved tables
+- journey queries (three itineraries each) between random stops at
+  random times of day, with no network
+
+--verify N first checks N random queries on a small grid against a
+plain time-dependent Dijkstra over the same timetable.
+"""
+
+import argparse
+import heapq
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.gtfs_fixture import make_gtfs_feed, stop_name
+from gtfs_timetable import GTFSTimetable, JourneyPlanner
+
+def dijkstra_arrival(planner: JourneyPlanner, sources, targets, departure: int, active) -> int:
+    """
+    Earliest arrival at the destination by time-dependent Dijkstra, as a reference for the scan.
+
+    Stops are settled in order of the time a trip can be boarded there;
+    from each one every active trip departing in the search window is
+    ridden to each of its later stops. Footpaths follow rides, as in
+    JourneyPlanner.earliest_arrival.
+    """
+    timetable = planner.timetable
+    limit = departure + planner.max_duration_seconds
+    trip_connections, stop_departures = {}, {}
+    for index in range(timetable.connection_count):
+        trip = timetable.connection_trip[index]
+        if active[trip]:
+            connections = trip_connections.setdefault(trip, [])
+            stop_departures.setdefault(timetable.connection_from[index], []).append(
+                (timetable.connection_departure[index], trip, len(connections)))
+            connections.append(index)
+
+    never = 1 << 62
+    best = never
+    ready = {stop: departure + walk for stop, walk in sources.items()}
+    queue = [(time, stop) for stop, time in ready.items()]
+    heapq.heapify(queue)
+    settled = set()
+    while queue:
+        time, stop = heapq.heappop(queue)
+        if stop in settled or time >= best:
+            continue
+        settled.add(stop)
+        for connection_departure, trip, position in stop_departures.get(stop, ()):
+            if connection_departure < time:
+                continue
+            for index in trip_connections[trip][position:]:
+                if timetable.connection_departure[index] >= limit:
+                    break
+                to_stop, arrival = timetable.connection_to[index], timetable.connection_arrival[index]
+                reached = [(to_stop, arrival, arrival + planner.change_seconds)]
+                for path in range(timetable.footpath_start[to_stop], timetable.footpath_start[to_stop + 1]):
+                    walked = arrival + timetable.footpath_seconds[path]
+                    reached.append((timetable.footpath_to[path], walked, walked))
+                for other, arrived, boardable in reached:
+                    if other in targets:
+                        best = min(best, arrived + targets[other])
+                    if boardable < ready.get(other, never):
+                        ready[other] = boardable
+                        heapq.heappush(queue, (boardable, other))
+    return best
+
+def scan_arrival(planner: JourneyPlanner, sources, targets, departure: int, active) -> int:
+    """Arrival at the destination of the journey JourneyPlanner.earliest_arrival finds."""
+    journey = planner.earliest_arrival(sources, targets, departure, [(0, active)])
+    if journey is None:
+        return 1 << 62
+    stop, pointers = journey
+    first, last, _ = pointers[stop]
+    if last is not None:
+        return planner.timetable.connection_arrival[last] + targets[stop]
+    ride_arrival = planner.timetable.connection_arrival[pointers[first][1]]
+    return ride_arrival + planner._footpath_seconds(first, stop) + targets[stop]
+
+def verify(queries: int, directory: str) -> bool:
+    """Compare the scan with Dijkstra on an 8 × 8 grid; True when every query agrees."""
+    feed_path = os.path.join(directory, 'verify.zip')
+    make_gtfs_feed(feed_path, grid=8)
+    planner = JourneyPlanner(GTFSTimetable.from_zip(feed_path))
+    rng = random.Random(1)
+    day = datetime(2026, 10, 19)
+    active = planner.timetable.active_trips(day.date())
+    mismatches = 0
+    for _ in range(queries):
+        sources = planner.resolve(stop_name(rng.randrange(8), rng.randrange(8)))
+        targets = planner.resolve(stop_name(rng.randrange(8), rng.randrange(8)))
+        if sources.keys() & targets.keys():
+            continue
+        departure = rng.randint(4 * 3600, 24 * 3600)
+        expected = dijkstra_arrival(planner, sources, targets, departure, active)
+        found = scan_arrival(planner, sources, targets, departure, active)
+        if found != expected:
+            mismatches += 1
+            print(f"❌ {sorted(sources)} → {sorted(targets)} at {departure}: scan {found}, Dijkstra {expected}")
+    print(f"{'✅' if not mismatches else '❌'} Verified {queries} queries against Dijkstra: {mismatches} mismatches")
+    return not mismatches
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the offline GTFS timetable and journey planner')
+    parser.add_argument('--grid', type=int, default=30, help='Streets and avenues in the generated city')
+    parser.add_argument('--headway', type=int, default=10, help='Minutes between departures of each line')
+    parser.add_argument('--queries', type=int, default=200, help='Journey queries to time')
+    parser.add_argument('--alternatives', type=int, default=3, help='Itineraries per query')
+    parser.add_argument('--verify', type=int, default=0, help='Queries to check against Dijkstra first')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        if args.verify and not verify(args.verify, directory):
+            sys.exit(1)
+
+        feed_path = os.path.join(directory, 'city.zip')
+        start = time.perf_counter()
+        counts = make_gtfs_feed(feed_path, grid=args.grid, headway_minutes=args.headway)
+        print(f"🗺️  Feed: {counts} ({os.path.getsize(feed_path) / 1e6:.1f} MB zip, "
+              f"written in {time.perf_counter() - start:.1f} s)")
+
+        cache_dir = os.path.join(directory, 'cache')
+        start = time.perf_counter()
+        timetable = GTFSTimetable.load(feed_path, cache_dir=cache_dir)
+        build_seconds = time.perf_counter() - start
+        loads = []
+        for _ in range(5):
+            start = time.perf_counter()
+            timetable = GTFSTimetable.load(feed_path, cache_dir=cache_dir)
+            loads.append(time.perf_counter() - start)
+        print(f"🏗️  First load (parse + build): {build_seconds:.2f} s, "
+              f"{timetable.connection_count:,} connections")
+        print(f"📂 Later loads (memory-mapped): {statistics.median(loads) * 1000:.1f} ms")
+
+        planner = JourneyPlanner(timetable)
+        rng = random.Random(0)
+        day = datetime(2026, 10, 19)
+        planner.service_days(day.date())  # Running trips are built once per service day
+        latencies, found, legs = [], 0, 0
+        for _ in range(args.queries):
+            origin = stop_name(rng.randrange(args.grid), rng.randrange(args.grid))
+            destination = stop_name(rng.randrange(args.grid), rng.randrange(args.grid))
+            departure = day + timedelta(minutes=rng.randint(6 * 60, 20 * 60))
+            start = time.perf_counter()
+            itineraries = planner.plan(origin, destination, departure, args.alternatives)
+            latencies.append(time.perf_counter() - start)
+            found += bool(itineraries)
+            legs += sum(len(itinerary.legs) for itinerary in itineraries)
+
+        latencies.sort()
+        print(f"🧭 {args.queries} queries × {args.alternatives} itineraries: "
+              f"p50 {latencies[len(latencies) // 2] * 1000:.1f} ms, "
+              f"p95 {latencies[int(len(latencies) * 0.95)] * 1000:.1f} ms, "
+              f"max {latencies[-1] * 1000:.1f} ms; {found} answered, {legs} legs")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cold import time of the TravelBuddy modules.
+
+Each module is imported in a fresh interpreter under `python -X importtime`,
+several times, and the median cumulative time of the module itself is
+reported. The run fails if a module pulls in a heavy dependency that should
+only load on first use (google.generativeai, geopy, requests, httpx), or if it
+goes over --budget-ms.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = [
+    'prompts',
+    'llm_client',
+    'llm_cassette',
+    'result_cache',
+    'text_compaction',
+    'validator',
+    'simplifier',
+    'resilience',
+    'numpy_support',
+    'route_model',
+    'route_ranking',
+    'stop_index',
+    'gtfs_timetable',
+    'gtfs_realtime',
+    'service_alerts',
+    'transport_api',
+    'async_transport_api'
+]
+
+# Dependencies that must not be imported just by importing a module
+LAZY_DEPENDENCIES = ['google.generativeai', 'geopy', 'requests', 'httpx']
+
+def import_profile(module: str) -> tuple:
+    """Import a module in a fresh interpreter; return (cumulative µs, imported module names)."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    cumulative_us = None
+    imported = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        parts = line.split('|')
+        name = parts[2].strip()
+        imported.add(name)
+        if name == module:
+            cumulative_us = int(parts[1])
+    return cumulative_us, imported
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure cold import time of the TravelBuddy modules')
+    parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters per module')
+    parser.add_argument('--budget-ms', type=float, default=250.0, help='Fail when a module takes longer than this to import')
+    parser.add_argument('modules', nargs='*', default=MODULES, help='Modules to measure')
+    args = parser.parse_args()
+
+    failures = []
+    print(f"📦 Import time, median of {args.runs} fresh interpreters (-X importtime):")
+    for module in args.modules:
+        timings = []
+        imported = set()
+        for _ in range(args.runs):
+            cumulative_us, imported = import_profile(module)
+            timings.append(cumulative_us / 1000)
+        median_ms = statistics.median(timings)
+        eager = [dependency for dependency in LAZY_DEPENDENCIES if dependency in imported]
+
+        marker = '❌' if eager or median_ms > args.budget_ms else '✅'
+        note = f"  imports {', '.join(eager)} eagerly" if eager else ''
+        print(f"  {marker} {module:<18} {median_ms:8.1f} ms{note}")
+        if eager:
+            failures.append(f"{module} imports {', '.join(eager)} at import time")
+        if median_ms > args.budget_ms:
+            failures.append(f"{module} takes {median_ms:.1f} ms to import (budget {args.budget_ms:.0f} ms)")
+
+    if failures:
+        print(f"\n❌ IMPORT TIME REGRESSIONS:")
+        for failure in failures:
+            print(f"  • {failure}")
+        raise SystemExit(1)
+    print(f"\n✅ No eager heavy imports, every module under {args.budget_ms:.0f} ms")
+
+if __name__ == "__main__":
+    main()
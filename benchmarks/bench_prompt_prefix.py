@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark: static prompt prefix reuse and prompt build time.
+
+Simplification prompts are split into a per-content-type system instruction
+(identical across requests, so the model side can cache it) and a small
+per-request part holding the text. This reports how many prompt bytes are
+the reusable prefix for a workload over data/raw_tourist_texts, and compares
+the build time per call against the old layout, which formatted the cached
+template a second time on every call with the text in the middle.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prompts import (
+    PROMPT_CONFIGS,
+    clear_prompt_cache,
+    get_simplification_prompt,
+    get_simplification_prompt_parts
+)
+from simplifier import load_data_files
+from text_compaction import compact_text
+
+# Previous single-template layout, kept here only as the baseline
+LEGACY_PROMPT_TEMPLATE = """You are TravelBuddy, a patient and ultra-clear guide for busy international tourists. Your goal is to instantly simplify complex text into actionable, easy-to-digest information that reduces confusion and stress.
+
+{context}
+
+Text: {complex_text}
+
+{instructions}
+
+Format as:
+{format_template}
+
+Keep under {word_limit} words. Focus on what tourists NEED to know."""
+
+_legacy_templates = {}
+
+def legacy_prompt(complex_text: str, content_type: str) -> str:
+    """Build a prompt the old way: cached template with placeholders, formatted again per call."""
+    template = _legacy_templates.get(content_type)
+    if template is None:
+        config = PROMPT_CONFIGS.get(content_type, PROMPT_CONFIGS["general"])
+        template = _legacy_templates[content_type] = LEGACY_PROMPT_TEMPLATE.format(
+            context="{context}",
+            complex_text="{complex_text}",
+            instructions=config["instructions"],
+            format_template=config["format_template"],
+            word_limit=config["word_limit"]
+        )
+    return template.format(complex_text=complex_text, context="")
+
+def prefix_reuse(items: list) -> dict:
+    """Prompt bytes that are a prefix already sent for an earlier request."""
+    seen = set()
+    total_bytes = reused_bytes = 0
+    for item in items:
+        system_instruction, user_prompt = get_simplification_prompt_parts(item['text'], item['type'])
+        prefix_bytes = len(system_instruction.encode('utf-8'))
+        total_bytes += prefix_bytes + len(user_prompt.encode('utf-8'))
+        if system_instruction in seen:
+            reused_bytes += prefix_bytes
+        seen.add(system_instruction)
+    return {
+        'requests': len(items),
+        'distinct_prefixes': len(seen),
+        'total_bytes': total_bytes,
+        'reused_bytes': reused_bytes
+    }
+
+def build_time(build, items: list, iterations: int) -> float:
+    """Mean prompt build time per call, in microseconds."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for item in items:
+            build(item['text'], item['type'])
+    return (time.perf_counter() - start) / (iterations * len(items)) * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark prompt prefix reuse and build time')
+    parser.add_argument('--repeat', type=int, default=20, help='Repeat the data set to simulate a request stream')
+    parser.add_argument('--iterations', type=int, default=2000, help='Build passes over the data set for timing')
+    parser.add_argument('--short', action='store_true', help='Use the first 300 characters of each file, like chat queries')
+    args = parser.parse_args()
+
+    items = []
+    for item in load_data_files():
+        text = compact_text(item['text']).text
+        items.append({'name': item['name'], 'type': item['type'], 'text': text[:300] if args.short else text})
+
+    print("📐 Prefix size per content type:")
+    for item in items:
+        system_instruction, user_prompt = get_simplification_prompt_parts(item['text'], item['type'])
+        prefix, rest = len(system_instruction.encode('utf-8')), len(user_prompt.encode('utf-8'))
+        print(f"   {item['type']:<18} prefix {prefix:>5} B   per-request {rest:>6} B   "
+              f"({prefix / (prefix + rest) * 100:4.1f}% static)")
+
+    reuse = prefix_reuse(items * args.repeat)
+    print(f"\n♻️ {reuse['requests']} requests, {reuse['distinct_prefixes']} distinct prefixes: "
+          f"{reuse['reused_bytes']:,} of {reuse['total_bytes']:,} prompt bytes reusable "
+          f"({reuse['reused_bytes'] / reuse['total_bytes'] * 100:.1f}%)")
+
+    clear_prompt_cache()
+    start = time.perf_counter()
+    get_simplification_prompt(items[0]['text'], items[0]['type'])
+    print(f"\n🥶 Cold build (first call per type): {(time.perf_counter() - start) * 1e6:.1f} µs")
+
+    legacy_us = build_time(legacy_prompt, items, args.iterations)
+    parts_us = build_time(get_simplification_prompt_parts, items, args.iterations)
+    joined_us = build_time(get_simplification_prompt, items, args.iterations)
+    print(f"⏱️ Old double-format build:   {legacy_us:6.2f} µs/call")
+    print(f"⏱️ Split prefix + prompt:     {parts_us:6.2f} µs/call")
+    print(f"⏱️ Single joined string:      {joined_us:6.2f} µs/call")
+
+if __name__ == "__main__":
+    main()
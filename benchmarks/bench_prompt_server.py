@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-request `python prompts.py --get-prompt` spawns vs. one
+resident `python prompts.py --serve` process answering JSON-lines requests.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROMPTS_SCRIPT = os.path.join(ROOT_DIR, 'prompts.py')
+
+SAMPLE_TEXT = (
+    "To transfer from the Marunouchi Line to the Yamanote Line at Shinjuku Station, "
+    "proceed to the JR East transfer gates located on the B1 level. Valid IC cards "
+    "(PASMO/Suica) can be used for seamless transfers between Tokyo Metro and JR lines."
+)
+
+def bench_spawn(requests: int) -> list:
+    """Time one fresh interpreter per prompt, as the UI used to do."""
+    timings = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, PROMPTS_SCRIPT, '--get-prompt', '--type', 'public_transport', '--text', SAMPLE_TEXT],
+            check=True,
+            capture_output=True
+        )
+        timings.append(time.perf_counter() - start)
+    return timings
+
+def bench_server(requests: int) -> list:
+    """Time prompts served by a single resident process."""
+    server = subprocess.Popen(
+        [sys.executable, PROMPTS_SCRIPT, '--serve'],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        text=True,
+        bufsize=1
+    )
+    try:
+        # Wait for the interpreter to come up so startup is not billed to request 1
+        server.stdin.write(json.dumps({'id': -1, 'op': 'ping'}) + '\n')
+        server.stdout.readline()
+        
+        timings = []
+        for i in range(requests):
+            start = time.perf_counter()
+            server.stdin.write(json.dumps({
+                'id': i,
+                'op': 'get_prompt',
+                'type': 'public_transport',
+                'text': SAMPLE_TEXT
+            }) + '\n')
+            response = json.loads(server.stdout.readline())
+            timings.append(time.perf_counter() - start)
+            if 'prompt' not in response:
+                raise RuntimeError(f"Prompt server error: {response}")
+        return timings
+    finally:
+        server.stdin.close()
+        server.wait()
+
+def summarize(name: str, timings: list) -> dict:
+    """Print and return latency stats in milliseconds."""
+    ms = sorted(t * 1000 for t in timings)
+    summary = {
+        'name': name,
+        'requests': len(ms),
+        'mean_ms': statistics.mean(ms),
+        'p50_ms': ms[len(ms) // 2],
+        'p95_ms': ms[min(len(ms) - 1, int(len(ms) * 0.95))],
+        'total_s': sum(ms) / 1000
+    }
+    print(f"{name:<8} mean {summary['mean_ms']:9.3f} ms   p50 {summary['p50_ms']:9.3f} ms   "
+          f"p95 {summary['p95_ms']:9.3f} ms   total {summary['total_s']:.2f} s")
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the prompt server against per-request spawns')
+    parser.add_argument('--requests', type=int, default=50, help='Number of prompt requests per mode')
+    args = parser.parse_args()
+    
+    print(f"📊 Prompt generation, {args.requests} requests per mode")
+    spawn_stats = summarize('spawn', bench_spawn(args.requests))
+    server_stats = summarize('server', bench_server(args.requests))
+    print(f"🚀 Speedup: {spawn_stats['mean_ms'] / server_stats['mean_ms']:.0f}x per request")
+
+if __name__ == "__main__":
+    main()
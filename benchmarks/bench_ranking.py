@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark: route ranking at growing candidate counts.
+
+Compares, for the same candidates with real-time info attached:
+- legacy: the sort find_best_routes used before route_ranking (parses text
+  in the sort key, sorts everything, keeps 5)
+- rank_routes: TransportRoute list, each text parsed once, heap top-5
+- rank_batch (python): RouteBatch columns, plain Python scoring, heap top-5
+- rank_batch (numpy): RouteBatch columns, vectorized scoring, argpartition top-5
+- find_best_routes: what it does with a cached batch - copy the columns,
+  rank them, and build TransportRoute objects for the top 5 only
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from typing import Callable, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.directions_fixture import make_directions_response
+from route_model import RouteBatch
+from route_ranking import rank_batch, rank_routes
+from transport_api import TransportRoute
+
+PREFERENCES = {'transport_types': ['subway', 'train'], 'cost': 'low'}
+
+def legacy_sort(routes: List[TransportRoute], preferences: Dict) -> List[TransportRoute]:
+    """TransportAPI._sort_routes_by_preferences as it was before route_ranking."""
+    def route_score(route):
+        score = 0
+        if 'duration' in route.duration:
+            try:
+                score -= int(route.duration.split()[0])
+            except:
+                pass
+        if route.transport_type in preferences.get('transport_types', []):
+            score += 10
+        if route.cost and 'cost' in preferences:
+            try:
+                score -= float(route.cost.replace('$', '').replace(',', '')) * 0.1
+            except:
+                pass
+        return score
+    return sorted(routes, key=route_score, reverse=True)[:5]
+
+def make_batch(count: int, seed: int = 0) -> RouteBatch:
+    rng = random.Random(seed)
+    data = make_directions_response(routes=count // 3 + 1, transit_steps=3, polyline_length=1, seed=seed)
+    batch = RouteBatch.from_directions(data).take(range(count))
+    batch.attach_real_time_info([
+        {'crowding_level': rng.choice(['Low', 'Medium', 'High']), 'delay_minutes': rng.choice([0, 0, 5, 10])}
+        for _ in range(count)
+    ])
+    return batch
+
+def cached_top_routes(batch: RouteBatch, preferences: Dict, top: int) -> List[TransportRoute]:
+    """find_best_routes' path from a cached RouteBatch to its top routes."""
+    copy = batch.copy()
+    return copy.to_routes(rank_batch(copy, preferences, top))
+
+def best_time_ms(fn: Callable, min_time: float = 0.2) -> float:
+    timings = []
+    deadline = time.perf_counter() + min_time
+    while time.perf_counter() < deadline or len(timings) < 3:
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark route ranking at growing candidate counts')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000, 50000], help='Candidate counts')
+    parser.add_argument('--top', type=int, default=5, help='Routes to keep')
+    args = parser.parse_args()
+
+    print(f"🏆 Top {args.top} of N candidates (best of several runs, ms)")
+    print(f"  {'N':>7} {'legacy':>10} {'rank_routes':>12} {'batch (python)':>15} {'batch (numpy)':>14} "
+          f"{'find_best_routes':>17}")
+    for size in args.sizes:
+        batch = make_batch(size)
+        routes = batch.to_routes()
+        timings = [
+            best_time_ms(lambda: legacy_sort(routes, PREFERENCES)),
+            best_time_ms(lambda: rank_routes(routes, PREFERENCES, args.top)),
+            best_time_ms(lambda: rank_batch(batch, PREFERENCES, args.top, numpy_min_routes=size + 1)),
+            best_time_ms(lambda: rank_batch(batch, PREFERENCES, args.top, numpy_min_routes=0)),
+            best_time_ms(lambda: cached_top_routes(batch, PREFERENCES, args.top))
+        ]
+        print(f"  {size:>7} " + ' '.join(f"{value:>{width}.2f}"
+                                          for value, width in zip(timings, (10, 12, 15, 14, 17))))
+
+if __name__ == "__main__":
+    main()
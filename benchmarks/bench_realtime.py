@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark: GTFS-Realtime ingestion and lookups.
+
+A generated fleet publishes a TripUpdate and a VehiclePosition per trip.
+Measured:
+- first ingest of a FULL_DATASET snapshot (every entity is new)
+- re-ingest of the same snapshot (diffing skips every entity)
+- snapshots where a few percent of trips changed: applied as diffs into
+  the live state, against rebuilding a fresh state from the snapshot
+- DIFFERENTIAL feeds of one trip (per-update apply latency)
+- route_info lookups
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.gtfs_realtime_fixture import FeedGenerator
+from gtfs_realtime import RealtimeState
+
+def percentile(values, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark GTFS-Realtime ingestion and lookups')
+    parser.add_argument('--trips', type=int, default=20000, help='Trips in the fleet')
+    parser.add_argument('--routes', type=int, default=500, help='Routes the trips belong to')
+    parser.add_argument('--changed', type=float, default=0.05, help='Fraction of trips changed per snapshot')
+    parser.add_argument('--snapshots', type=int, default=5, help='Changed snapshots to apply')
+    args = parser.parse_args()
+
+    generator = FeedGenerator(trips=args.trips, routes=args.routes)
+    state = RealtimeState()
+    feed = generator.full_feed()
+    entities = len(feed['entity'])
+    print(f"🚍 {args.trips:,} trips on {args.routes} routes, {entities:,} entities per snapshot")
+
+    stats = state.apply_feed(feed)
+    print(f"  first ingest             {stats.seconds * 1000:8.1f} ms  {entities / stats.seconds:>10,.0f} entities/s")
+    stats = state.apply_feed(feed)
+    print(f"  same snapshot again      {stats.seconds * 1000:8.1f} ms  {entities / stats.seconds:>10,.0f} entities/s "
+          f"({stats.unchanged:,} unchanged)")
+
+    diff_seconds, rebuild_seconds = [], []
+    for _ in range(args.snapshots):
+        generator.mutate(args.changed)
+        snapshot = generator.full_feed()
+        diff_seconds.append(state.apply_feed(snapshot).seconds)
+        rebuild_seconds.append(RealtimeState().apply_feed(snapshot).seconds)
+    print(f"  {args.changed:.0%} changed, as diff     {sum(diff_seconds) / len(diff_seconds) * 1000:8.1f} ms  "
+          f"(rebuilding a fresh state: {sum(rebuild_seconds) / len(rebuild_seconds) * 1000:.1f} ms)")
+
+    rng = random.Random(1)
+    latencies = []
+    for _ in range(2000):
+        trip = rng.choice(generator.trips)
+        trip['delay'] += rng.choice([-60, 60])
+        single = {'header': {'incrementality': 'DIFFERENTIAL'}, 'entity': generator._entities([trip])}
+        latencies.append(state.apply_feed(single).seconds)
+    print(f"  one-trip update          p50 {percentile(latencies, 0.5) * 1e6:.1f} µs, "
+          f"p99 {percentile(latencies, 0.99) * 1e6:.1f} µs")
+
+    route_ids = [f"R{rng.randrange(args.routes)}" for _ in range(100000)]
+    start = time.perf_counter()
+    for route_id in route_ids:
+        state.route_info(route_id)
+    print(f"  route_info lookup        {(time.perf_counter() - start) / len(route_ids) * 1e9:.0f} ns")
+
+if __name__ == "__main__":
+    main()
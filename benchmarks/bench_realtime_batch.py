@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark: real-time lookups for a find_best_routes result, per route
+against get_real_time_info_batch.
+
+- remote: a real_time_fetcher that waits --latency-ms per call, like a
+  city transit API; per-route calls run one after another, the batch
+  calls each distinct route once and concurrently
+- feed: a GTFS-Realtime state; per-route lookups check the feed files
+  every time, the batch checks them once
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.gtfs_realtime_fixture import FeedGenerator
+from gtfs_realtime import RealtimeFeed
+from transport_api import TransportAPI
+
+def make_keys(count: int, distinct: int, seed: int = 0):
+    rng = random.Random(seed)
+    return [(f"R{rng.randrange(distinct)}", 'bus') for _ in range(count)]
+
+def per_route(api: TransportAPI, keys) -> dict:
+    """The loop find_best_routes ran before get_real_time_info_batch."""
+    return {key: api.get_real_time_info(key[0], key[1], "default") for key in keys}
+
+def timed_ms(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark per-route against batched real-time lookups')
+    parser.add_argument('--routes', type=int, default=15, help='Routes in a result (remote case)')
+    parser.add_argument('--distinct', type=int, default=8, help='Distinct lines among them')
+    parser.add_argument('--latency-ms', type=float, default=40.0, help='Simulated transit API latency')
+    parser.add_argument('--feed-routes', type=int, default=1000, help='Route keys looked up in the feed case')
+    args = parser.parse_args()
+
+    calls = []
+    def fetcher(route_id, transport_type, city):
+        calls.append(route_id)
+        time.sleep(args.latency_ms / 1000)
+        return {'route_id': route_id, 'status': 'On Time', 'delay_minutes': 0, 'real_time_available': True}
+
+    api = TransportAPI(real_time_fetcher=fetcher)
+    api.gtfs_realtime_paths = []  # Only the fetcher, whatever the environment says
+    keys = make_keys(args.routes, args.distinct)
+    distinct = len(set(keys))
+    print(f"🛰️  Remote: {len(keys)} routes, {distinct} distinct lines, {args.latency_ms:.0f} ms per call")
+    serial_ms = timed_ms(lambda: per_route(api, keys))
+    serial_calls = len(calls)
+    calls.clear()
+    batch_ms = timed_ms(lambda: api.get_real_time_info_batch(keys, "default"))
+    print(f"  per route   {serial_ms:8.1f} ms  ({serial_calls} calls)")
+    print(f"  batch       {batch_ms:8.1f} ms  ({len(calls)} calls)")
+
+    generator = FeedGenerator(trips=5000, routes=200)
+    with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False, encoding='utf-8') as file:
+        json.dump(generator.full_feed(), file)
+        feed_path = file.name
+    api = TransportAPI()
+    api._realtime_feed = RealtimeFeed([feed_path], refresh_seconds=0)  # Check the file on every lookup
+    api._realtime_feed.refresh()
+    keys = make_keys(args.feed_routes, 200)
+    print(f"📡 Feed: {len(keys)} route keys, files checked before every lookup")
+    print(f"  per route   {timed_ms(lambda: per_route(api, keys)):8.2f} ms")
+    print(f"  batch       {timed_ms(lambda: api.get_real_time_info_batch(keys, 'default')):8.2f} ms")
+    os.remove(feed_path)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark: memory per route for each route representation.
+
+A generated Directions API response is decoded and parsed into each
+representation, the decoded response is dropped, and the memory still held
+(tracemalloc) is divided by the number of routes:
+- TransportRoute list, as parsed before route_model existed (one dataclass
+  per transit step, texts pointing into the decoded response)
+- TransportRoute views built from a RouteBatch
+- CompactRoute list (slotted, interned texts, numeric fields)
+- RouteBatch (array columns plus interned text lists)
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.directions_fixture import make_directions_json
+from route_model import RouteBatch
+from transport_api import TransportAPI, TransportRoute
+
+def legacy_parse(data: Dict) -> List[TransportRoute]:
+    """TransportAPI._parse_directions_routes as it was before route_model."""
+    api = TransportAPI()
+    routes = []
+    for route in data.get('routes', []):
+        for leg in route.get('legs', []):
+            for step in leg.get('steps', []):
+                if step.get('travel_mode') == 'TRANSIT':
+                    transit_details = step.get('transit_details', {})
+                    line = transit_details.get('line', {})
+                    routes.append(TransportRoute(
+                        route_id=line.get('short_name', 'Unknown'),
+                        route_name=line.get('name', 'Unknown Route'),
+                        transport_type=api._get_transport_type(line.get('vehicle', {}).get('type', '')),
+                        destination=transit_details.get('headsign', 'Unknown'),
+                        departure_time=transit_details.get('departure_time', {}).get('text', 'Unknown'),
+                        arrival_time=transit_details.get('arrival_time', {}).get('text', 'Unknown'),
+                        duration=step.get('duration', {}).get('text', 'Unknown'),
+                        platform=transit_details.get('departure_stop', {}).get('name', 'Unknown')
+                    ))
+    return routes
+
+REPRESENTATIONS: Dict[str, Callable[[Dict], object]] = {
+    'TransportRoute (legacy parse)': legacy_parse,
+    'TransportRoute (batch views)': lambda data: RouteBatch.from_directions(data).to_routes(),
+    'CompactRoute list': lambda data: list(RouteBatch.from_directions(data)),
+    'RouteBatch': RouteBatch.from_directions
+}
+
+def retained_bytes(body: bytes, parse: Callable[[Dict], object]) -> tuple:
+    """Bytes still allocated after parsing and dropping the decoded response, and the result size."""
+    # Warm-up parse: growing the interpreter's table of interned strings is a
+    # one-time cost that should not be charged to the routes
+    parse(json.loads(body))
+    gc.collect()
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    data = json.loads(body)
+    result = parse(data)
+    del data
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current - baseline, len(result)
+
+def parse_time_us(body: bytes, parse: Callable[[Dict], object], repeat: int) -> float:
+    data = json.loads(body)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        parse(data)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure memory per route for each route representation')
+    parser.add_argument('--routes', type=int, default=200, help='Alternatives in the generated response')
+    parser.add_argument('--transit-steps', type=int, default=3, help='Transit steps per alternative')
+    parser.add_argument('--repeat', type=int, default=20, help='Parses per timing')
+    args = parser.parse_args()
+
+    body = make_directions_json(routes=args.routes, transit_steps=args.transit_steps)
+    print(f"🧮 {args.routes} alternatives × {args.transit_steps} transit steps")
+    baseline_per_route = None
+    for name, parse in REPRESENTATIONS.items():
+        retained, count = retained_bytes(body, parse)
+        per_route = retained / count
+        baseline_per_route = baseline_per_route or per_route
+        parse_us = parse_time_us(body, parse, args.repeat)
+        print(f"  {name:<30} {per_route:8.0f} B/route  ({per_route / baseline_per_route:5.2f}x)  "
+              f"parse {parse_us / count:6.2f} µs/route")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark: nearby-stop queries with StopIndex against brute-force scans.
+
+Random stops are spread over a 60 × 60 km metro area, denser downtown.
+For random points, radius and k-nearest queries are timed on:
+- brute force in Python (haversine to every stop)
+- brute force vectorized with NumPy
+- StopIndex (grid cells, haversine for the candidates only)
+Every index answer is checked against the NumPy brute force.
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from stop_index import EARTH_RADIUS_KM, StopIndex, haversine_km
+
+CENTER = (40.75, -73.98)
+
+def make_stops(count: int, seed: int = 0) -> tuple:
+    rng = random.Random(seed)
+    latitudes, longitudes = [], []
+    for _ in range(count):
+        # Half the stops within ~8 km of the center, half across the whole area
+        spread = 0.07 if rng.random() < 0.5 else 0.27
+        latitudes.append(CENTER[0] + rng.uniform(-spread, spread))
+        longitudes.append(CENTER[1] + rng.uniform(-spread, spread) * 1.32)
+    return latitudes, longitudes
+
+def python_within(latitudes, longitudes, latitude, longitude, radius_km):
+    found = [(stop, haversine_km(latitude, longitude, stop_latitude, stop_longitude))
+             for stop, (stop_latitude, stop_longitude) in enumerate(zip(latitudes, longitudes))]
+    return sorted((item for item in found if item[1] <= radius_km), key=lambda item: item[1])
+
+def numpy_distances(lat_radians, lon_radians, latitude, longitude):
+    phi, lam = math.radians(latitude), math.radians(longitude)
+    a = np.sin((lat_radians - phi) / 2) ** 2 + math.cos(phi) * np.cos(lat_radians) * np.sin((lon_radians - lam) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+def numpy_within(lat_radians, lon_radians, latitude, longitude, radius_km):
+    distances = numpy_distances(lat_radians, lon_radians, latitude, longitude)
+    inside = np.flatnonzero(distances <= radius_km)
+    return inside[np.argsort(distances[inside], kind='stable')].tolist()
+
+def numpy_nearest(lat_radians, lon_radians, latitude, longitude, k):
+    distances = numpy_distances(lat_radians, lon_radians, latitude, longitude)
+    nearest = np.argpartition(distances, k)[:k]
+    return nearest[np.argsort(distances[nearest], kind='stable')].tolist()
+
+def time_us(fn, points) -> float:
+    start = time.perf_counter()
+    for latitude, longitude in points:
+        fn(latitude, longitude)
+    return (time.perf_counter() - start) / len(points) * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark StopIndex against brute-force nearby-stop scans')
+    parser.add_argument('--stops', type=int, nargs='+', default=[100_000, 250_000], help='Stop counts')
+    parser.add_argument('--queries', type=int, default=2000, help='Query points per measurement')
+    parser.add_argument('--python-queries', type=int, default=5, help='Query points for the Python brute force')
+    args = parser.parse_args()
+
+    for count in args.stops:
+        latitudes, longitudes = make_stops(count)
+        start = time.perf_counter()
+        index = StopIndex(latitudes, longitudes)
+        build_ms = (time.perf_counter() - start) * 1000
+        lat_radians, lon_radians = np.radians(latitudes), np.radians(longitudes)
+        rng = random.Random(1)
+        points = [(CENTER[0] + rng.uniform(-0.2, 0.2), CENTER[1] + rng.uniform(-0.26, 0.26))
+                  for _ in range(args.queries)]
+
+        mismatches = 0
+        for latitude, longitude in points[:200]:
+            expected = numpy_within(lat_radians, lon_radians, latitude, longitude, 1.0)
+            mismatches += [stop for stop, _ in index.within(latitude, longitude, 1.0)] != expected
+            expected = numpy_nearest(lat_radians, lon_radians, latitude, longitude, 10)
+            mismatches += [stop for stop, _ in index.nearest(latitude, longitude, 10)] != expected
+        average = sum(len(index.within(latitude, longitude, 1.0)) for latitude, longitude in points) / len(points)
+
+        print(f"📍 {count:,} stops: index built in {build_ms:.0f} ms, "
+              f"{average:.0f} stops within 1 km on average, {mismatches} mismatches")
+        print(f"  {'query':<22} {'python scan':>12} {'numpy scan':>12} {'StopIndex':>12}  (µs/query)")
+        queries = [
+            ('radius 0.5 km', lambda la, lo: python_within(latitudes, longitudes, la, lo, 0.5),
+             lambda la, lo: numpy_within(lat_radians, lon_radians, la, lo, 0.5),
+             lambda la, lo: index.within(la, lo, 0.5)),
+            ('radius 1 km', lambda la, lo: python_within(latitudes, longitudes, la, lo, 1.0),
+             lambda la, lo: numpy_within(lat_radians, lon_radians, la, lo, 1.0),
+             lambda la, lo: index.within(la, lo, 1.0)),
+            ('5 nearest', lambda la, lo: sorted(python_within(latitudes, longitudes, la, lo, 1e9),
+                                                key=lambda item: item[1])[:5],
+             lambda la, lo: numpy_nearest(lat_radians, lon_radians, la, lo, 5),
+             lambda la, lo: index.nearest(la, lo, 5)),
+            ('20 nearest', lambda la, lo: sorted(python_within(latitudes, longitudes, la, lo, 1e9),
+                                                 key=lambda item: item[1])[:20],
+             lambda la, lo: numpy_nearest(lat_radians, lon_radians, la, lo, 20),
+             lambda la, lo: index.nearest(la, lo, 20))
+        ]
+        for name, python_fn, numpy_fn, index_fn in queries:
+            timings = (time_us(python_fn, points[:args.python_queries]), time_us(numpy_fn, points[:200]),
+                       time_us(index_fn, points))
+            print(f"  {name:<22} " + ' '.join(f"{value:>12.1f}" for value in timings))
+
+if __name__ == "__main__":
+    main()
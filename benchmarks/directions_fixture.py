@@ -0,0 +1,175 @@
+# directions_fixture.py
+# Deterministic Google Directions API responses for offline benchmarks and load tests
+
+import json
+import random
+import string
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+# (vehicle type, line name prefix) pairs as the Directions API reports them
+VEHICLES = [
+    ('BUS', 'Bus'),
+    ('SUBWAY', 'Metro Line'),
+    ('HEAVY_RAIL', 'Regional Train'),
+    ('COMMUTER_TRAIN', 'Commuter Rail'),
+    ('TRAM', 'Tram'),
+    ('FERRY', 'Ferry')
+]
+
+STOP_NAMES = [
+    'Central Station', 'Main Street', 'City Hall', 'Museum Quarter', 'Harbour Front',
+    'University', 'Old Town', 'Airport Terminal 1', 'Market Square', 'Riverside',
+    'Park Avenue', 'Cathedral', 'Stadium', 'Botanical Garden', 'Convention Centre'
+]
+
+def _polyline(rng: random.Random, length: int) -> str:
+    # Encoded polylines are printable ASCII; content does not matter for parsing cost
+    return ''.join(rng.choice(string.ascii_letters + string.digits + '?@[]^_`{|}~') for _ in range(length))
+
+def _location(rng: random.Random) -> Dict:
+    return {'lat': round(40.7 + rng.uniform(-0.1, 0.1), 7), 'lng': round(-74.0 + rng.uniform(-0.1, 0.1), 7)}
+
+def _duration(seconds: int) -> Dict:
+    hours, minutes = divmod(round(seconds / 60), 60)
+    if hours:
+        text = f"{hours} hour{'s' if hours > 1 else ''} {minutes} min{'s' if minutes != 1 else ''}"
+    else:
+        text = f"{max(minutes, 1)} min{'s' if minutes != 1 else ''}"
+    return {'text': text, 'value': seconds}
+
+def _distance(meters: int) -> Dict:
+    return {'text': f"{meters / 1000:.1f} km", 'value': meters}
+
+def _time(moment: datetime) -> Dict:
+    return {
+        'text': moment.strftime('%I:%M %p').lstrip('0'),
+        'time_zone': 'America/New_York',
+        'value': int(moment.timestamp())
+    }
+
+def _walking_step(rng: random.Random, polyline_length: int) -> Dict:
+    seconds = rng.randint(60, 600)
+    return {
+        'distance': _distance(seconds * 1),
+        'duration': _duration(seconds),
+        'end_location': _location(rng),
+        'html_instructions': f"Walk to {rng.choice(STOP_NAMES)}",
+        'polyline': {'points': _polyline(rng, polyline_length)},
+        'start_location': _location(rng),
+        'steps': [
+            {
+                'distance': _distance(rng.randint(20, 300)),
+                'duration': _duration(rng.randint(15, 240)),
+                'end_location': _location(rng),
+                'html_instructions': f"Head <b>{rng.choice(['north', 'south', 'east', 'west'])}</b>",
+                'polyline': {'points': _polyline(rng, polyline_length // 4)},
+                'start_location': _location(rng),
+                'travel_mode': 'WALKING'
+            }
+            for _ in range(rng.randint(1, 3))
+        ],
+        'travel_mode': 'WALKING'
+    }
+
+def _transit_step(rng: random.Random, departure: datetime, polyline_length: int) -> tuple:
+    vehicle_type, line_prefix = rng.choice(VEHICLES)
+    short_name = str(rng.randint(1, 199)) if vehicle_type == 'BUS' else rng.choice('ABCDEFGJLMNQRZ1234567')
+    seconds = rng.randint(180, 3600)
+    arrival = departure + timedelta(seconds=seconds)
+    step = {
+        'distance': _distance(seconds * 8),
+        'duration': _duration(seconds),
+        'end_location': _location(rng),
+        'html_instructions': f"{line_prefix} towards {rng.choice(STOP_NAMES)}",
+        'polyline': {'points': _polyline(rng, polyline_length)},
+        'start_location': _location(rng),
+        'transit_details': {
+            'arrival_stop': {'location': _location(rng), 'name': rng.choice(STOP_NAMES)},
+            'arrival_time': _time(arrival),
+            'departure_stop': {'location': _location(rng), 'name': rng.choice(STOP_NAMES)},
+            'departure_time': _time(departure),
+            'headsign': rng.choice(STOP_NAMES),
+            'line': {
+                'agencies': [{'name': 'Metropolitan Transit', 'phone': '1 (555) 010-0000', 'url': 'https://transit.example/'}],
+                'color': f"#{rng.randrange(0x1000000):06x}",
+                'name': f"{line_prefix} {short_name}",
+                'short_name': short_name,
+                'text_color': '#ffffff',
+                'vehicle': {'icon': '//maps.gstatic.com/mapfiles/transit/iw2/6/bus2.png', 'name': line_prefix, 'type': vehicle_type}
+            },
+            'num_stops': rng.randint(1, 25)
+        },
+        'travel_mode': 'TRANSIT'
+    }
+    return step, arrival
+
+def make_directions_response(origin: str = 'Times Square, New York', destination: str = 'JFK Airport, New York',
+                             routes: int = 6, transit_steps: int = 3, polyline_length: int = 200,
+                             seed: int = 0, departure: Optional[datetime] = None) -> Dict:
+    """
+    Build a Directions API transit response with the shape and field set of a recorded one.
+
+    Args:
+        origin: Start address echoed in each leg
+        destination: End address echoed in each leg
+        routes: Number of alternative routes
+        transit_steps: Transit steps per route, each preceded by a walking step
+        polyline_length: Characters per encoded step polyline
+        seed: RNG seed; the same arguments always produce the same response
+        departure: First departure time (defaults to a fixed date for determinism)
+
+    Returns:
+        Decoded JSON response with status "OK"
+    """
+    rng = random.Random(seed)
+    departure = departure or datetime(2024, 6, 1, 8, 0)
+    response_routes = []
+
+    for _ in range(routes):
+        moment = departure + timedelta(minutes=rng.randint(0, 30))
+        start = moment
+        steps = []
+        for _ in range(transit_steps):
+            walk = _walking_step(rng, polyline_length)
+            steps.append(walk)
+            moment += timedelta(seconds=walk['duration']['value'])
+            step, moment = _transit_step(rng, moment, polyline_length)
+            steps.append(step)
+        fare = round(rng.uniform(2.0, 12.0), 2)
+
+        response_routes.append({
+            'bounds': {'northeast': _location(rng), 'southwest': _location(rng)},
+            'copyrights': 'Map data ©2024 Google',
+            'fare': {'currency': 'USD', 'text': f"${fare:.2f}", 'value': fare},
+            'legs': [{
+                'arrival_time': _time(moment),
+                'departure_time': _time(start),
+                'distance': _distance(sum(step['distance']['value'] for step in steps)),
+                'duration': _duration(int((moment - start).total_seconds())),
+                'end_address': destination,
+                'end_location': _location(rng),
+                'start_address': origin,
+                'start_location': _location(rng),
+                'steps': steps,
+                'traffic_speed_entry': [],
+                'via_waypoint': []
+            }],
+            'overview_polyline': {'points': _polyline(rng, polyline_length * 4)},
+            'summary': '',
+            'warnings': ['Walking directions are in beta. Use caution – This route may be missing sidewalks or pedestrian paths.'],
+            'waypoint_order': []
+        })
+
+    return {
+        'geocoded_waypoints': [
+            {'geocoder_status': 'OK', 'place_id': f"ChIJ{_polyline(rng, 23)}", 'types': ['establishment']}
+            for _ in range(2)
+        ],
+        'routes': response_routes,
+        'status': 'OK'
+    }
+
+def make_directions_json(**options) -> bytes:
+    """make_directions_response() serialized as the API sends it."""
+    return json.dumps(make_directions_response(**options), ensure_ascii=False, indent=3).encode('utf-8')
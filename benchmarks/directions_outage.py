@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Resilience check: TransportAPI against a Directions API that slows down and fails.
+
+Runs TransportAPI (and optionally AsyncTransportAPI) against the local fake
+Directions API through four phases and checks each one:
+1. healthy: routes come from the API and the circuit stays closed
+2. outage: the server answers 500; retries are bounded, the circuit opens,
+   and callers get cached or mock routes without waiting on the API
+3. slow: responses take longer than the read timeout, so calls are cut off
+   at the timeout instead of blocking a worker
+4. recovery: after the recovery timeout a probe call closes the circuit
+
+Exits with status 1 if any check fails.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import time
+from typing import List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from async_transport_api import AsyncTransportAPI
+from benchmarks.fake_directions_server import FakeDirectionsServer
+from benchmarks.load_test import ROUTE_PAIRS
+from resilience import CLOSED, HALF_OPEN, OPEN
+from route_cache import RouteCache
+from transport_api import TransportAPI
+
+def make_api(url: str, args) -> TransportAPI:
+    api = TransportAPI(connect_timeout=args.connect_timeout, read_timeout=args.read_timeout,
+                       max_retries=args.max_retries, backoff_factor=args.backoff_factor,
+                       failure_threshold=args.failure_threshold, recovery_timeout=args.recovery_timeout)
+    api.google_maps_api_key = 'fake-key'
+    api.google_maps_base_url = url
+    # Entries expire at once, so every call reaches the API or the fallback
+    api._route_cache = RouteCache(ttl_seconds=0, stale_seconds=0)
+    return api
+
+def timed_call(api: TransportAPI, origin: str, destination: str) -> tuple:
+    start = time.perf_counter()
+    routes = api.get_google_maps_routes(origin, destination)
+    return time.perf_counter() - start, routes
+
+class Checks:
+    def __init__(self, out):
+        self.out = out
+        self.failures: List[str] = []
+
+    def report(self, line: str = '') -> None:
+        print(line, file=self.out)
+
+    def check(self, passed: bool, description: str) -> None:
+        self.report(f"  {'✅' if passed else '❌'} {description}")
+        if not passed:
+            self.failures.append(description)
+
+def run(args) -> List[str]:
+    # TransportAPI's own messages are collected in `log`; checks print to the console
+    checks = Checks(sys.stdout)
+    report = checks.report
+    with FakeDirectionsServer(latency=args.latency, jitter=0.0, distribution='uniform') as server, \
+            contextlib.redirect_stdout(io.StringIO()) as log:
+        api = make_api(server.url, args)
+        breaker = api.directions_breaker
+        pairs = ROUTE_PAIRS[:4]
+
+        report("🟢 healthy")
+        for origin, destination in pairs:
+            timed_call(api, origin, destination)
+        checks.check(server.stats['ok'] == len(pairs), f"{len(pairs)} calls reached the API")
+        checks.check(breaker.state == CLOSED, "circuit closed")
+
+        report("🔴 outage (HTTP 500)")
+        server.unavailable = True
+        requests_before = server.stats['requests']
+        timings = [timed_call(api, origin, destination) for origin, destination in pairs * 2]
+        upstream = server.stats['requests'] - requests_before
+        limit = args.failure_threshold * (args.max_retries + 1)
+        checks.check(upstream <= limit, f"{upstream} upstream requests, at most {limit} "
+                                        f"({args.failure_threshold} failures × {args.max_retries + 1} attempts)")
+        checks.check(breaker.state == OPEN, f"circuit open after {args.failure_threshold} failures")
+        open_latency = max(seconds for seconds, _ in timings[args.failure_threshold:])
+        checks.check(open_latency < 0.05, f"open circuit answers in {open_latency * 1000:.1f} ms")
+        served = [routes[0].route_id for _, routes in timings[len(pairs):]]
+        cached = api.route_cache.get_last_known(api.route_cache.key(*pairs[0]))
+        checks.check(cached is not None and served[0] == cached[0].route_id, "last known routes served while open")
+        mock = api._fallback_routes(api.route_cache.key('Nowhere', 'Elsewhere'), 'Nowhere', 'Elsewhere')
+        checks.check(mock[0].route_id == '101', "mock routes for trips never fetched")
+
+        report("🐢 slow (latency above the read timeout)")
+        breaker.reset()
+        server.unavailable = False
+        server.latency = args.read_timeout * 4
+        seconds, _ = timed_call(api, 'Slow Street', 'Sluggish Square')
+        bound = (args.max_retries + 1) * (args.read_timeout + 0.2) + args.backoff_factor * 2 ** args.max_retries
+        checks.check(seconds < bound, f"slow call cut off after {seconds:.2f} s (bound {bound:.2f} s)")
+
+        report("🟡 recovery")
+        for _ in range(args.failure_threshold):
+            breaker.record_failure()
+        server.latency = args.latency
+        time.sleep(args.recovery_timeout)
+        checks.check(breaker.state == HALF_OPEN, f"circuit half-open after {args.recovery_timeout:.1f} s")
+        timed_call(api, *pairs[1])
+        checks.check(breaker.state == CLOSED, "successful probe closes the circuit")
+
+        if args.include_async:
+            report("⚡ async outage")
+            server.unavailable = True
+
+            async def async_outage():
+                async with AsyncTransportAPI(api) as async_api:
+                    for origin, destination in pairs * 2:
+                        await async_api.get_google_maps_routes(origin, destination)
+
+            asyncio.run(async_outage())
+            checks.check(breaker.state == OPEN, "async calls open the shared circuit")
+
+        stats = breaker.stats
+        report(f"\n📈 breaker: {stats}")
+        report(f"   transitions: {' ; '.join(f'{old} → {new}' for _, old, new in breaker.transitions)}")
+        report(f"   server: {server.stats}")
+        if args.verbose:
+            report(log.getvalue())
+    return checks.failures
+
+def main():
+    parser = argparse.ArgumentParser(description='Check timeouts, retries and the circuit breaker against a fake Directions API')
+    parser.add_argument('--latency', type=float, default=0.01, help='Fake Directions latency when healthy')
+    parser.add_argument('--connect-timeout', type=float, default=0.5)
+    parser.add_argument('--read-timeout', type=float, default=0.2)
+    parser.add_argument('--max-retries', type=int, default=2)
+    parser.add_argument('--backoff-factor', type=float, default=0.05)
+    parser.add_argument('--failure-threshold', type=int, default=3)
+    parser.add_argument('--recovery-timeout', type=float, default=0.5)
+    parser.add_argument('--include-async', action='store_true', help='Also check AsyncTransportAPI')
+    parser.add_argument('--verbose', action='store_true', help='Print what TransportAPI logged')
+    args = parser.parse_args()
+
+    failures = run(args)
+    if failures:
+        print(f"\n❌ RESILIENCE CHECKS FAILED:")
+        for failure in failures:
+            print(f"  • {failure}")
+        raise SystemExit(1)
+    print(f"\n✅ All resilience checks passed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# fake_directions_server.py
+# Local stand-in for the Google Directions API with configurable latency and errors
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.directions_fixture import make_directions_json
+from llm_client import LATENCY_DISTRIBUTIONS, sample_latency
+
+class FakeDirectionsServer:
+    """
+    Threaded HTTP server answering /maps/api/directions/json like the real API.
+
+    Each origin/destination pair maps to one of a few pre-serialized
+    responses, so serving costs no more than a real response body would.
+    Latency follows the chosen distribution. A fraction of requests fails,
+    split between HTTP 500s and OVER_QUERY_LIMIT bodies, which are the two
+    failure shapes TransportAPI has to handle.
+
+    Usage:
+        with FakeDirectionsServer(latency=0.08) as server:
+            api.google_maps_base_url = server.url
+    """
+
+    def __init__(self, latency: float = 0.08, jitter: float = 0.5, distribution: str = 'lognormal',
+                 error_rate: float = 0.0, variants: int = 8, routes: int = 4,
+                 host: str = '127.0.0.1', port: int = 0, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.distribution = distribution
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stats: Dict[str, int] = {'requests': 0, 'ok': 0, 'http_errors': 0, 'api_errors': 0}
+        self.unavailable = False
+        self._bodies = [make_directions_json(routes=routes, seed=variant) for variant in range(variants)]
+        self._error_body = json.dumps({
+            'error_message': 'You have exceeded your rate-limit for this API.',
+            'routes': [],
+            'status': 'OVER_QUERY_LIMIT'
+        }).encode('utf-8')
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                server._handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        # The listen backlog must be raised before listen(), or bursts of new
+        # connections overflow it and stall for a SYN retransmit (about 1 s)
+        self._httpd = ThreadingHTTPServer((host, port), Handler, bind_and_activate=False)
+        self._httpd.daemon_threads = True
+        self._httpd.request_queue_size = 1024
+        try:
+            self._httpd.server_bind()
+            self._httpd.server_activate()
+        except OSError:
+            self._httpd.server_close()
+            raise
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/maps/api/directions/json"
+
+    def _count(self, key: str) -> None:
+        with self._stats_lock:
+            self.stats['requests'] += 1
+            self.stats[key] += 1
+
+    def _handle(self, handler: BaseHTTPRequestHandler) -> None:
+        with self._rng_lock:
+            delay = sample_latency(self._rng, self.latency, self.jitter, self.distribution)
+            roll = self._rng.random()
+        time.sleep(delay)
+
+        if self.unavailable or roll < self.error_rate / 2:
+            self._count('http_errors')
+            self._send(handler, 500, b'{"status": "UNKNOWN_ERROR"}')
+            return
+        if roll < self.error_rate:
+            self._count('api_errors')
+            self._send(handler, 200, self._error_body)
+            return
+
+        query = parse_qs(urlparse(handler.path).query)
+        pair = f"{query.get('origin', [''])[0]}|{query.get('destination', [''])[0]}"
+        variant = int(hashlib.md5(pair.encode('utf-8')).hexdigest(), 16) % len(self._bodies)
+        self._count('ok')
+        self._send(handler, 200, self._bodies[variant])
+
+    @staticmethod
+    def _send(handler: BaseHTTPRequestHandler, status: int, body: bytes) -> None:
+        handler.send_response(status)
+        handler.send_header('Content-Type', 'application/json; charset=UTF-8')
+        handler.send_header('Content-Length', str(len(body)))
+        handler.end_headers()
+        try:
+            handler.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # The client timed out and hung up
+
+    def start(self) -> 'FakeDirectionsServer':
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self) -> 'FakeDirectionsServer':
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a local fake Google Directions API')
+    parser.add_argument('--port', type=int, default=8765, help='Port to listen on')
+    parser.add_argument('--latency', type=float, default=0.08, help='Median/mean response latency in seconds')
+    parser.add_argument('--jitter', type=float, default=0.5, help='Spread (see llm_client.sample_latency)')
+    parser.add_argument('--distribution', choices=LATENCY_DISTRIBUTIONS, default='lognormal', help='Latency distribution')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests that fail')
+    args = parser.parse_args()
+
+    server = FakeDirectionsServer(args.latency, args.jitter, args.distribution, args.error_rate, port=args.port)
+    print(f"🗺️ Fake Directions API on {server.url} (Ctrl+C to stop)")
+    try:
+        server.start()._thread.join()
+    except KeyboardInterrupt:
+        server.stop()
+
+if __name__ == "__main__":
+    main()
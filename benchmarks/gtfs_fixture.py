@@ -0,0 +1,66 @@
+# gtfs_fixture.py
+# Deterministic GTFS static feeds (a street grid of bus and metro lines) for offline benchmarks
+
+import csv
+import io
+import zipfile
+from typing import Dict, List
+
+def stop_name(row: int, column: int) -> str:
+    return f"Street {row + 1} & Avenue {column + 1}"
+
+def _clock(seconds: int) -> str:
+    return f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+def _csv(rows: List[Dict]) -> str:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(rows[0]))
+    writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+def make_gtfs_feed(path: str, grid: int = 30, headway_minutes: int = 10, hop_minutes: int = 2,
+                   first_departure: str = '05:00:00', last_departure: str = '23:30:00') -> Dict[str, int]:
+    """
+    Write a GTFS zip for a grid × grid street grid about 550 m apart.
+
+    Every street has a bus line and every avenue a metro line, both ways,
+    running every headway_minutes all week; lines cross at shared stops.
+
+    Returns:
+        Counts of stops, routes, trips and stop_times written
+    """
+    first = sum(int(part) * unit for part, unit in zip(first_departure.split(':'), (3600, 60, 1)))
+    last = sum(int(part) * unit for part, unit in zip(last_departure.split(':'), (3600, 60, 1)))
+    stops = [
+        {'stop_id': f"S{row}-{column}", 'stop_name': stop_name(row, column),
+         'stop_lat': f"{40.70 + row * 0.005:.6f}", 'stop_lon': f"{-74.02 + column * 0.0065:.6f}"}
+        for row in range(grid) for column in range(grid)
+    ]
+    routes, trips, stop_times = [], [], []
+    lines = [('B', index, 3, f"Street {index + 1} Bus") for index in range(grid)]
+    lines += [('M', index, 1, f"Avenue {index + 1} Metro") for index in range(grid)]
+    for kind, index, route_type, name in lines:
+        route_id = f"{kind}{index + 1}"
+        routes.append({'route_id': route_id, 'route_short_name': route_id, 'route_long_name': name,
+                       'route_type': route_type})
+        path_stops = [f"S{index}-{step}" if kind == 'B' else f"S{step}-{index}" for step in range(grid)]
+        for direction, sequence in enumerate((path_stops, path_stops[::-1])):
+            for departure in range(first, last + 1, headway_minutes * 60):
+                trip_id = f"{route_id}-{direction}-{departure}"
+                trips.append({'route_id': route_id, 'service_id': 'ALL', 'trip_id': trip_id,
+                              'trip_headsign': stop_name(*map(int, sequence[-1][1:].split('-')))})
+                for position, stop_id in enumerate(sequence):
+                    clock = _clock(departure + position * hop_minutes * 60)
+                    stop_times.append({'trip_id': trip_id, 'arrival_time': clock, 'departure_time': clock,
+                                       'stop_id': stop_id, 'stop_sequence': position + 1})
+
+    calendar = [{'service_id': 'ALL', 'monday': 1, 'tuesday': 1, 'wednesday': 1, 'thursday': 1, 'friday': 1,
+                 'saturday': 1, 'sunday': 1, 'start_date': '20000101', 'end_date': '20991231'}]
+    agency = [{'agency_id': 'TB', 'agency_name': 'TravelBuddy Transit', 'agency_url': 'https://example.com',
+               'agency_timezone': 'America/New_York'}]
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as feed:
+        for name, rows in (('agency.txt', agency), ('stops.txt', stops), ('routes.txt', routes),
+                           ('trips.txt', trips), ('stop_times.txt', stop_times), ('calendar.txt', calendar)):
+            feed.writestr(name, _csv(rows))
+    return {'stops': len(stops), 'routes': len(routes), 'trips': len(trips), 'stop_times': len(stop_times)}
@@ -0,0 +1,83 @@
+# gtfs_realtime_fixture.py
+# Deterministic GTFS-Realtime feeds (protobuf JSON mapping) for offline benchmarks
+
+import random
+import time
+from typing import Dict, List, Optional
+
+OCCUPANCY = ['MANY_SEATS_AVAILABLE', 'FEW_SEATS_AVAILABLE', 'STANDING_ROOM_ONLY', 'FULL']
+
+def trip_update(trip_id: str, route_id: str, delay: int, departure: int, cancelled: bool = False) -> Dict:
+    trip = {'tripId': trip_id, 'routeId': route_id}
+    if cancelled:
+        trip['scheduleRelationship'] = 'CANCELED'
+    return {'id': f"tu-{trip_id}", 'tripUpdate': {
+        'trip': trip,
+        'stopTimeUpdate': [{'stopSequence': 5, 'stopId': f"S{trip_id}-5",
+                            'departure': {'delay': delay, 'time': str(departure)}}]
+    }}
+
+def vehicle_position(trip_id: str, route_id: str, vehicle: str, occupancy: str, rng: random.Random) -> Dict:
+    return {'id': f"vp-{trip_id}", 'vehicle': {
+        'trip': {'tripId': trip_id, 'routeId': route_id},
+        'vehicle': {'id': vehicle},
+        'position': {'latitude': 40.7 + rng.uniform(-0.1, 0.1), 'longitude': -74.0 + rng.uniform(-0.1, 0.1)},
+        'occupancyStatus': occupancy
+    }}
+
+def service_alert(alert_id: str, route_ids: List[str], stop_ids: List[str], start: Optional[int], end: Optional[int],
+                  effect: str = 'SIGNIFICANT_DELAYS', severity: str = 'WARNING', text: str = '') -> Dict:
+    period = {}
+    if start is not None:
+        period['start'] = str(start)
+    if end is not None:
+        period['end'] = str(end)
+    return {'id': alert_id, 'alert': {
+        'activePeriod': [period],
+        'informedEntity': [{'routeId': route_id} for route_id in route_ids] + [{'stopId': stop_id} for stop_id in stop_ids],
+        'effect': effect,
+        'severityLevel': severity,
+        'headerText': {'translation': [{'text': text or f"Alert {alert_id}", 'language': 'en'}]}
+    }}
+
+class FeedGenerator:
+    """
+    A fleet of trips whose real-time feeds change a little between snapshots.
+
+    full_feed() is a FULL_DATASET snapshot of every trip; mutate() changes
+    a fraction of the trips and returns them as a DIFFERENTIAL feed.
+    """
+
+    def __init__(self, trips: int = 10000, routes: int = 300, seed: int = 0, now: Optional[int] = None):
+        self.rng = random.Random(seed)
+        self.now = now or int(time.time())
+        self.trips = [
+            {'trip_id': f"T{index}", 'route_id': f"R{index % routes}", 'vehicle': f"V{index}",
+             'delay': self.rng.choice([0, 0, 60, 120, 300, -60]), 'occupancy': self.rng.choice(OCCUPANCY),
+             'departure': self.now + self.rng.randint(60, 1800), 'cancelled': self.rng.random() < 0.01}
+            for index in range(trips)
+        ]
+
+    def _entities(self, trips: List[Dict]) -> List[Dict]:
+        entities = []
+        for trip in trips:
+            entities.append(trip_update(trip['trip_id'], trip['route_id'], trip['delay'], trip['departure'],
+                                        trip['cancelled']))
+            entities.append(vehicle_position(trip['trip_id'], trip['route_id'], trip['vehicle'], trip['occupancy'],
+                                             random.Random(trip['trip_id'])))
+        return entities
+
+    def full_feed(self) -> Dict:
+        return {'header': {'gtfsRealtimeVersion': '2.0', 'incrementality': 'FULL_DATASET',
+                           'timestamp': str(self.now)},
+                'entity': self._entities(self.trips)}
+
+    def mutate(self, fraction: float = 0.05) -> Dict:
+        changed = self.rng.sample(self.trips, max(1, int(len(self.trips) * fraction)))
+        for trip in changed:
+            trip['delay'] += self.rng.choice([-60, 0, 60, 120])
+            trip['occupancy'] = self.rng.choice(OCCUPANCY)
+        self.now += 30
+        return {'header': {'gtfsRealtimeVersion': '2.0', 'incrementality': 'DIFFERENTIAL',
+                           'timestamp': str(self.now)},
+                'entity': self._entities(changed)}
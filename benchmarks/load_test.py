@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Load test: the simplify and transport paths at 50-500 concurrent users, offline.
+
+Virtual users replay a request mix built from the sections of
+data/raw_tourist_texts and a list of origin/destination pairs. Each user
+runs one request at a time, back to back, for the test duration. Model calls
+go to the fake LLM backend and Directions calls go to a local fake
+Directions server. Both have configurable latency distributions and error
+rates.
+
+For every stage the test reports throughput and p50/p95/p99 latency:
+- simplify path: compact, simplify (model), validate, improve (model)
+- transport path: directions, realtime, ranking, explain (model)
+
+Use the numbers to size LLM concurrency, the transport worker pool and caches.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import dataclasses
+import io
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_directions_server import FakeDirectionsServer
+from chunking import split_document
+from llm_client import LATENCY_DISTRIBUTIONS, FakeBackend, LLMClient
+from prompts import get_real_time_transport_prompt, resolve_content_type
+from simplifier import improve, load_data_files, simplify
+from text_compaction import compact_text
+from transport_api import TransportAPI
+from validator import validate_simplification
+
+ROUTE_PAIRS = [
+    ('Times Square, New York', 'JFK Airport, New York'),
+    ('Grand Central Terminal, New York', 'Brooklyn Bridge, New York'),
+    ('Central Park, New York', 'Statue of Liberty Ferry, New York'),
+    ('Heathrow Airport, London', 'King\'s Cross Station, London'),
+    ('Tower of London', 'British Museum, London'),
+    ('Shinjuku Station, Tokyo', 'Asakusa, Tokyo'),
+    ('Narita Airport, Tokyo', 'Tokyo Station'),
+    ('Gare du Nord, Paris', 'Eiffel Tower, Paris'),
+    ('Charles de Gaulle Airport, Paris', 'Louvre Museum, Paris'),
+    ('Sagrada Familia, Barcelona', 'Barcelona El Prat Airport'),
+    ('Alexanderplatz, Berlin', 'Berlin Brandenburg Airport'),
+    ('Colosseum, Rome', 'Roma Termini')
+]
+
+PREFERENCES = [
+    None,
+    {'transport_types': ['subway', 'train']},
+    {'transport_types': ['bus'], 'cost': 'low'}
+]
+
+class StageRecorder:
+    """Thread-safe latency samples and error counts per stage"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def record(self, stage: str, seconds: float, error: bool = False) -> None:
+        with self._lock:
+            self.samples[stage].append(seconds)
+            if error:
+                self.errors[stage] += 1
+
+    @contextlib.contextmanager
+    def time(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.record(stage, time.perf_counter() - start, error=True)
+            raise
+        self.record(stage, time.perf_counter() - start)
+
+    def wrap(self, stage: str, fn: Callable) -> Callable:
+        """Time every call of a (thread-side) function under a stage name."""
+        def timed(*args, **kwargs):
+            with self.time(stage):
+                return fn(*args, **kwargs)
+        return timed
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+def summarize(recorder: StageRecorder, elapsed: float) -> Dict[str, Dict]:
+    summary = {}
+    for stage, values in recorder.samples.items():
+        values = sorted(values)
+        summary[stage] = {
+            'count': len(values),
+            'errors': recorder.errors.get(stage, 0),
+            'throughput': len(values) / elapsed,
+            'p50_ms': percentile(values, 0.50) * 1000,
+            'p95_ms': percentile(values, 0.95) * 1000,
+            'p99_ms': percentile(values, 0.99) * 1000,
+            'max_ms': values[-1] * 1000
+        }
+    return summary
+
+def build_text_pool() -> List[Dict]:
+    """Chat-sized simplify requests: one per section of each data file."""
+    pool = []
+    for item in load_data_files():
+        for section in split_document(item['text']).sections:
+            pool.append({'text': section.text, 'type': item['type']})
+    return pool
+
+async def simplify_request(client: LLMClient, recorder: StageRecorder, item: Dict) -> None:
+    with recorder.time('simplify.compact'):
+        compaction = compact_text(item['text'])
+        content_type = resolve_content_type(compaction.text, item['type'])
+    with recorder.time('simplify.model'):
+        simplified_text = await simplify(client, compaction.text, content_type)
+    with recorder.time('simplify.validate'):
+        report = validate_simplification(compaction.text, simplified_text, content_type)
+    if not report.passed:
+        with recorder.time('simplify.improve'):
+            await improve(client, compaction.text, simplified_text, report)
+
+def transport_routes(api: TransportAPI, origin: str, destination: str, preferences) -> str:
+    """Thread-side part of a transport request: routes plus the explanation prompt."""
+    routes = api.find_best_routes(origin, destination, preferences)
+    routes_data = json.dumps([dataclasses.asdict(route) for route in routes])
+    return get_real_time_transport_prompt(origin, destination, routes_data)
+
+async def transport_request(client: LLMClient, api: TransportAPI, executor: ThreadPoolExecutor,
+                            recorder: StageRecorder, rng: random.Random) -> None:
+    origin, destination = rng.choice(ROUTE_PAIRS)
+    loop = asyncio.get_running_loop()
+    with recorder.time('transport.routes'):
+        prompt = await loop.run_in_executor(executor, transport_routes, api, origin, destination, rng.choice(PREFERENCES))
+    with recorder.time('transport.explain'):
+        await client.generate(prompt)
+
+async def virtual_user(user_id: int, deadline: float, client: LLMClient, api: TransportAPI,
+                       executor: ThreadPoolExecutor, recorder: StageRecorder, texts: List[Dict],
+                       transport_share: float, think_time: float, seed: int) -> None:
+    rng = random.Random(seed * 100003 + user_id)
+    # Stagger start so users do not arrive in lockstep
+    await asyncio.sleep(rng.uniform(0, min(0.5, max(think_time, 0.05))))
+    while time.perf_counter() < deadline:
+        is_transport = rng.random() < transport_share
+        path = 'transport' if is_transport else 'simplify'
+        start = time.perf_counter()
+        try:
+            if is_transport:
+                await transport_request(client, api, executor, recorder, rng)
+            else:
+                await simplify_request(client, recorder, rng.choice(texts))
+            recorder.record(f"{path}.request", time.perf_counter() - start)
+        except Exception:
+            recorder.record(f"{path}.request", time.perf_counter() - start, error=True)
+        if think_time:
+            await asyncio.sleep(rng.expovariate(1 / think_time))
+
+async def run_level(users: int, args, directions_url: str, texts: List[Dict]) -> Dict:
+    """Run one concurrency level and return its stage summary."""
+    recorder = StageRecorder()
+    backend = FakeBackend(latency=args.llm_latency, jitter=args.llm_jitter, error_rate=args.llm_error_rate,
+                          seed=args.seed, distribution=args.llm_distribution)
+    client = LLMClient(backend, max_concurrency=args.llm_concurrency, timeout=args.timeout,
+                       max_retries=args.max_retries, backoff_base=args.backoff_base)
+
+    api = TransportAPI()
+    api.google_maps_api_key = 'fake-key'
+    api.google_maps_base_url = directions_url
+    # Time the inner steps of find_best_routes without changing its flow
+    api.get_google_maps_routes = recorder.wrap('transport.directions', api.get_google_maps_routes)
+    api.get_real_time_info_batch = recorder.wrap('transport.realtime', api.get_real_time_info_batch)
+    api._sort_routes_by_preferences = recorder.wrap('transport.ranking', api._sort_routes_by_preferences)
+
+    executor = ThreadPoolExecutor(max_workers=args.transport_workers or users)
+    start = time.perf_counter()
+    deadline = start + args.duration
+    try:
+        await asyncio.gather(*(
+            virtual_user(user_id, deadline, client, api, executor, recorder, texts,
+                         args.transport_share, args.think_time, args.seed)
+            for user_id in range(users)
+        ))
+    finally:
+        executor.shutdown(wait=True)
+    elapsed = time.perf_counter() - start
+
+    return {'users': users, 'elapsed_seconds': elapsed, 'llm_calls': backend.calls,
+            'directions_breaker': dataclasses.asdict(api.directions_breaker.stats),
+            'stages': summarize(recorder, elapsed)}
+
+def print_level(result: Dict, server_stats: Dict) -> None:
+    requests_done = sum(result['stages'].get(f"{path}.request", {}).get('count', 0) for path in ('simplify', 'transport'))
+    print(f"\n👥 {result['users']} users: {requests_done} requests in {result['elapsed_seconds']:.1f}s "
+          f"({requests_done / result['elapsed_seconds']:.1f} req/s), {result['llm_calls']} model calls, "
+          f"Directions {server_stats['requests']} calls / {server_stats['http_errors'] + server_stats['api_errors']} failed")
+    breaker = result['directions_breaker']
+    print(f"   Directions circuit {breaker['state']}: opened {breaker['opened']}x, "
+          f"{breaker['rejected']} calls served from fallback")
+    print(f"   {'stage':<22} {'count':>7} {'err':>5} {'ops/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for stage in sorted(result['stages']):
+        row = result['stages'][stage]
+        print(f"   {stage:<22} {row['count']:>7} {row['errors']:>5} {row['throughput']:>8.1f} "
+              f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f} {row['max_ms']:>9.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test the simplify and transport paths against local fakes')
+    parser.add_argument('--users', type=int, nargs='+', default=[50, 100, 500], help='Concurrency levels to run, in order')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds per concurrency level')
+    parser.add_argument('--transport-share', type=float, default=0.3, help='Fraction of requests on the transport path')
+    parser.add_argument('--think-time', type=float, default=0.0, help='Mean pause between a user\'s requests, in seconds')
+    parser.add_argument('--llm-latency', type=float, default=0.4, help='Fake model latency (median for lognormal)')
+    parser.add_argument('--llm-jitter', type=float, default=0.4, help='Fake model latency spread')
+    parser.add_argument('--llm-distribution', choices=LATENCY_DISTRIBUTIONS, default='lognormal')
+    parser.add_argument('--llm-error-rate', type=float, default=0.01, help='Fraction of model calls that fail')
+    parser.add_argument('--llm-concurrency', type=int, default=64, help='LLMClient concurrency limit')
+    parser.add_argument('--timeout', type=float, default=30.0, help='Per model call timeout')
+    parser.add_argument('--max-retries', type=int, default=3, help='Model call retries')
+    parser.add_argument('--backoff-base', type=float, default=0.1, help='Model retry backoff base in seconds')
+    parser.add_argument('--directions-latency', type=float, default=0.08, help='Fake Directions latency (median for lognormal)')
+    parser.add_argument('--directions-jitter', type=float, default=0.5, help='Fake Directions latency spread')
+    parser.add_argument('--directions-distribution', choices=LATENCY_DISTRIBUTIONS, default='lognormal')
+    parser.add_argument('--directions-error-rate', type=float, default=0.02, help='Fraction of Directions calls that fail')
+    parser.add_argument('--transport-workers', type=int, help='Threads for transport calls (default: one per user)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for the request mix and fakes')
+    parser.add_argument('--output', type=str, help='Write all results to this JSON file')
+    args = parser.parse_args()
+
+    texts = build_text_pool()
+    print(f"🚀 Load test: {len(texts)} texts, {len(ROUTE_PAIRS)} route pairs, "
+          f"{args.transport_share * 100:.0f}% transport, {args.duration:.0f}s per level")
+
+    # TransportAPI prints a line per failed Directions call; the server counts failures instead
+    logging.getLogger('urllib3').setLevel(logging.ERROR)
+    results = []
+    for users in args.users:
+        server = FakeDirectionsServer(args.directions_latency, args.directions_jitter, args.directions_distribution,
+                                      args.directions_error_rate, seed=args.seed)
+        with server, contextlib.redirect_stdout(io.StringIO()):
+            result = asyncio.run(run_level(users, args, server.url, texts))
+        result['directions_server'] = dict(server.stats)
+        results.append(result)
+        print_level(result, server.stats)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump({'config': vars(args), 'levels': results}, file, indent=2)
+        print(f"\n💾 Saved {args.output}")
+
+if __name__ == "__main__":
+    main()
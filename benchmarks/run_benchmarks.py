@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite: throughput and memory of the prompt and transport hot paths.
+
+Every case runs offline (mock routes, a generated Directions response, no
+API keys). For each case the suite reports:
+- ops/sec: best of several timed rounds
+- peak memory per op: tracemalloc peak above the baseline during one call
+- retained blocks per op: memory blocks still allocated after a call, which
+  should be about 0 for code that is not caching or leaking (temporary
+  allocations freed within the call are not counted)
+
+Results are written as JSON, and --compare flags cases that got slower than
+a saved run, so regressions can be tracked from commit to commit.
+"""
+
+import argparse
+import contextlib
+import dataclasses
+import gc
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.directions_fixture import make_directions_json
+from geocoding import Geocoder
+from route_cache import RouteCache
+from prompts import clear_prompt_cache, get_real_time_transport_prompt, get_simplification_prompt
+from transport_api import TransportAPI
+
+DEFAULT_RESULTS_DIR = os.path.join(ROOT, '.cache', 'benchmarks')
+
+def _quiet(fn: Callable) -> Callable:
+    """Wrap a call that prints (mock data warnings) so output does not skew timings."""
+    def call():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return fn()
+    return call
+
+def build_cases(directions_path: str = None) -> Dict[str, Callable[[], object]]:
+    """Create the benchmark cases, each a zero-argument callable."""
+    with open(os.path.join(ROOT, 'data', 'raw_tourist_texts', 'public_transport_instructions.txt'), 'r', encoding='utf-8') as file:
+        transport_text = file.read()
+
+    if directions_path:
+        with open(directions_path, 'rb') as file:
+            directions_json = file.read()
+    else:
+        directions_json = make_directions_json(routes=40, transit_steps=4)
+    directions = json.loads(directions_json)
+
+    api = TransportAPI()
+    api.google_maps_api_key = None  # find_best_routes uses mock routes
+    parsed_routes = api._parse_directions_routes(directions)
+    parsed_batch = api._parse_directions_batch(directions)
+    mock_routes = api.get_mock_routes('Times Square', 'JFK Airport')
+    routes_data = json.dumps([dataclasses.asdict(route) for route in mock_routes], indent=2)
+    preferences = {'transport_types': ['subway', 'train'], 'cost': 'low'}
+
+    class OfflineGeolocator:
+        def geocode(self, name):
+            return None
+
+    geocoder = Geocoder(OfflineGeolocator, disk_path=None)
+    geocoder.geocode('Times Square')
+
+    # One bucket for the whole run, so the hot pair never expires mid-benchmark
+    route_cache = RouteCache(bucket_seconds=10 ** 9, ttl_seconds=float('inf'))
+    route_cache.get_or_fetch(route_cache.key('Times Square', 'JFK Airport'), lambda: parsed_batch.take(range(12)))
+
+    def offline_fetch():
+        raise RuntimeError('benchmark route cache missed')
+
+    def prompt_cold():
+        clear_prompt_cache()
+        return get_simplification_prompt(transport_text, 'public_transport')
+
+    return {
+        'simplification_prompt_cold': prompt_cold,
+        'simplification_prompt_warm': lambda: get_simplification_prompt(transport_text, 'public_transport'),
+        'real_time_transport_prompt': lambda: get_real_time_transport_prompt('Times Square', 'JFK Airport', routes_data),
+        'sort_routes_by_preferences': lambda: api._sort_routes_by_preferences(parsed_routes, preferences),
+        'find_best_routes_mock': _quiet(lambda: api.find_best_routes('Times Square', 'JFK Airport', preferences)),
+        'route_cache_hit': lambda: route_cache.get_or_fetch(route_cache.key('times square', 'JFK Airport'), offline_fetch),
+        'geocode_cache_hit': lambda: geocoder.geocode('times  square'),
+        'directions_json_decode': lambda: json.loads(directions_json),
+        'directions_parse_routes': lambda: api._parse_directions_routes(directions),
+        'directions_parse_batch': lambda: api._parse_directions_batch(directions),
+        'route_batch_views': parsed_batch.to_routes,
+        'directions_decode_and_parse': lambda: api._parse_directions_routes(json.loads(directions_json))
+    }
+
+def measure_speed(fn: Callable, min_time: float, rounds: int) -> Dict:
+    """Calibrate a loop count that runs for about min_time, then keep the best of several rounds."""
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        loops *= 2 if elapsed < min_time / 4 else 1 + int(min_time / max(elapsed, 1e-9))
+
+    timings = [elapsed / loops]
+    for _ in range(rounds - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        timings.append((time.perf_counter() - start) / loops)
+    best = min(timings)
+    return {'ops_per_sec': 1 / best, 'mean_us': best * 1e6, 'loops': loops}
+
+def measure_memory(fn: Callable, calls: int = 50) -> Dict:
+    """Peak traced memory of one call and memory blocks still allocated per call afterwards."""
+    fn()  # Warm caches so one-time setup is not counted
+    gc.collect()
+
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    gc.collect()
+    blocks_before = sys.getallocatedblocks()
+    for _ in range(calls):
+        fn()
+    gc.collect()
+    blocks_after = sys.getallocatedblocks()
+
+    return {
+        'peak_kib_per_op': (peak - baseline) / 1024,
+        'retained_blocks_per_op': (blocks_after - blocks_before) / calls
+    }
+
+def run_suite(cases: Dict[str, Callable], min_time: float, rounds: int, selected: List[str] = None) -> Dict:
+    results = {}
+    for name, fn in cases.items():
+        if selected and not any(pattern in name for pattern in selected):
+            continue
+        random.seed(0)
+        results[name] = {**measure_speed(fn, min_time, rounds), **measure_memory(fn)}
+        result = results[name]
+        print(f"  {name:<30} {result['ops_per_sec']:>12,.0f} ops/s  {result['mean_us']:>10.2f} µs  "
+              f"peak {result['peak_kib_per_op']:>9.1f} KiB  retained {result['retained_blocks_per_op']:>7.1f} blocks")
+    return results
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def compare_results(baseline: Dict, current: Dict, threshold: float) -> List[str]:
+    """Cases whose ops/sec dropped by more than threshold (a fraction) against the baseline."""
+    regressions = []
+    for name, result in current['results'].items():
+        before = baseline['results'].get(name)
+        if not before:
+            continue
+        change = result['ops_per_sec'] / before['ops_per_sec'] - 1
+        marker = '❌' if change < -threshold else '✅'
+        print(f"  {marker} {name:<30} {change * 100:+6.1f}% ops/s")
+        if change < -threshold:
+            regressions.append(f"{name}: {before['ops_per_sec']:,.0f} → {result['ops_per_sec']:,.0f} ops/s")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the offline TravelBuddy benchmark suite')
+    parser.add_argument('--min-time', type=float, default=0.2, help='Seconds per timed round')
+    parser.add_argument('--rounds', type=int, default=5, help='Timed rounds per case (best is kept)')
+    parser.add_argument('--only', nargs='*', help='Run only cases whose name contains one of these strings')
+    parser.add_argument('--directions', type=str, help='Recorded Directions API JSON to parse instead of the generated one')
+    parser.add_argument('--output', type=str, help='Results file (default: .cache/benchmarks/<commit>.json)')
+    parser.add_argument('--compare', type=str, help='Earlier results file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10, help='Allowed ops/sec drop as a fraction')
+    args = parser.parse_args()
+
+    commit = _git_commit()
+    print(f"🏁 Benchmarks at {commit} on Python {platform.python_version()}")
+    results = run_suite(build_cases(args.directions), args.min_time, args.rounds, args.only)
+
+    report = {
+        'commit': commit,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results
+    }
+    output = args.output or os.path.join(DEFAULT_RESULTS_DIR, f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=2)
+    print(f"💾 Saved {output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as file:
+            baseline = json.load(file)
+        print(f"\n📊 Against {baseline.get('commit', args.compare)}:")
+        regressions = compare_results(baseline, report, args.threshold)
+        if regressions:
+            print(f"\n❌ THROUGHPUT REGRESSIONS:")
+            for regression in regressions:
+                print(f"  • {regression}")
+            raise SystemExit(1)
+        print(f"\n✅ No case slowed down by more than {args.threshold * 100:.0f}%")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# chunking.py
+# Section-aware splitting of long tourist documents
+
+import re
+from dataclasses import dataclass
+from typing import List, Optional
+
+# Upper-case header lines such as "TOKYO METRO (Japan):" or
+# "LE BERNARDIN (New York, USA) - FINE DINING:"; parenthesized parts may be mixed case
+_PARENTHESIZED = re.compile(r'\([^)]*\)')
+_PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+
+@dataclass
+class Section:
+    """One independently simplifiable part of a document"""
+    index: int
+    title: str
+    body: str
+    
+    @property
+    def text(self) -> str:
+        return f"{self.title}\n{self.body}" if self.title else self.body
+
+@dataclass
+class Document:
+    """A document split into ordered sections"""
+    title: str
+    sections: List[Section]
+
+def is_section_header(line: str) -> bool:
+    """Check whether a line is an upper-case section header ending in a colon."""
+    line = line.strip()
+    if not line.endswith(':'):
+        return False
+    letters = [c for c in _PARENTHESIZED.sub('', line) if c.isalpha()]
+    return len(letters) >= 3 and all(c.isupper() for c in letters)
+
+def _split_paragraphs(text: str, max_chars: int) -> List[str]:
+    """Pack paragraphs into pieces of at most max_chars (a single longer paragraph stays whole)."""
+    pieces = []
+    current = ''
+    for paragraph in _PARAGRAPH_BREAK.split(text.strip()):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if current and len(current) + len(paragraph) + 2 > max_chars:
+            pieces.append(current)
+            current = paragraph
+        else:
+            current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current:
+        pieces.append(current)
+    return pieces
+
+def split_document(text: str, max_section_chars: Optional[int] = 4000) -> Document:
+    """
+    Split a document on its upper-case section headers.
+    
+    A short leading line before the first header is treated as the document
+    title. Documents without headers, and sections longer than
+    max_section_chars, are split on paragraph boundaries instead.
+    
+    Args:
+        text: Document text
+        max_section_chars: Size above which a section is split further (None to disable)
+    
+    Returns:
+        Document with its title and ordered sections
+    """
+    preamble: List[str] = []
+    raw_sections = []
+    for line in text.strip().splitlines():
+        if is_section_header(line):
+            raw_sections.append([line.strip(), []])
+        elif raw_sections:
+            raw_sections[-1][1].append(line)
+        else:
+            preamble.append(line)
+    
+    preamble_text = '\n'.join(preamble).strip()
+    title = ''
+    if preamble_text and '\n' not in preamble_text and len(preamble_text.split()) <= 12:
+        title = preamble_text
+    elif preamble_text:
+        raw_sections.insert(0, ['', preamble_text.splitlines()])
+    
+    sections: List[Section] = []
+    for header, lines in raw_sections:
+        body = '\n'.join(lines).strip()
+        if max_section_chars and len(body) > max_section_chars:
+            pieces = _split_paragraphs(body, max_section_chars)
+        else:
+            pieces = [body]
+        for piece in pieces:
+            sections.append(Section(index=len(sections), title=header, body=piece))
+    
+    if not sections and text.strip():
+        for piece in _split_paragraphs(text, max_section_chars or len(text)):
+            sections.append(Section(index=len(sections), title='', body=piece))
+    
+    return Document(title=title, sections=sections)
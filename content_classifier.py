@@ -0,0 +1,137 @@
+# content_classifier.py
+# Local content-type classifier for automatic prompt selection
+
+import math
+import os
+import re
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from chunking import split_document
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'raw_tourist_texts')
+
+# Content type for each bundled data file
+DATA_FILE_CONTENT_TYPES = {
+    'public_transport_instructions.txt': 'public_transport',
+    'museum_exhibit_descriptions.txt': 'museum_exhibit',
+    'restaurant_menus.txt': 'restaurant_menu',
+    'local_laws_customs.txt': 'cultural_customs',
+    'emergency_contact_safety.txt': 'emergency_safety'
+}
+
+# Hand-picked keywords per type, added to the training data so short
+# inputs that share no vocabulary with the data files still classify
+SEED_KEYWORDS = {
+    'public_transport': 'train bus subway metro line station platform ticket fare transfer airport route stop tram card tap',
+    'museum_exhibit': 'museum exhibit painting gallery artist sculpture century collection portrait art ancient artifact',
+    'restaurant_menu': 'menu dish course served sauce restaurant dessert tasting chef cuisine price wine flavor',
+    'cultural_customs': 'custom law tipping illegal fine etiquette dress respect culture religious tradition rude polite',
+    'emergency_safety': 'emergency police ambulance hospital dial safety fire danger medical insurance disaster help'
+}
+
+FALLBACK_CONTENT_TYPE = 'general'
+
+_TOKEN_PATTERN = re.compile(r"[^\W\d_]{3,}")
+_STOPWORDS = frozenset("""
+the and for with are from that this you your can not but all any has have was were will its into
+per also may more most other such than then there these they when where which while who why how
+about after before being both each few over only same some very just our out off own his her him
+""".split())
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased word tokens of three or more letters, without stopwords."""
+    return [token for token in _TOKEN_PATTERN.findall(text.lower()) if token not in _STOPWORDS]
+
+class ContentClassifier:
+    """
+    TF-IDF nearest-centroid classifier over PROMPT_CONFIGS content types.
+    
+    Each type is represented by the normalized centroid of its training
+    documents. Centroid weights are stored in an inverted index, so scoring
+    a text only touches the tokens it contains.
+    """
+    
+    def __init__(self, min_score: float = 0.05):
+        self.min_score = min_score
+        self.idf: Dict[str, float] = {}
+        self._index: Dict[str, List[Tuple[str, float]]] = {}
+        self.content_types: List[str] = []
+    
+    def fit(self, documents: Iterable[Tuple[str, str]]) -> 'ContentClassifier':
+        """Train on (text, content_type) pairs."""
+        token_counts = [(Counter(tokenize(text)), content_type) for text, content_type in documents]
+        
+        document_frequency: Counter = Counter()
+        for counts, _ in token_counts:
+            document_frequency.update(counts.keys())
+        total = len(token_counts)
+        self.idf = {token: math.log((1 + total) / (1 + df)) + 1 for token, df in document_frequency.items()}
+        
+        centroids: Dict[str, Counter] = defaultdict(Counter)
+        for counts, content_type in token_counts:
+            vector = self._weigh(counts)
+            for token, weight in vector.items():
+                centroids[content_type][token] += weight
+        
+        index: Dict[str, List[Tuple[str, float]]] = defaultdict(list)
+        for content_type, centroid in centroids.items():
+            norm = math.sqrt(sum(weight * weight for weight in centroid.values())) or 1.0
+            for token, weight in centroid.items():
+                index[token].append((content_type, weight / norm))
+        
+        self._index = dict(index)
+        self.content_types = sorted(centroids)
+        return self
+    
+    def _weigh(self, counts: Counter) -> Dict[str, float]:
+        """Unit-length TF-IDF vector for token counts, ignoring unseen tokens."""
+        vector = {
+            token: (1 + math.log(count)) * self.idf[token]
+            for token, count in counts.items() if token in self.idf
+        }
+        norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1.0
+        return {token: weight / norm for token, weight in vector.items()}
+    
+    def scores(self, text: str) -> Dict[str, float]:
+        """Cosine similarity between the text and each content type's centroid."""
+        totals = dict.fromkeys(self.content_types, 0.0)
+        for token, weight in self._weigh(Counter(tokenize(text))).items():
+            for content_type, centroid_weight in self._index.get(token, ()):
+                totals[content_type] += weight * centroid_weight
+        return totals
+    
+    def predict(self, text: str) -> str:
+        """Most likely content type, or "general" when nothing scores above min_score."""
+        scores = self.scores(text)
+        if not scores:
+            return FALLBACK_CONTENT_TYPE
+        content_type, score = max(scores.items(), key=lambda item: item[1])
+        return content_type if score >= self.min_score else FALLBACK_CONTENT_TYPE
+
+def load_training_documents(data_dir: str = DATA_DIR) -> List[Tuple[str, str]]:
+    """Section-level (text, content_type) training pairs from the data files, plus seed keywords."""
+    documents = []
+    for file_name, content_type in DATA_FILE_CONTENT_TYPES.items():
+        path = os.path.join(data_dir, file_name)
+        if not os.path.exists(path):
+            continue
+        with open(path, 'r', encoding='utf-8') as file:
+            for section in split_document(file.read()).sections:
+                documents.append((section.text, content_type))
+    for content_type, keywords in SEED_KEYWORDS.items():
+        documents.append((keywords, content_type))
+    return documents
+
+_classifier: Optional[ContentClassifier] = None
+
+def get_classifier() -> ContentClassifier:
+    """Return the shared classifier, training it from the data files on first use."""
+    global _classifier
+    if _classifier is None:
+        _classifier = ContentClassifier().fit(load_training_documents())
+    return _classifier
+
+def classify_content_type(text: str) -> str:
+    """Pick the PROMPT_CONFIGS key for a text without calling a model."""
+    return get_classifier().predict(text)
@@ -0,0 +1,250 @@
+# geocoding.py
+# Cached, rate-limited geocoding for TravelBuddy location lookups
+
+import asyncio
+import json
+import os
+import queue
+import re
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import asdict, dataclass, replace
+from typing import Callable, Dict, Iterable, Optional
+
+from result_cache import CacheStats, DiskCache, LRUCache
+from transport_api import Location
+
+DEFAULT_GEOCODE_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'geocoding.sqlite3')
+
+# Nominatim's usage policy allows at most one request per second
+NOMINATIM_RATE_PER_SECOND = 1.0
+
+# Marker cached for names the geocoder could not find, so they are not retried every time
+_NOT_FOUND = object()
+
+def normalize_location_name(name: str) -> str:
+    """Case-fold and collapse whitespace and edge punctuation so spellings of one place share an entry."""
+    return re.sub(r'\s+', ' ', name.casefold()).strip(' ,.;:')
+
+def _named(location: Optional[Location], name: str) -> Optional[Location]:
+    # Cached entries carry the spelling that was looked up first; report the caller's
+    if location is None or location.name == name:
+        return location
+    return replace(location, name=name)
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter.
+    
+    Tokens refill continuously at `rate` per second up to `capacity`; each
+    acquire() takes one token, waiting for it if the bucket is empty.
+    """
+    
+    def __init__(self, rate: float = NOMINATIM_RATE_PER_SECOND, capacity: float = 1.0,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated_at = clock()
+        self._lock = threading.Lock()
+    
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+    
+    def try_acquire(self) -> bool:
+        """Take a token if one is available, without waiting."""
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+    
+    def acquire(self) -> float:
+        """
+        Take a token, waiting until one is available.
+        
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            self._sleep(delay)
+            waited += delay
+
+@dataclass
+class GeocodingStats(CacheStats):
+    """Cache hit/miss counters plus upstream lookup counters"""
+    lookups: int = 0
+    errors: int = 0
+    throttle_wait_seconds: float = 0.0
+
+class Geocoder:
+    """
+    Geocoding front end with a two-tier cache and a rate limiter.
+    
+    Lookups are keyed on the normalized name. Hits come from a memory LRU
+    or the SQLite tier (TTL-bounded). Misses are geocoded one at a time
+    through a token bucket, so the upstream service never sees more than
+    its allowed request rate however many callers there are. Concurrent
+    requests for the same name share one upstream lookup.
+    """
+    
+    def __init__(self, geolocator_factory: Callable[[], object], limiter: Optional[TokenBucket] = None,
+                 memory_entries: int = 1024, disk_path: Optional[str] = DEFAULT_GEOCODE_CACHE_PATH,
+                 ttl_seconds: float = 30 * 24 * 3600, max_disk_entries: int = 100_000):
+        self._geolocator_factory = geolocator_factory
+        self._geolocator = None
+        self.limiter = limiter or TokenBucket()
+        self.memory = LRUCache(memory_entries)
+        self.disk = DiskCache(disk_path, ttl_seconds, max_disk_entries) if disk_path else None
+        self.stats = GeocodingStats()
+        self._stats_lock = threading.Lock()
+        self._pending: Dict[str, Future] = {}
+        self._pending_lock = threading.Lock()
+        self._queue: queue.Queue = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+    
+    def _count(self, field: str, amount=1) -> None:
+        with self._stats_lock:
+            setattr(self.stats, field, getattr(self.stats, field) + amount)
+    
+    def cached(self, name: str):
+        """Return the cached Location, _NOT_FOUND, or None when the name is not cached."""
+        key = normalize_location_name(name)
+        value = self.memory.get(key)
+        if value is not None:
+            self._count('memory_hits')
+            return value
+        
+        if self.disk:
+            stored = self.disk.get(key)
+            if stored is not None:
+                data = json.loads(stored)
+                value = Location(**data) if data else _NOT_FOUND
+                self._count('disk_hits')
+                self.memory.set(key, value)
+                return value
+        return None
+    
+    def _store(self, key: str, location: Optional[Location]) -> None:
+        self.memory.set(key, location if location is not None else _NOT_FOUND)
+        if self.disk:
+            self.disk.set(key, json.dumps(asdict(location) if location is not None else None))
+    
+    def _lookup(self, name: str) -> Optional[Location]:
+        """Geocode one name upstream, respecting the rate limit."""
+        waited = self.limiter.acquire()
+        self._count('throttle_wait_seconds', waited)
+        self._count('lookups')
+        if self._geolocator is None:
+            self._geolocator = self._geolocator_factory()
+        
+        result = self._geolocator.geocode(name)
+        if not result:
+            return None
+        return Location(name=name, latitude=result.latitude, longitude=result.longitude, address=result.address)
+    
+    def _run_worker(self) -> None:
+        while True:
+            key, name, future = self._queue.get()
+            try:
+                location = self._lookup(name)
+                self._store(key, location)
+                future.set_result(location)
+            except Exception as e:
+                # Errors are not cached, so the next request retries
+                self._count('errors')
+                future.set_exception(e)
+            finally:
+                with self._pending_lock:
+                    self._pending.pop(key, None)
+    
+    def submit(self, name: str) -> Future:
+        """
+        Resolve a name, returning a Future.
+        
+        Cache hits return an already completed Future; misses are queued for
+        the rate-limited worker, joining any lookup of the same name already
+        in flight.
+        """
+        value = self.cached(name)
+        if value is not None:
+            future = Future()
+            future.set_result(None if value is _NOT_FOUND else value)
+            return future
+        
+        key = normalize_location_name(name)
+        self._count('misses')
+        with self._pending_lock:
+            future = self._pending.get(key)
+            if future is not None:
+                return future
+            future = self._pending[key] = Future()
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run_worker, name='geocoder', daemon=True)
+                self._worker.start()
+        self._queue.put((key, name, future))
+        return future
+    
+    def geocode(self, name: str) -> Optional[Location]:
+        """Resolve one name to a Location, or None if it cannot be found."""
+        return _named(self.submit(name).result(), name)
+    
+    async def geocode_async(self, name: str) -> Optional[Location]:
+        """Resolve one name without blocking the event loop while a miss waits for the worker."""
+        return _named(await asyncio.wrap_future(self.submit(name)), name)
+    
+    def geocode_many(self, names: Iterable[str], wait: bool = True) -> Dict[str, object]:
+        """
+        Resolve many names, deduplicated by normalized name.
+        
+        Args:
+            names: Location names; repeats and spelling variants are looked up once
+            wait: Wait for queued misses; with False, misses come back as Futures
+        
+        Returns:
+            Dict of each input name to its Location (None if not found), or to
+            a Future for misses still queued when wait is False
+        """
+        futures: Dict[str, Future] = {}
+        by_key: Dict[str, Future] = {}
+        for name in names:
+            key = normalize_location_name(name)
+            if key not in by_key:
+                by_key[key] = self.submit(name)
+            futures[name] = by_key[key]
+        
+        results: Dict[str, object] = {}
+        for name, future in futures.items():
+            if future.done() or wait:
+                results[name] = _named(future.result(), name)
+            else:
+                results[name] = future
+        return results
+    
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.disk:
+            self.disk.clear()
+
+def create_geocoder(geolocator_factory: Callable[[], object]) -> Geocoder:
+    """
+    Create a Geocoder with the default limiter and cache location.
+    
+    TRAVELBUDDY_GEOCODE_CACHE_PATH moves the on-disk cache; an empty value
+    keeps the cache in memory only.
+    """
+    disk_path = os.getenv('TRAVELBUDDY_GEOCODE_CACHE_PATH', DEFAULT_GEOCODE_CACHE_PATH)
+    return Geocoder(geolocator_factory, disk_path=disk_path or None)
@@ -0,0 +1,387 @@
+# gtfs_realtime.py
+# GTFS-Realtime TripUpdates and VehiclePositions applied as incremental diffs to an indexed trip/route state
+
+import heapq
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+# VehiclePosition.OccupancyStatus (name or number) to crowding level: Low 0, Medium 1, High 2
+_OCCUPANCY_LEVELS = {
+    'EMPTY': 0, 'MANY_SEATS_AVAILABLE': 0, 'FEW_SEATS_AVAILABLE': 1, 'STANDING_ROOM_ONLY': 1,
+    'CRUSHED_STANDING_ROOM_ONLY': 2, 'FULL': 2, 'NOT_ACCEPTING_PASSENGERS': 2,
+    0: 0, 1: 0, 2: 1, 3: 1, 4: 2, 5: 2, 6: 2
+}
+CROWDING_NAMES = ('Low', 'Medium', 'High')
+# A route whose trips average at least this much delay (or earliness) is "Delayed" ("Early")
+DELAY_STATUS_SECONDS = 60
+
+def _field(message: Dict, camel: str, snake: str, default=None):
+    # Protobuf JSON uses lowerCamelCase; feeds dumped with field names use snake_case
+    value = message.get(camel)
+    return message.get(snake, default) if value is None else value
+
+def load_feed(path: str) -> Dict:
+    """
+    Read a GTFS-Realtime FeedMessage from a file.
+
+    `.json` files hold the protobuf JSON mapping (what MessageToDict
+    produces); anything else is decoded as protobuf, which needs the
+    gtfs-realtime-bindings package.
+    """
+    if path.endswith('.json'):
+        with open(path, encoding='utf-8') as file:
+            return json.load(file)
+    from google.protobuf.json_format import MessageToDict
+    from google.transit import gtfs_realtime_pb2
+    message = gtfs_realtime_pb2.FeedMessage()
+    with open(path, 'rb') as file:
+        message.ParseFromString(file.read())
+    return MessageToDict(message)
+
+@dataclass
+class ApplyStats:
+    """What one feed changed"""
+    entities: int = 0
+    changed: int = 0
+    unchanged: int = 0
+    removed: int = 0
+    routes_touched: int = 0
+    seconds: float = 0.0
+
+class TripState:
+    """Latest real-time state of one trip, merged from its TripUpdate and VehiclePosition"""
+
+    __slots__ = ('trip_id', 'route_id', 'delay_seconds', 'cancelled', 'next_departure', 'occupancy',
+                 'vehicle_id', 'latitude', 'longitude', 'timestamp', 'update_entity', 'vehicle_entity')
+
+    def __init__(self, trip_id: str, route_id: Optional[str]):
+        self.trip_id = trip_id
+        self.route_id = route_id
+        self.delay_seconds: Optional[int] = None
+        self.cancelled = False
+        self.next_departure: Optional[int] = None  # Epoch seconds
+        self.occupancy: Optional[int] = None  # Crowding level
+        self.vehicle_id: Optional[str] = None
+        self.latitude: Optional[float] = None
+        self.longitude: Optional[float] = None
+        self.timestamp: Optional[int] = None
+        # Entities the two halves came from, so removing an entity clears only its half
+        self.update_entity: Optional[tuple] = None
+        self.vehicle_entity: Optional[tuple] = None
+
+class _RouteTotals:
+    """Running sums over a route's trips, adjusted per trip change instead of recomputed"""
+
+    __slots__ = ('trips', 'delay_sum', 'delay_count', 'cancelled', 'occupancy_sum', 'occupancy_count', 'vehicles',
+                 'departures')
+
+    def __init__(self):
+        self.trips: Set[str] = set()
+        self.delay_sum = 0
+        self.delay_count = 0
+        self.cancelled = 0
+        self.occupancy_sum = 0
+        self.occupancy_count = 0
+        self.vehicles = 0
+        # (next departure, trip id) min-heap; entries a trip has since replaced are dropped when they surface
+        self.departures: List[tuple] = []
+
+    def add(self, trip: TripState, sign: int) -> None:
+        if trip.delay_seconds is not None:
+            self.delay_sum += sign * trip.delay_seconds
+            self.delay_count += sign
+        if trip.occupancy is not None:
+            self.occupancy_sum += sign * trip.occupancy
+            self.occupancy_count += sign
+        self.cancelled += sign * trip.cancelled
+        self.vehicles += sign * (trip.vehicle_id is not None or trip.latitude is not None)
+        if sign > 0 and trip.next_departure:
+            heapq.heappush(self.departures, (trip.next_departure, trip.trip_id))
+
+    def next_departure(self, trips: Dict[str, TripState]) -> Optional[int]:
+        """Earliest next departure of the route's trips."""
+        departures = self.departures
+        if len(departures) > 2 * len(self.trips) + 16:
+            departures[:] = [(trips[trip_id].next_departure, trip_id) for trip_id in self.trips
+                             if trips[trip_id].next_departure]
+            heapq.heapify(departures)
+        while departures:
+            departure, trip_id = departures[0]
+            trip = trips.get(trip_id) if trip_id in self.trips else None
+            if trip is not None and trip.next_departure == departure:
+                return departure
+            heapq.heappop(departures)
+        return None
+
+class RealtimeState:
+    """
+    In-memory real-time state, indexed by trip and by route.
+
+    Feeds are applied as diffs: an entity equal to the one last applied
+    under its id is skipped, and a FULL_DATASET feed removes the entities
+    of its own source it no longer contains (so a TripUpdates and a
+    VehiclePositions feed can both be full datasets). Each changed trip
+    moves its contribution between running per-route totals, and each
+    touched route's summary is rebuilt once per feed, so route_info() is
+    a dict lookup.
+    """
+
+    def __init__(self, route_aliases: Optional[Dict[str, str]] = None,
+                 trip_routes: Optional[Callable[[str], Optional[str]]] = None):
+        """
+        Args:
+            route_aliases: Other names of routes (e.g. GTFS short names) to route ids, for lookups
+            trip_routes: Route id of a trip id, for updates that only name the trip
+        """
+        self.route_aliases = route_aliases or {}
+        self.trip_routes = trip_routes
+        self.trips: Dict[str, TripState] = {}
+        self._entities: Dict[str, Dict[str, Dict]] = {}  # Source to entity id to entity
+        self._routes: Dict[str, _RouteTotals] = {}
+        self._route_info: Dict[str, Dict] = {}
+        self.feed_timestamp: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def route_info(self, route_id: str) -> Optional[Dict]:
+        """Real-time summary of a route (by route id or alias), None when the feeds never mentioned it."""
+        info = self._route_info.get(route_id)
+        if info is None and route_id in self.route_aliases:
+            info = self._route_info.get(self.route_aliases[route_id])
+        return info
+
+    def trip(self, trip_id: str) -> Optional[TripState]:
+        return self.trips.get(trip_id)
+
+    def apply_feed(self, feed: Dict, source: str = 'default') -> ApplyStats:
+        """
+        Apply a decoded FeedMessage (see load_feed).
+
+        Args:
+            feed: FeedMessage as a dict
+            source: Name of the feed; a FULL_DATASET feed replaces only its own source's entities
+        """
+        start = time.perf_counter()
+        header = feed.get('header', {})
+        incrementality = header.get('incrementality', 'FULL_DATASET')
+        full_dataset = incrementality in ('FULL_DATASET', 0)
+        stats = ApplyStats()
+        touched: Set[str] = set()
+        with self._lock:
+            entities = self._entities.setdefault(source, {})
+            seen = set()
+            for entity in feed.get('entity', []):
+                entity_id = entity.get('id')
+                if entity_id is None:
+                    continue
+                stats.entities += 1
+                seen.add(entity_id)
+                key = (source, entity_id)
+                if _field(entity, 'isDeleted', 'is_deleted', False):
+                    if self._remove_entity(key, touched):
+                        stats.removed += 1
+                    continue
+                if entities.get(entity_id) == entity:
+                    stats.unchanged += 1
+                    continue
+                self._remove_entity(key, touched)
+                self._apply_entity(key, entity, touched)
+                entities[entity_id] = entity
+                stats.changed += 1
+            if full_dataset:
+                for entity_id in [entity_id for entity_id in entities if entity_id not in seen]:
+                    self._remove_entity((source, entity_id), touched)
+                    stats.removed += 1
+            if header.get('timestamp'):
+                self.feed_timestamp = int(header['timestamp'])
+            self._refresh_routes(touched)
+        stats.routes_touched = len(touched)
+        stats.seconds = time.perf_counter() - start
+        return stats
+
+    def _trip_for(self, descriptor: Dict, touched: Set[str]) -> Optional[TripState]:
+        trip_id = _field(descriptor, 'tripId', 'trip_id')
+        if not trip_id:
+            return None
+        trip = self.trips.get(trip_id)
+        if trip is None:
+            route_id = _field(descriptor, 'routeId', 'route_id')
+            if not route_id and self.trip_routes:
+                route_id = self.trip_routes(trip_id)
+            trip = self.trips[trip_id] = TripState(trip_id, route_id)
+            if route_id:
+                self._routes.setdefault(route_id, _RouteTotals()).trips.add(trip_id)
+        if trip.route_id:
+            touched.add(trip.route_id)
+            # Take the trip out of its route's totals while it changes
+            self._routes[trip.route_id].add(trip, -1)
+        return trip
+
+    def _settle(self, trip: TripState) -> None:
+        if trip.route_id:
+            self._routes[trip.route_id].add(trip, 1)
+        if trip.update_entity is None and trip.vehicle_entity is None:
+            del self.trips[trip.trip_id]
+            if trip.route_id:
+                self._routes[trip.route_id].trips.discard(trip.trip_id)
+
+    def _apply_entity(self, key: tuple, entity: Dict, touched: Set[str]) -> None:
+        update = _field(entity, 'tripUpdate', 'trip_update')
+        if update:
+            trip = self._trip_for(update.get('trip', {}), touched)
+            if trip is not None:
+                self._apply_trip_update(trip, update)
+                trip.update_entity = key
+                self._settle(trip)
+        vehicle = entity.get('vehicle')
+        if vehicle:
+            trip = self._trip_for(vehicle.get('trip', {}), touched)
+            if trip is not None:
+                self._apply_vehicle(trip, vehicle)
+                trip.vehicle_entity = key
+                self._settle(trip)
+
+    @staticmethod
+    def _apply_trip_update(trip: TripState, update: Dict) -> None:
+        relationship = _field(update.get('trip', {}), 'scheduleRelationship', 'schedule_relationship')
+        trip.cancelled = relationship in ('CANCELED', 'CANCELLED', 3)
+        delay = update.get('delay')
+        next_departure = None
+        for stop_time in _field(update, 'stopTimeUpdate', 'stop_time_update', []):
+            event = stop_time.get('departure') or stop_time.get('arrival') or {}
+            if delay is None and event.get('delay') is not None:
+                delay = event['delay']
+            if next_departure is None and event.get('time'):
+                next_departure = int(event['time'])  # int64, a string in protobuf JSON
+            if delay is not None and next_departure is not None:
+                break
+        trip.delay_seconds = int(delay) if delay is not None else None
+        trip.next_departure = next_departure
+        if update.get('timestamp'):
+            trip.timestamp = int(update['timestamp'])
+
+    @staticmethod
+    def _apply_vehicle(trip: TripState, vehicle: Dict) -> None:
+        trip.vehicle_id = (vehicle.get('vehicle') or {}).get('id')
+        position = vehicle.get('position') or {}
+        trip.latitude = position.get('latitude')
+        trip.longitude = position.get('longitude')
+        trip.occupancy = _OCCUPANCY_LEVELS.get(_field(vehicle, 'occupancyStatus', 'occupancy_status'))
+        if vehicle.get('timestamp'):
+            trip.timestamp = int(vehicle['timestamp'])
+
+    def _remove_entity(self, key: tuple, touched: Set[str]) -> bool:
+        source, entity_id = key
+        entity = self._entities.get(source, {}).pop(entity_id, None)
+        if entity is None:
+            return False
+        for descriptor, half in ((_field(entity, 'tripUpdate', 'trip_update'), 'update_entity'),
+                                 (entity.get('vehicle'), 'vehicle_entity')):
+            if not descriptor:
+                continue
+            trip_id = _field(descriptor.get('trip', {}), 'tripId', 'trip_id')
+            trip = self.trips.get(trip_id)
+            if trip is None or getattr(trip, half) != key:
+                continue
+            self._trip_for(descriptor.get('trip', {}), touched)
+            setattr(trip, half, None)
+            if half == 'update_entity':
+                trip.delay_seconds, trip.cancelled, trip.next_departure = None, False, None
+            else:
+                trip.vehicle_id = trip.latitude = trip.longitude = trip.occupancy = None
+            self._settle(trip)
+        return True
+
+    def _refresh_routes(self, route_ids: Iterable[str]) -> None:
+        for route_id in route_ids:
+            totals = self._routes.get(route_id)
+            if totals is None or not totals.trips:
+                self._routes.pop(route_id, None)
+                self._route_info.pop(route_id, None)
+                continue
+            self._route_info[route_id] = self._summary(route_id, totals)
+
+    def _summary(self, route_id: str, totals: _RouteTotals) -> Dict:
+        delay = totals.delay_sum / totals.delay_count if totals.delay_count else 0
+        if totals.cancelled == len(totals.trips):
+            status = "Cancelled"
+        elif delay >= DELAY_STATUS_SECONDS:
+            status = "Delayed"
+        elif delay <= -DELAY_STATUS_SECONDS:
+            status = "Early"
+        else:
+            status = "On Time"
+        info = {
+            'route_id': route_id,
+            'status': status,
+            'delay_minutes': round(delay / 60),
+            'trips': len(totals.trips),
+            'cancelled_trips': totals.cancelled,
+            'vehicles': totals.vehicles,
+            'real_time_available': True
+        }
+        if totals.occupancy_count:
+            info['crowding_level'] = CROWDING_NAMES[round(totals.occupancy_sum / totals.occupancy_count)]
+        upcoming = totals.next_departure(self.trips)
+        if upcoming:
+            info['next_departure'] = datetime.fromtimestamp(upcoming).strftime('%H:%M')
+        return info
+
+class RealtimeFeed:
+    """
+    GTFS-Realtime files on disk feeding one RealtimeState.
+
+    refresh() re-reads a file only when its modification time changed,
+    and checks at most once per refresh_seconds, so calling it before
+    every lookup is cheap.
+    """
+
+    def __init__(self, paths: Iterable[Union[str, Tuple[str, Optional[str]]]], state=None,
+                 refresh_seconds: float = 15.0):
+        """
+        Args:
+            paths: Feed files, e.g. a TripUpdates and a VehiclePositions feed, or (path, city) pairs
+                whose feeds are applied with that city (for an AlertStore)
+            state: What to apply the feeds to: a RealtimeState (a new one by default),
+                or anything else with apply_feed(feed, source), such as a service_alerts.AlertStore
+            refresh_seconds: Minimum seconds between checks of the files
+        """
+        self.paths: List[str] = []
+        self.cities: Dict[str, str] = {}  # Path to the city its feed is for
+        for entry in paths:
+            path, city = (entry, None) if isinstance(entry, str) else entry
+            self.paths.append(path)
+            if city:
+                self.cities[path] = city
+        self.state = state if state is not None else RealtimeState()
+        self.refresh_seconds = refresh_seconds
+        self._mtimes: Dict[str, int] = {}
+        self._checked = float('-inf')
+        self._lock = threading.Lock()
+
+    def refresh(self, force: bool = False) -> Dict[str, ApplyStats]:
+        """Apply the feeds that changed since the last refresh."""
+        now = time.monotonic()
+        if not force and now - self._checked < self.refresh_seconds:
+            return {}
+        applied = {}
+        with self._lock:
+            self._checked = now
+            for path in self.paths:
+                try:
+                    mtime = os.stat(path).st_mtime_ns
+                    if mtime == self._mtimes.get(path):
+                        continue
+                    city = self.cities.get(path)
+                    if city:
+                        applied[path] = self.state.apply_feed(load_feed(path), source=path, city=city)
+                    else:
+                        applied[path] = self.state.apply_feed(load_feed(path), source=path)
+                    self._mtimes[path] = mtime
+                except Exception as e:
+                    print(f"Error reading GTFS-Realtime feed {path}: {e}")
+        return applied
@@ -0,0 +1,736 @@
+# gtfs_timetable.py
+# Offline GTFS timetable (array tables, memory-mapped after the first build) and a Connection Scan journey planner
+
+import csv
+import hashlib
+import heapq
+import io
+import json
+import mmap
+import os
+import threading
+import zipfile
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from itertools import count, repeat
+from operator import itemgetter
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from route_model import TransportType
+from stop_index import StopIndex
+from transport_api import Location, TransportRoute
+
+DEFAULT_GTFS_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'gtfs')
+# Part of the build key: bump it when the table layout changes so old builds are rebuilt
+FORMAT_VERSION = 3
+DAY_SECONDS = 24 * 3600
+# Change time between stops of the same parent station when transfers.txt gives none
+STATION_TRANSFER_SECONDS = 120
+
+# GTFS route_type (basic and extended) to transport type
+_ROUTE_TYPES = {0: TransportType.TRAM, 1: TransportType.SUBWAY, 2: TransportType.TRAIN, 3: TransportType.BUS,
+                4: TransportType.FERRY, 5: TransportType.TRAM, 7: TransportType.TRAM, 11: TransportType.BUS,
+                12: TransportType.TRAIN}
+_EXTENDED_ROUTE_TYPES = {1: TransportType.TRAIN, 2: TransportType.BUS, 4: TransportType.SUBWAY,
+                         7: TransportType.BUS, 8: TransportType.BUS, 9: TransportType.TRAM, 10: TransportType.FERRY}
+
+def transport_type_for_route_type(route_type: int) -> TransportType:
+    """GTFS route_type (e.g. 3, or extended 700) to TransportType."""
+    if route_type >= 100:
+        return _EXTENDED_ROUTE_TYPES.get(route_type // 100, TransportType.UNKNOWN)
+    return _ROUTE_TYPES.get(route_type, TransportType.UNKNOWN)
+
+def parse_gtfs_time(value: str) -> int:
+    """GTFS "H:MM:SS" (hours may pass 24 for trips after midnight) to seconds after midnight; -1 when blank."""
+    value = value.strip()
+    if not value:
+        return -1
+    hours, minutes, seconds = value.split(':')
+    return int(hours) * 3600 + int(minutes) * 60 + int(seconds)
+
+def _read_csv(feed: zipfile.ZipFile, name: str, required: bool = True):
+    if name not in feed.namelist():
+        if required:
+            raise ValueError(f"GTFS feed has no {name}")
+        return iter(())
+    return csv.DictReader(io.TextIOWrapper(feed.open(name), encoding='utf-8-sig', newline=''))
+
+class GTFSTimetable:
+    """
+    A GTFS static feed as flat numeric columns plus lists of texts.
+
+    Stops, routes, trips and services are numbered in feed order and
+    referenced by index. Every pair of consecutive timed stop_times of a
+    trip becomes a connection; connections are sorted by departure, which
+    is the order the Connection Scan Algorithm reads them in. Footpaths
+    (transfers.txt, stops of one parent station) are stored per origin
+    stop, CSR style: footpath_start[stop]..footpath_start[stop + 1]; the
+    routes serving each stop are stored the same way.
+
+    A built timetable is saved as one binary file and memory-mapped on
+    later loads, so the columns are memoryviews over the page cache rather
+    than Python objects.
+    """
+
+    COLUMNS = {
+        'stop_lat': 'd',
+        'stop_lon': 'd',
+        'route_type': 'i',
+        'trip_route': 'i',
+        'trip_service': 'i',
+        'connection_departure': 'i',
+        'connection_arrival': 'i',
+        'connection_from': 'i',
+        'connection_to': 'i',
+        'connection_trip': 'i',
+        'footpath_start': 'i',
+        'footpath_to': 'i',
+        'footpath_seconds': 'i',
+        'stop_route_start': 'i',
+        'stop_routes': 'i',
+        'service_days': 'i',  # Bit 0 is Monday
+        'service_start': 'i',  # YYYYMMDD
+        'service_end': 'i'
+    }
+    TEXTS = ('stop_ids', 'stop_names', 'route_ids', 'route_short_names', 'route_long_names',
+             'trip_ids', 'trip_headsigns', 'service_ids')
+
+    def __init__(self, columns: Dict, texts: Dict[str, List[str]],
+                 service_exceptions: Dict[str, Dict[str, List[int]]], buffer=None):
+        """
+        Args:
+            columns: Numeric column name to array or memoryview, see COLUMNS
+            texts: Text column name to list of strings, see TEXTS
+            service_exceptions: calendar_dates.txt as {"YYYYMMDD": {"added": [...], "removed": [...]}}
+                of service indices
+            buffer: The mmap the columns point into, kept open with the timetable
+        """
+        for name in self.COLUMNS:
+            setattr(self, name, columns[name])
+        for name in self.TEXTS:
+            setattr(self, name, texts[name])
+        self.service_exceptions = service_exceptions
+        self._buffer = buffer
+        self._stops_by_name: Optional[Dict[str, List[int]]] = None
+        self._trips_by_id: Optional[Dict[str, int]] = None
+        self._stops_by_id: Optional[Dict[str, int]] = None
+        self._stop_index: Optional[StopIndex] = None
+        self._active_trips: Dict[date, bytearray] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def stop_count(self) -> int:
+        return len(self.stop_ids)
+
+    @property
+    def connection_count(self) -> int:
+        return len(self.connection_departure)
+
+    @classmethod
+    def load(cls, feed_path: str, cache_dir: str = DEFAULT_GTFS_CACHE_DIR) -> 'GTFSTimetable':
+        """
+        Load a GTFS zip, building its tables on first use and memory-mapping them afterwards.
+
+        Builds are keyed by the feed's path, size and modification time, so
+        replacing the zip triggers a rebuild.
+        """
+        build_dir = os.path.join(cache_dir, cls.build_key(feed_path))
+        if not os.path.exists(os.path.join(build_dir, 'manifest.json')):
+            cls.from_zip(feed_path).save(build_dir)
+        return cls.open(build_dir)
+
+    @staticmethod
+    def build_key(feed_path: str) -> str:
+        stat = os.stat(feed_path)
+        source = f"{os.path.abspath(feed_path)}|{stat.st_size}|{stat.st_mtime_ns}|{FORMAT_VERSION}"
+        stem = os.path.splitext(os.path.basename(feed_path))[0]
+        return f"{stem}-{hashlib.sha1(source.encode()).hexdigest()[:16]}"
+
+    @classmethod
+    def from_zip(cls, feed_path: str) -> 'GTFSTimetable':
+        """Parse a GTFS zip into in-memory array tables."""
+        with zipfile.ZipFile(feed_path) as feed:
+            texts = {name: [] for name in cls.TEXTS}
+            columns = {name: array(typecode) for name, typecode in cls.COLUMNS.items()}
+
+            stop_index: Dict[str, int] = {}
+            parents: Dict[str, List[int]] = {}
+            for row in _read_csv(feed, 'stops.txt'):
+                if not row.get('stop_lat', '').strip():
+                    continue  # Generic nodes and boarding areas have no position
+                stop_index[row['stop_id']] = len(texts['stop_ids'])
+                texts['stop_ids'].append(row['stop_id'])
+                texts['stop_names'].append(row.get('stop_name', '') or row['stop_id'])
+                columns['stop_lat'].append(float(row['stop_lat']))
+                columns['stop_lon'].append(float(row['stop_lon']))
+                if row.get('parent_station'):
+                    parents.setdefault(row['parent_station'], []).append(stop_index[row['stop_id']])
+
+            route_index: Dict[str, int] = {}
+            for row in _read_csv(feed, 'routes.txt'):
+                route_index[row['route_id']] = len(texts['route_ids'])
+                texts['route_ids'].append(row['route_id'])
+                texts['route_short_names'].append(row.get('route_short_name', ''))
+                texts['route_long_names'].append(row.get('route_long_name', ''))
+                columns['route_type'].append(int(row.get('route_type') or 3))
+
+            trip_index: Dict[str, int] = {}
+            service_index: Dict[str, int] = {}
+            for row in _read_csv(feed, 'trips.txt'):
+                service = service_index.setdefault(row['service_id'], len(service_index))
+                trip_index[row['trip_id']] = len(texts['trip_ids'])
+                texts['trip_ids'].append(row['trip_id'])
+                texts['trip_headsigns'].append(row.get('trip_headsign', ''))
+                columns['trip_route'].append(route_index[row['route_id']])
+                columns['trip_service'].append(service)
+
+            cls._read_services(feed, service_index, texts, columns)
+            exceptions: Dict[str, Dict[str, List[int]]] = {}
+            for row in _read_csv(feed, 'calendar_dates.txt', required=False):
+                service = service_index.get(row['service_id'])
+                if service is not None:
+                    kind = 'added' if row['exception_type'].strip() == '1' else 'removed'
+                    exceptions.setdefault(row['date'], {'added': [], 'removed': []})[kind].append(service)
+
+            cls._read_connections(feed, stop_index, trip_index, columns)
+            cls._read_footpaths(feed, stop_index, parents, columns)
+            cls._build_stop_routes(columns)
+        return cls(columns, texts, exceptions)
+
+    @staticmethod
+    def _read_services(feed: zipfile.ZipFile, service_index: Dict[str, int], texts: Dict, columns: Dict) -> None:
+        has_calendar = 'calendar.txt' in feed.namelist() or 'calendar_dates.txt' in feed.namelist()
+        # Without calendar files every service runs every day; with them, a
+        # service missing from calendar.txt runs only on its calendar_dates
+        days = [0 if has_calendar else 0x7F] * len(service_index)
+        start = [0] * len(service_index)
+        end = [0 if has_calendar else 99991231] * len(service_index)
+        weekdays = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+        for row in _read_csv(feed, 'calendar.txt', required=False):
+            service = service_index.get(row['service_id'])
+            if service is None:
+                continue
+            days[service] = sum(1 << bit for bit, day in enumerate(weekdays) if row.get(day, '0').strip() == '1')
+            start[service] = int(row['start_date'])
+            end[service] = int(row['end_date'])
+        texts['service_ids'].extend(sorted(service_index, key=service_index.get))
+        columns['service_days'].extend(days)
+        columns['service_start'].extend(start)
+        columns['service_end'].extend(end)
+
+    @staticmethod
+    def _read_connections(feed: zipfile.ZipFile, stop_index: Dict[str, int], trip_index: Dict[str, int],
+                          columns: Dict) -> None:
+        trips, sequences, stops = array('i'), array('i'), array('i')
+        arrivals, departures = array('i'), array('i')
+        for row in _read_csv(feed, 'stop_times.txt'):
+            arrival = parse_gtfs_time(row.get('arrival_time', ''))
+            departure = parse_gtfs_time(row.get('departure_time', ''))
+            stop = stop_index.get(row['stop_id'])
+            if stop is None or (arrival < 0 and departure < 0):
+                continue  # Untimed stops cannot be boarded at a known time; the connection spans them
+            trips.append(trip_index[row['trip_id']])
+            sequences.append(int(row['stop_sequence']))
+            stops.append(stop)
+            arrivals.append(arrival if arrival >= 0 else departure)
+            departures.append(departure if departure >= 0 else arrival)
+
+        # Feeds are usually sorted by trip and sequence already, but need not be
+        order = sorted(range(len(trips)), key=lambda row: (trips[row], sequences[row]))
+        departure_times, arrival_times = array('i'), array('i')
+        from_stops, to_stops, connection_trips = array('i'), array('i'), array('i')
+        for previous, row in zip(order, order[1:]):
+            if trips[previous] != trips[row]:
+                continue
+            departure_times.append(departures[previous])
+            arrival_times.append(arrivals[row])
+            from_stops.append(stops[previous])
+            to_stops.append(stops[row])
+            connection_trips.append(trips[row])
+
+        # Ties on departure by arrival, keeping trip order for zero-length hops
+        order = sorted(range(len(departure_times)), key=lambda row: (departure_times[row], arrival_times[row]))
+        for name, values in (('connection_departure', departure_times), ('connection_arrival', arrival_times),
+                             ('connection_from', from_stops), ('connection_to', to_stops),
+                             ('connection_trip', connection_trips)):
+            columns[name].extend(values[row] for row in order)
+
+    @staticmethod
+    def _read_footpaths(feed: zipfile.ZipFile, stop_index: Dict[str, int], parents: Dict[str, List[int]],
+                        columns: Dict) -> None:
+        # transfers.txt overrides the default change time between stops of one station;
+        # transfer_type 3 means no transfer is possible, even within a station
+        transfers: Dict[Tuple[int, int], Optional[int]] = {}
+        for row in _read_csv(feed, 'transfers.txt', required=False):
+            from_stop, to_stop = stop_index.get(row.get('from_stop_id')), stop_index.get(row.get('to_stop_id'))
+            if from_stop is None or to_stop is None or from_stop == to_stop:
+                continue
+            key = (from_stop, to_stop)
+            if row.get('transfer_type', '').strip() == '3':
+                transfers[key] = None
+            elif key not in transfers:
+                transfers[key] = int(row.get('min_transfer_time') or 0)
+            elif transfers[key] is not None:
+                transfers[key] = min(transfers[key], int(row.get('min_transfer_time') or 0))
+
+        footpaths: Dict[int, Dict[int, int]] = {}
+        for siblings in parents.values():
+            for from_stop in siblings:
+                for to_stop in siblings:
+                    if from_stop != to_stop:
+                        footpaths.setdefault(from_stop, {})[to_stop] = STATION_TRANSFER_SECONDS
+        for (from_stop, to_stop), seconds in transfers.items():
+            if seconds is None:
+                footpaths.get(from_stop, {}).pop(to_stop, None)
+            else:
+                footpaths.setdefault(from_stop, {})[to_stop] = seconds
+
+        for stop in range(len(columns['stop_lat'])):
+            columns['footpath_start'].append(len(columns['footpath_to']))
+            for to_stop, seconds in sorted(footpaths.get(stop, {}).items()):
+                columns['footpath_to'].append(to_stop)
+                columns['footpath_seconds'].append(seconds)
+        columns['footpath_start'].append(len(columns['footpath_to']))
+
+    @staticmethod
+    def _build_stop_routes(columns: Dict) -> None:
+        trip_route = columns['trip_route']
+        serving = set()
+        for from_stop, to_stop, trip in zip(columns['connection_from'], columns['connection_to'],
+                                            columns['connection_trip']):
+            route = trip_route[trip]
+            serving.add((from_stop, route))
+            serving.add((to_stop, route))
+        routes_by_stop: Dict[int, List[int]] = {}
+        for stop, route in sorted(serving):
+            routes_by_stop.setdefault(stop, []).append(route)
+        for stop in range(len(columns['stop_lat'])):
+            columns['stop_route_start'].append(len(columns['stop_routes']))
+            columns['stop_routes'].extend(routes_by_stop.get(stop, ()))
+        columns['stop_route_start'].append(len(columns['stop_routes']))
+
+    def save(self, build_dir: str) -> None:
+        """Write the tables as tables.bin plus manifest.json (written last, so it marks a complete build)."""
+        os.makedirs(build_dir, exist_ok=True)
+        layout = {}
+        temporary = os.path.join(build_dir, f'tables.bin.{os.getpid()}.tmp')
+        with open(temporary, 'wb') as file:
+            for name, typecode in self.COLUMNS.items():
+                values = getattr(self, name)
+                data = values.tobytes() if isinstance(values, (array, memoryview)) else array(typecode, values).tobytes()
+                file.write(b'\0' * (-file.tell() % 8))  # Keep every column 8-byte aligned
+                layout[name] = [typecode, file.tell(), len(values)]
+                file.write(data)
+        os.replace(temporary, os.path.join(build_dir, 'tables.bin'))
+
+        manifest = {
+            'version': FORMAT_VERSION,
+            'columns': layout,
+            'texts': {name: getattr(self, name) for name in self.TEXTS},
+            'service_exceptions': self.service_exceptions
+        }
+        temporary = os.path.join(build_dir, f'manifest.json.{os.getpid()}.tmp')
+        with open(temporary, 'w', encoding='utf-8') as file:
+            json.dump(manifest, file)
+        os.replace(temporary, os.path.join(build_dir, 'manifest.json'))
+
+    @classmethod
+    def open(cls, build_dir: str) -> 'GTFSTimetable':
+        """Memory-map a saved build; columns are read-only memoryviews."""
+        with open(os.path.join(build_dir, 'manifest.json'), encoding='utf-8') as file:
+            manifest = json.load(file)
+        with open(os.path.join(build_dir, 'tables.bin'), 'rb') as file:
+            size = os.fstat(file.fileno()).st_size
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        view = memoryview(buffer)
+        columns = {}
+        for name, (typecode, offset, length) in manifest['columns'].items():
+            end = offset + length * array(typecode).itemsize
+            columns[name] = view[offset:end].cast(typecode)
+        return cls(columns, manifest['texts'], manifest['service_exceptions'], buffer)
+
+    def active_services(self, service_date: date) -> set:
+        """Indices of the services running on a date (calendar.txt plus calendar_dates.txt)."""
+        day = int(service_date.strftime('%Y%m%d'))
+        weekday = 1 << service_date.weekday()
+        services = {
+            service for service, (days, start, end)
+            in enumerate(zip(self.service_days, self.service_start, self.service_end))
+            if days & weekday and start <= day <= end
+        }
+        exceptions = self.service_exceptions.get(str(day))
+        if exceptions:
+            services.update(exceptions['added'])
+            services.difference_update(exceptions['removed'])
+        return services
+
+    def active_trips(self, service_date: date) -> bytearray:
+        """One byte per trip, 1 when the trip runs on the date; cached for the last few dates."""
+        active = self._active_trips.get(service_date)
+        if active is None:
+            services = self.active_services(service_date)
+            running = bytes(1 if service in services else 0 for service in range(len(self.service_ids)))
+            active = bytearray(running[service] for service in self.trip_service)
+            with self._lock:
+                if len(self._active_trips) >= 8:
+                    self._active_trips.pop(next(iter(self._active_trips)))
+                self._active_trips[service_date] = active
+        return active
+
+    def stops_named(self, name: str) -> List[int]:
+        """Stops whose name matches case-insensitively (a station often has several)."""
+        if self._stops_by_name is None:
+            stops_by_name: Dict[str, List[int]] = {}
+            for stop, stop_name in enumerate(self.stop_names):
+                stops_by_name.setdefault(' '.join(stop_name.lower().split()), []).append(stop)
+            self._stops_by_name = stops_by_name
+        return self._stops_by_name.get(' '.join(name.lower().split()), [])
+
+    def stop_name(self, stop_id: str) -> Optional[str]:
+        """Name of a stop id, None for a stop not in the feed."""
+        if self._stops_by_id is None:
+            self._stops_by_id = {stop: index for index, stop in enumerate(self.stop_ids)}
+        stop = self._stops_by_id.get(stop_id)
+        return None if stop is None else self.stop_names[stop]
+
+    @property
+    def stop_index(self) -> StopIndex:
+        """Spatial index over the stops, built on first use"""
+        if self._stop_index is None:
+            with self._lock:
+                if self._stop_index is None:
+                    self._stop_index = StopIndex(self.stop_lat, self.stop_lon)
+        return self._stop_index
+
+    def stops_near(self, latitude: float, longitude: float, radius_km: float) -> List[Tuple[int, float]]:
+        """(stop, distance km) for the stops within radius_km, nearest first."""
+        return self.stop_index.within(latitude, longitude, radius_km)
+
+    def routes_at(self, stop: int) -> List[int]:
+        """Routes with a trip stopping at the stop."""
+        return list(self.stop_routes[self.stop_route_start[stop]:self.stop_route_start[stop + 1]])
+
+    def route_label(self, route: int) -> str:
+        return self.route_short_names[route] or self.route_long_names[route] or self.route_ids[route]
+
+    def route_aliases(self) -> Dict[str, str]:
+        """Route labels (as TransportRoute.route_name shows them) to route ids."""
+        aliases = {}
+        for route, route_id in enumerate(self.route_ids):
+            for name in (self.route_short_names[route], self.route_long_names[route]):
+                if name and name != route_id:
+                    aliases.setdefault(name, route_id)
+        return aliases
+
+    def trip_route_id(self, trip_id: str) -> Optional[str]:
+        """Route id of a trip id, None for a trip not in the feed."""
+        if self._trips_by_id is None:
+            self._trips_by_id = {trip: index for index, trip in enumerate(self.trip_ids)}
+        trip = self._trips_by_id.get(trip_id)
+        return None if trip is None else self.route_ids[self.trip_route[trip]]
+
+@dataclass
+class Leg:
+    """One ride (or walk) of an itinerary"""
+    from_name: str
+    to_name: str
+    departure: datetime
+    arrival: datetime
+    transport_type: TransportType
+    route_id: Optional[str] = None
+    route_name: Optional[str] = None
+    headsign: Optional[str] = None
+
+    @property
+    def is_walk(self) -> bool:
+        return self.transport_type == TransportType.WALKING
+
+@dataclass
+class Itinerary:
+    """A journey found by the planner: walks and rides in order"""
+    legs: List[Leg]
+
+    @property
+    def departure(self) -> datetime:
+        return self.legs[0].departure
+
+    @property
+    def arrival(self) -> datetime:
+        return self.legs[-1].arrival
+
+    @property
+    def duration_seconds(self) -> int:
+        return int((self.arrival - self.departure).total_seconds())
+
+    @property
+    def rides(self) -> List[Leg]:
+        return [leg for leg in self.legs if not leg.is_walk]
+
+    @property
+    def transfers(self) -> int:
+        return max(len(self.rides) - 1, 0)
+
+    def to_route(self) -> TransportRoute:
+        """TransportRoute summary: the first ride's line and platform, the whole journey's times."""
+        rides = self.rides
+        first = rides[0]
+        return TransportRoute(
+            route_id=first.route_id,
+            route_name=' → '.join(ride.route_name for ride in rides),
+            transport_type=first.transport_type.label,
+            destination=rides[-1].to_name,
+            departure_time=self.departure.strftime('%H:%M'),
+            arrival_time=self.arrival.strftime('%H:%M'),
+            duration=format_duration(self.duration_seconds),
+            platform=first.from_name,
+            status="Scheduled"
+        )
+
+def format_duration(seconds: int) -> str:
+    """Seconds as Directions-style text: "25 mins", "1 hour 5 mins"."""
+    hours, minutes = divmod(max(round(seconds / 60), 1), 60)
+    parts = []
+    if hours:
+        parts.append(f"{hours} hour{'s' if hours > 1 else ''}")
+    if minutes or not hours:
+        parts.append(f"{minutes} min{'s' if minutes > 1 else ''}")
+    return ' '.join(parts)
+
+class JourneyPlanner:
+    """
+    Earliest-arrival journeys over a GTFSTimetable with the Connection Scan Algorithm.
+
+    One scan reads the connections departing after the requested time in
+    order and stops as soon as no later connection can arrive earlier, so
+    a query touches only the connections of its own time window.
+
+    GTFS times count from the service day's midnight and run past 24:00
+    for trips after midnight, so a query scans the previous service day's
+    late trips and, near midnight, the next service day's early trips,
+    merged in time order with its own.
+    """
+
+    def __init__(self, timetable: GTFSTimetable, geocode: Optional[Callable[[str], Optional[Location]]] = None,
+                 walk_radius_km: float = 0.8, walking_speed_kmh: float = 4.8, change_seconds: int = 60,
+                 max_duration: timedelta = timedelta(hours=4)):
+        """
+        Args:
+            timetable: Timetable to plan on
+            geocode: Place name to Location, for places that are not stop names
+            walk_radius_km: Furthest stop to walk to from a geocoded place
+            walking_speed_kmh: Walking speed for access, egress and footpaths
+            change_seconds: Minimum time between alighting and boarding another trip at a stop
+            max_duration: Longest journey searched for
+        """
+        self.timetable = timetable
+        self.geocode = geocode
+        self.walk_radius_km = walk_radius_km
+        self.walking_speed_kmh = walking_speed_kmh
+        self.change_seconds = change_seconds
+        self.max_duration_seconds = int(max_duration.total_seconds())
+
+    def resolve(self, place: str) -> Dict[int, int]:
+        """
+        Stops for a place, with the walk in seconds to reach each one.
+
+        A stop name matches its stops directly; anything else is geocoded
+        and matched to the stops within walk_radius_km.
+        """
+        stops = self.timetable.stops_named(place)
+        if stops:
+            return {stop: 0 for stop in stops}
+        location = self.geocode(place) if self.geocode else None
+        if location is None:
+            return {}
+        return {
+            stop: round(distance / self.walking_speed_kmh * 3600)
+            for stop, distance in self.timetable.stops_near(location.latitude, location.longitude, self.walk_radius_km)
+        }
+
+    def plan(self, origin: str, destination: str, departure_time: Optional[datetime] = None,
+             alternatives: int = 3) -> List[Itinerary]:
+        """
+        Fastest itineraries between two places.
+
+        Args:
+            origin: Stop name or place name to geocode
+            destination: Stop name or place name to geocode
+            departure_time: Earliest departure (None means now); trips of that date's service day are used
+            alternatives: Itineraries to return; each one leaves after the previous one
+
+        Returns:
+            Itineraries in departure order, empty when none is found within max_duration
+        """
+        sources, targets = self.resolve(origin), self.resolve(destination)
+        if not sources or not targets or sources.keys() & targets.keys():
+            return []
+        departure_time = departure_time or datetime.now()
+        midnight = datetime.combine(departure_time.date(), time())
+        days = self.service_days(departure_time.date())
+        seconds = int((departure_time - midnight).total_seconds())
+
+        itineraries = []
+        while len(itineraries) < alternatives:
+            journey = self.earliest_arrival(sources, targets, seconds, days)
+            if journey is None:
+                break
+            itinerary = self._itinerary(journey, sources, targets, origin, destination, midnight)
+            itineraries.append(itinerary)
+            # The next alternative leaves at least a second after this one
+            seconds = int((itinerary.departure - midnight).total_seconds()) + 1
+        return itineraries
+
+    def routes(self, origin: str, destination: str, departure_time: Optional[datetime] = None,
+               alternatives: int = 3) -> List[TransportRoute]:
+        """plan() as TransportRoute summaries, for find_best_routes."""
+        return [itinerary.to_route() for itinerary in self.plan(origin, destination, departure_time, alternatives)]
+
+    def service_days(self, service_date: date) -> List[Tuple[int, bytearray]]:
+        """
+        (offset seconds, running trips) of the service days a query on a date can use.
+
+        The date itself comes first, then the previous day, whose trips
+        past 24:00 run in the early hours, and the next day.
+        """
+        timetable = self.timetable
+        return [(0, timetable.active_trips(service_date)),
+                (-DAY_SECONDS, timetable.active_trips(service_date - timedelta(days=1))),
+                (DAY_SECONDS, timetable.active_trips(service_date + timedelta(days=1)))]
+
+    def earliest_arrival(self, sources: Dict[int, int], targets: Dict[int, int], departure: int,
+                         days: Sequence[Tuple[int, bytearray]]) -> Optional[Tuple[int, Dict[int, tuple]]]:
+        """
+        One Connection Scan from the source stops.
+
+        Args:
+            sources: Stop to walk seconds from the origin
+            targets: Stop to walk seconds to the destination
+            departure: Seconds after midnight of the query's service day
+            days: (offset seconds, running trips) per service day, from
+                service_days(); the first is the query's own day, offset 0
+
+        Returns:
+            (target stop reached, journey pointers) or None. A pointer is
+            (boarding connection, alighting connection, day offset) for a
+            ride, or (previous stop, None, 0) for a footpath
+        """
+        timetable = self.timetable
+        # Flat lists indexed by stop and by trip run (trips of each joined service day in turn):
+        # cheaper per connection than dicts
+        never = 1 << 62
+        arrival = [never] * timetable.stop_count
+        for stop, walk in sources.items():
+            arrival[stop] = departure + walk
+        ready = list(arrival)  # When a trip can be boarded at the stop
+        pointers: Dict[int, tuple] = {}
+        best, best_stop = never, None
+        limit = departure + self.max_duration_seconds
+        change = self.change_seconds
+        footpath_start, footpath_to, footpath_seconds = (
+            timetable.footpath_start, timetable.footpath_to, timetable.footpath_seconds
+        )
+
+        departures = timetable.connection_departure
+        start = bisect_left(departures, departure)
+        scan = zip(count(start), departures[start:], timetable.connection_arrival[start:],
+                   timetable.connection_from[start:], timetable.connection_to[start:],
+                   timetable.connection_trip[start:], repeat(0))
+        # Other service days join the scan only when they have connections in the time window
+        active = days[0][1]
+        others = []
+        for offset, running in days[1:]:
+            first = bisect_left(departures, departure - offset)
+            if first < len(departures) and departures[first] + offset < limit:
+                others.append(self._shifted_connections(first, offset, len(active)))
+                active = active + running
+        if others:
+            scan = heapq.merge(scan, *others, key=itemgetter(1, 2))
+        boarded = [-1] * len(active)  # Connection each trip run was boarded at
+
+        for index, connection_departure, connection_arrival, from_stop, to_stop, trip, offset in scan:
+            if connection_departure >= limit:
+                break  # Later connections depart after the best arrival found
+            if boarded[trip] < 0:
+                if ready[from_stop] > connection_departure or not active[trip]:
+                    continue
+                boarded[trip] = index
+            if connection_arrival >= arrival[to_stop]:
+                continue
+            arrival[to_stop] = connection_arrival
+            ready[to_stop] = connection_arrival + change
+            pointers[to_stop] = (boarded[trip], index, offset)
+            if to_stop in targets and connection_arrival + targets[to_stop] < best:
+                best, best_stop = connection_arrival + targets[to_stop], to_stop
+                limit = min(limit, best)
+            for path in range(footpath_start[to_stop], footpath_start[to_stop + 1]):
+                other = footpath_to[path]
+                walked = connection_arrival + footpath_seconds[path]
+                if walked < arrival[other]:
+                    arrival[other] = ready[other] = walked
+                    pointers[other] = (to_stop, None, 0)
+                    if other in targets and walked + targets[other] < best:
+                        best, best_stop = walked + targets[other], other
+                        limit = min(limit, best)
+        if best_stop is None:
+            return None
+        return best_stop, pointers
+
+    def _shifted_connections(self, start: int, offset: int, trip_base: int):
+        """Connections of another service day from start on, in the scan's tuple shape and time frame"""
+        timetable = self.timetable
+        for index, departure, arrival, from_stop, to_stop, trip in zip(
+                count(start), timetable.connection_departure[start:], timetable.connection_arrival[start:],
+                timetable.connection_from[start:], timetable.connection_to[start:],
+                timetable.connection_trip[start:]):
+            yield index, departure + offset, arrival + offset, from_stop, to_stop, trip_base + trip, offset
+
+    def _itinerary(self, journey: Tuple[int, Dict[int, tuple]], sources: Dict[int, int], targets: Dict[int, int],
+                   origin: str, destination: str, midnight: datetime) -> Itinerary:
+        timetable = self.timetable
+        final_stop, pointers = journey
+        steps = []
+        stop = final_stop
+        while stop in pointers:
+            first, last, offset = pointers[stop]
+            steps.append((first, last, offset, stop))
+            stop = first if last is None else timetable.connection_from[first]
+        steps.reverse()
+
+        legs: List[Leg] = []
+        for first, last, offset, to_stop in steps:
+            if last is None:
+                # Footpaths are only taken after a ride, and start when it arrives
+                departure = legs[-1].arrival
+                legs.append(Leg(timetable.stop_names[first], timetable.stop_names[to_stop], departure,
+                                departure + timedelta(seconds=self._footpath_seconds(first, to_stop)),
+                                TransportType.WALKING))
+                continue
+            trip = timetable.connection_trip[first]
+            route = timetable.trip_route[trip]
+            legs.append(Leg(
+                timetable.stop_names[timetable.connection_from[first]],
+                timetable.stop_names[to_stop],
+                midnight + timedelta(seconds=timetable.connection_departure[first] + offset),
+                midnight + timedelta(seconds=timetable.connection_arrival[last] + offset),
+                transport_type_for_route_type(timetable.route_type[route]),
+                route_id=timetable.route_label(route),
+                route_name=timetable.route_long_names[route] or timetable.route_label(route),
+                headsign=timetable.trip_headsigns[trip] or None
+            ))
+
+        if sources[stop]:
+            legs.insert(0, Leg(origin, legs[0].from_name, legs[0].departure - timedelta(seconds=sources[stop]),
+                               legs[0].departure, TransportType.WALKING))
+        if targets[final_stop]:
+            legs.append(Leg(legs[-1].to_name, destination, legs[-1].arrival,
+                            legs[-1].arrival + timedelta(seconds=targets[final_stop]), TransportType.WALKING))
+        return Itinerary(legs)
+
+    def _footpath_seconds(self, from_stop: int, to_stop: int) -> int:
+        timetable = self.timetable
+        for path in range(timetable.footpath_start[from_stop], timetable.footpath_start[from_stop + 1]):
+            if timetable.footpath_to[path] == to_stop:
+                return timetable.footpath_seconds[path]
+        return 0
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# llm_cassette.py
+# Record/replay cassettes for LLM calls, so test runs are fast and deterministic
+
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+
+from llm_client import LLMClient, PermanentLLMError, create_client, join_system_instruction
+
+CASSETTE_VERSION = 1
+
+class CassetteMissError(PermanentLLMError):
+    """Raised in replay mode when a prompt was never recorded"""
+
+def fingerprint_prompt(prompt: str) -> str:
+    """Stable fingerprint of a prompt's exact text."""
+    return hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+
+def load_cassette(path: str) -> Dict:
+    """Load a cassette file, or return an empty cassette if it does not exist."""
+    if not os.path.exists(path):
+        return {'version': CASSETTE_VERSION, 'model_name': None, 'interactions': []}
+    with open(path, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+def save_cassette(path: str, cassette: Dict) -> None:
+    """Atomically write a cassette file."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as file:
+        json.dump(cassette, file, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+class CassetteBackend:
+    """
+    Backend wrapper that records model calls to a cassette file, or replays
+    them without touching the wrapped backend.
+    
+    Record mode calls the real backend and saves each prompt fingerprint,
+    prompt size and response. Replay mode answers instantly from the cassette
+    and raises CassetteMissError for any prompt it has not seen.
+    """
+    
+    def __init__(self, path: str, mode: str = 'replay', backend=None):
+        if mode not in ('record', 'replay'):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        if mode == 'record' and backend is None:
+            raise ValueError("Record mode needs a backend to record from")
+        
+        self.path = path
+        self.mode = mode
+        self.backend = backend
+        self.cassette = load_cassette(path) if mode == 'replay' else {
+            'version': CASSETTE_VERSION,
+            'model_name': backend.model_name,
+            'interactions': []
+        }
+        self._responses = {
+            interaction['fingerprint']: interaction['response']
+            for interaction in self.cassette['interactions']
+        }
+    
+    @property
+    def model_name(self) -> str:
+        if self.backend is not None:
+            return self.backend.model_name
+        return self.cassette.get('model_name') or 'cassette'
+    
+    def _replay(self, prompt: str) -> str:
+        fingerprint = fingerprint_prompt(prompt)
+        if fingerprint not in self._responses:
+            raise CassetteMissError(
+                f"Prompt {fingerprint[:12]} ({len(prompt)} chars) is not in cassette {self.path}; "
+                f"re-record it with --record"
+            )
+        return self._responses[fingerprint]
+    
+    def _record(self, prompt: str, response: str) -> str:
+        fingerprint = fingerprint_prompt(prompt)
+        self.cassette['interactions'].append({
+            'fingerprint': fingerprint,
+            'prompt_chars': len(prompt),
+            'prompt_words': len(prompt.split()),
+            'response': response,
+            'response_chars': len(response)
+        })
+        self._responses[fingerprint] = response
+        save_cassette(self.path, self.cassette)
+        return response
+    
+    # Interactions are keyed on the system instruction and prompt joined, so a
+    # cassette does not depend on whether callers split the prompt
+    
+    async def generate(self, prompt: str, system_instruction: Optional[str] = None) -> str:
+        full_prompt = join_system_instruction(prompt, system_instruction)
+        if self.mode == 'replay':
+            return self._replay(full_prompt)
+        return self._record(full_prompt, await self.backend.generate(prompt, system_instruction))
+    
+    def generate_sync(self, prompt: str, system_instruction: Optional[str] = None) -> str:
+        full_prompt = join_system_instruction(prompt, system_instruction)
+        if self.mode == 'replay':
+            return self._replay(full_prompt)
+        return self._record(full_prompt, self.backend.generate_sync(prompt, system_instruction))
+
+    async def stream(self, prompt: str, system_instruction: Optional[str] = None) -> AsyncIterator[str]:
+        # Chunk boundaries are not recorded; replay yields the whole response at once
+        full_prompt = join_system_instruction(prompt, system_instruction)
+        if self.mode == 'replay':
+            yield self._replay(full_prompt)
+            return
+        chunks = []
+        async for chunk in self.backend.stream(prompt, system_instruction):
+            chunks.append(chunk)
+            yield chunk
+        self._record(full_prompt, ''.join(chunks))
+    
+    def stream_sync(self, prompt: str, system_instruction: Optional[str] = None) -> Iterator[str]:
+        full_prompt = join_system_instruction(prompt, system_instruction)
+        if self.mode == 'replay':
+            yield self._replay(full_prompt)
+            return
+        chunks = []
+        for chunk in self.backend.stream_sync(prompt, system_instruction):
+            chunks.append(chunk)
+            yield chunk
+        self._record(full_prompt, ''.join(chunks))
+
+def create_cassette_client(path: str, mode: str, backend: Optional[str] = None, **client_options) -> LLMClient:
+    """
+    Create an LLM client that records to or replays from a cassette.
+    
+    Args:
+        path: Cassette file path
+        mode: "record" or "replay"
+        backend: Backend to record from (see create_client); unused for replay
+        **client_options: Passed through to LLMClient
+    
+    Returns:
+        Configured LLMClient
+    """
+    inner = create_client(backend).backend if mode == 'record' else None
+    return LLMClient(CassetteBackend(path, mode, inner), **client_options)
+
+def compare_prompt_sizes(baseline: Dict, current: Dict, threshold: float = 0.05) -> List[str]:
+    """
+    Compare prompt sizes between two cassettes recorded from the same suite.
+    
+    Interactions are matched by recording order. Returns a message for each
+    prompt that grew by more than threshold (as a fraction).
+    """
+    regressions = []
+    pairs = zip(baseline['interactions'], current['interactions'])
+    for index, (old, new) in enumerate(pairs, 1):
+        growth = (new['prompt_chars'] - old['prompt_chars']) / max(old['prompt_chars'], 1)
+        if growth > threshold:
+            regressions.append(
+                f"Prompt #{index}: {old['prompt_chars']} → {new['prompt_chars']} chars (+{growth * 100:.1f}%)"
+            )
+    return regressions
+
+def print_report(cassette: Dict) -> None:
+    """Print prompt and response sizes for every recorded interaction."""
+    interactions = cassette['interactions']
+    print(f"📼 {len(interactions)} interactions recorded with {cassette.get('model_name')}")
+    for index, interaction in enumerate(interactions, 1):
+        print(f"  #{index:<3} {interaction['fingerprint'][:12]}  prompt {interaction['prompt_chars']:>6} chars  "
+              f"response {interaction['response_chars']:>6} chars")
+    if interactions:
+        total = sum(interaction['prompt_chars'] for interaction in interactions)
+        print(f"📋 Total prompt size: {total} chars")
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect TravelBuddy LLM cassettes')
+    parser.add_argument('cassette', help='Cassette file to report on')
+    parser.add_argument('--baseline', type=str, help='Older cassette to compare prompt sizes against')
+    parser.add_argument('--threshold', type=float, default=0.05, help='Allowed prompt growth as a fraction')
+    args = parser.parse_args()
+    
+    current = load_cassette(args.cassette)
+    print_report(current)
+    
+    if args.baseline:
+        regressions = compare_prompt_sizes(load_cassette(args.baseline), current, args.threshold)
+        if regressions:
+            print(f"\n❌ PROMPT SIZE REGRESSIONS:")
+            for regression in regressions:
+                print(f"  • {regression}")
+            raise SystemExit(1)
+        print(f"\n✅ No prompt grew by more than {args.threshold * 100:.0f}%")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+# llm_client.py
+# Shared LLM client layer for TravelBuddy: async interface, concurrency
+# limiting, timeouts and retries over pluggable backends
+
+import asyncio
+import hashlib
+import os
+import random
+import re
+import sys
+import time
+from typing import AsyncIterator, Iterator, Optional
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+DEFAULT_MODEL = 'gemini-2.0-flash-exp'
+
+class LLMError(Exception):
+    """Raised when a model call fails after all retries"""
+
+class PermanentLLMError(LLMError):
+    """Raised for model call failures that retrying cannot fix"""
+
+def join_system_instruction(prompt: str, system_instruction: Optional[str] = None) -> str:
+    """Fold a system instruction into the prompt, for backends that take a single string."""
+    if system_instruction:
+        return system_instruction + "\n\n" + prompt
+    return prompt
+
+LATENCY_DISTRIBUTIONS = ('uniform', 'lognormal', 'exponential')
+
+def sample_latency(rng: random.Random, latency: float, jitter: float = 0.0,
+                   distribution: str = 'uniform') -> float:
+    """
+    Draw a simulated service latency in seconds.
+    
+    Args:
+        rng: Random source, so runs are reproducible
+        latency: Mean for "uniform" and "exponential", median for "lognormal"
+        jitter: Half-width for "uniform", sigma of the log for "lognormal"
+        distribution: One of LATENCY_DISTRIBUTIONS
+    """
+    if distribution == 'uniform':
+        return max(0.0, latency + rng.uniform(-jitter, jitter))
+    if distribution == 'lognormal':
+        # Long right tail, like real API latencies
+        return latency * rng.lognormvariate(0.0, jitter) if latency > 0 else 0.0
+    if distribution == 'exponential':
+        return rng.expovariate(1 / latency) if latency > 0 else 0.0
+    raise ValueError(f"Unknown latency distribution: {distribution}")
+
+def setup_gemini():
+    """
+    Setup Gemini API with the API key from environment variables.
+    
+    google.generativeai takes most of a second to import, so it is loaded
+    here on first use rather than when this module is imported.
+    """
+    api_key = os.getenv('GEMINI_API_KEY')
+    if not api_key:
+        print("❌ Error: GEMINI_API_KEY not found in environment variables")
+        print("Please add your Gemini API key to the .env file")
+        print("Example: GEMINI_API_KEY=your_api_key_here")
+        sys.exit(1)
+    
+    import google.generativeai as genai
+    genai.configure(api_key=api_key)
+    return genai
+
+class GeminiBackend:
+    """
+    Backend calling the Gemini API.
+    
+    A system instruction is set on the model rather than repeated in every
+    prompt, so the API can cache the shared prefix. One model object is kept
+    per distinct system instruction (one per content type). SDK versions
+    without system_instruction support get it folded into the prompt.
+    """
+    
+    def __init__(self, model_name: str = DEFAULT_MODEL):
+        self._genai = setup_gemini()
+        self.model = self._genai.GenerativeModel(model_name)
+        self.model_name = self.model.model_name
+        self._models = {None: self.model}
+        self._system_instruction_supported = True
+    
+    def _prepare(self, prompt: str, system_instruction: Optional[str]):
+        """Return the model and contents to send for a prompt."""
+        if not system_instruction:
+            return self.model, prompt
+        if self._system_instruction_supported and system_instruction not in self._models:
+            try:
+                self._models[system_instruction] = self._genai.GenerativeModel(
+                    self.model_name, system_instruction=system_instruction
+                )
+            except TypeError:
+                self._system_instruction_supported = False
+        if not self._system_instruction_supported:
+            return self.model, join_system_instruction(prompt, system_instruction)
+        return self._models[system_instruction], prompt
+    
+    async def generate(self, prompt: str, system_instruction: Optional[str] = None) -> str:
+        # The SDK call blocks, so run it off the event loop
+        return await asyncio.to_thread(self.generate_sync, prompt, system_instruction)
+    
+    def generate_sync(self, prompt: str, system_instruction: Optional[str] = None) -> str:
+        model, contents = self._prepare(prompt, system_instruction)
+        return model.generate_content(contents).text
+    
+    async def stream(self, prompt: str, system_instruction: Optional[str] = None) -> AsyncIterator[str]:
+        # Pump the blocking SDK iterator from a worker thread into the event loop
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
+        
+        def pump():
+            try:
+                for chunk in self.stream_sync(prompt, system_instruction):
+                    loop.call_soon_threadsafe(queue.put_nowait, chunk)
+                loop.call_soon_threadsafe(queue.put_nowait, done)
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+        
+        worker = loop.run_in_executor(None, pump)
+        while True:
+            item = await queue.get()
+            if item is done:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+        await worker
+    
+    def stream_sync(self, prompt: str, system_instruction: Optional[str] = None) -> Iterator[str]:
+        model, contents = self._prepare(prompt, system_instruction)
+        for chunk in model.generate_content(contents, stream=True):
+            if chunk.text:
+                yield chunk.text
+
+class FakeBackend:
+    """
+    Deterministic local stand-in for the Gemini backend.
+    
+    Responses are derived from the prompt alone, so the same prompt always
+    gets the same answer. Latency (with a choice of distribution), jitter and
+    error rate are configurable to load-test the pipeline offline, with no
+    network and no API key.
+    """
+    
+    def __init__(self, latency: float = 0.05, jitter: float = 0.0, error_rate: float = 0.0,
+                 seed: int = 0, model_name: str = 'fake-travelbuddy', chunk_words: int = 4,
+                 chunk_interval: float = 0.005, distribution: str = 'uniform'):
+        self.latency = latency
+        self.distribution = distribution
+        self.chunk_words = chunk_words
+        self.chunk_interval = chunk_interval
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.model_name = model_name
+        self.calls = 0
+        self._rng = random.Random(seed)
+    
+    def _next_delay(self) -> float:
+        self.calls += 1
+        if self.error_rate and self._rng.random() < self.error_rate:
+            raise LLMError("Fake backend injected failure")
+        return sample_latency(self._rng, self.latency, self.jitter, self.distribution)
+    
+    async def generate(self, prompt: str, system_instruction: Optional[str] = None) -> str:
+        await asyncio.sleep(self._next_delay())
+        return self.respond(join_system_instruction(prompt, system_instruction))
+    
+    def generate_sync(self, prompt: str, system_instruction: Optional[str] = None) -> str:
+        time.sleep(self._next_delay())
+        return self.respond(join_system_instruction(prompt, system_instruction))
+    
+    def _chunks(self, response: str) -> Iterator[str]:
+        # Split on spaces but keep them, so the chunks join back to the response
+        pieces = response.split(' ')
+        for i in range(0, len(pieces), self.chunk_words):
+            chunk = ' '.join(pieces[i:i + self.chunk_words])
+            yield chunk if i + self.chunk_words >= len(pieces) else chunk + ' '
+    
+    async def stream(self, prompt: str, system_instruction: Optional[str] = None) -> AsyncIterator[str]:
+        await asyncio.sleep(self._next_delay())
+        for i, chunk in enumerate(self._chunks(self.respond(join_system_instruction(prompt, system_instruction)))):
+            if i:
+                await asyncio.sleep(self.chunk_interval)
+            yield chunk
+    
+    def stream_sync(self, prompt: str, system_instruction: Optional[str] = None) -> Iterator[str]:
+        time.sleep(self._next_delay())
+        for i, chunk in enumerate(self._chunks(self.respond(join_system_instruction(prompt, system_instruction)))):
+            if i:
+                time.sleep(self.chunk_interval)
+            yield chunk
+    
+    @staticmethod
+    def respond(prompt: str) -> str:
+        """Build a short, deterministic answer shaped like a TravelBuddy summary."""
+        match = re.search(r'(?:Text|Current|Simplified): (.*?)(?:\n\n|$)', prompt, re.S)
+        words = (match.group(1) if match else prompt).split()
+        limit_match = re.search(r'under (\d+) words', prompt)
+        limit = int(limit_match.group(1)) if limit_match else 60
+        
+        points = [" ".join(words[i:i + 10]) for i in range(0, min(len(words), limit - 10), 10)][:3]
+        digest = hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:8]
+        bullets = "\n".join(f"• {point}" for point in points)
+        return f"📋 Summary\n\n{bullets}\n\n💡 Reference {digest}"
+
+class LLMClient:
+    """
+    Async model client with a concurrency limit, per-call timeout and
+    retries with exponential backoff and full jitter.
+    """
+    
+    def __init__(self, backend, max_concurrency: int = 8, timeout: float = 30.0,
+                 max_retries: int = 3, backoff_base: float = 0.5, backoff_max: float = 8.0):
+        self.backend = backend
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop = None
+    
+    @property
+    def model_name(self) -> str:
+        return self.backend.model_name
+    
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # A semaphore belongs to one event loop; make a new one per loop
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+    
+    def _backoff_delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+    
+    async def generate(self, prompt: str, system_instruction: Optional[str] = None) -> str:
+        """
+        Generate a response, waiting for a free slot under the concurrency limit.
+        
+        Args:
+            prompt: Per-request prompt
+            system_instruction: Optional static instruction shared across requests
+        """
+        async with self._get_semaphore():
+            last_error = None
+            for attempt in range(self.max_retries + 1):
+                try:
+                    return await asyncio.wait_for(self.backend.generate(prompt, system_instruction), self.timeout)
+                except PermanentLLMError:
+                    raise
+                except asyncio.TimeoutError:
+                    last_error = LLMError(f"Model call timed out after {self.timeout}s")
+                except Exception as e:
+                    last_error = e
+                
+                if attempt < self.max_retries:
+                    await asyncio.sleep(self._backoff_delay(attempt))
+            
+            raise LLMError(f"Model call failed after {self.max_retries + 1} attempts: {last_error}") from last_error
+    
+    def generate_sync(self, prompt: str, system_instruction: Optional[str] = None) -> str:
+        """Blocking wrapper around generate() for scripts without an event loop."""
+        return asyncio.run(self.generate(prompt, system_instruction))
+    
+    async def stream(self, prompt: str, system_instruction: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Yield response chunks as the backend produces them.
+        
+        The timeout applies to the wait for each chunk. Failures before the
+        first chunk are retried like generate(); once text has been yielded
+        the stream cannot be restarted, so later failures raise LLMError.
+        """
+        async with self._get_semaphore():
+            last_error = None
+            for attempt in range(self.max_retries + 1):
+                chunks = self.backend.stream(prompt, system_instruction).__aiter__()
+                started = False
+                try:
+                    while True:
+                        try:
+                            chunk = await asyncio.wait_for(chunks.__anext__(), self.timeout)
+                        except StopAsyncIteration:
+                            return
+                        started = True
+                        yield chunk
+                except PermanentLLMError:
+                    raise
+                except asyncio.TimeoutError:
+                    last_error = LLMError(f"Model stream timed out after {self.timeout}s")
+                except Exception as e:
+                    last_error = e
+                finally:
+                    await chunks.aclose()
+                
+                if started:
+                    raise LLMError(f"Model stream failed mid-response: {last_error}") from last_error
+                if attempt < self.max_retries:
+                    await asyncio.sleep(self._backoff_delay(attempt))
+            
+            raise LLMError(f"Model stream failed after {self.max_retries + 1} attempts: {last_error}") from last_error
+    
+    def stream_sync(self, prompt: str, system_instruction: Optional[str] = None) -> Iterator[str]:
+        """Blocking wrapper around stream() that yields chunks as they arrive."""
+        loop = asyncio.new_event_loop()
+        chunks = self.stream(prompt, system_instruction)
+        try:
+            while True:
+                try:
+                    yield loop.run_until_complete(chunks.__anext__())
+                except StopAsyncIteration:
+                    break
+        finally:
+            loop.run_until_complete(chunks.aclose())
+            loop.close()
+
+def create_client(backend: Optional[str] = None, model_name: str = DEFAULT_MODEL, **client_options) -> LLMClient:
+    """
+    Create an LLM client for the given backend.
+    
+    Args:
+        backend: "gemini" or "fake"; defaults to TRAVELBUDDY_LLM_BACKEND or "gemini"
+        model_name: Gemini model name (ignored by the fake backend)
+        **client_options: Passed through to LLMClient
+    
+    Returns:
+        Configured LLMClient
+    """
+    backend = backend or os.getenv('TRAVELBUDDY_LLM_BACKEND', 'gemini')
+    if backend == 'fake':
+        latency = float(os.getenv('TRAVELBUDDY_FAKE_LATENCY', '0.05'))
+        return LLMClient(FakeBackend(latency=latency), **client_options)
+    if backend == 'gemini':
+        return LLMClient(GeminiBackend(model_name), **client_options)
+    raise ValueError(f"Unknown LLM backend: {backend}")
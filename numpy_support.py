@@ -0,0 +1,22 @@
+# numpy_support.py
+# Optional NumPy: one import check shared by the vectorized code paths
+
+from functools import lru_cache
+
+@lru_cache(maxsize=None)
+def optional_numpy():
+    """The numpy module, or None when it is not installed."""
+    try:
+        import numpy
+        return numpy
+    except ImportError:
+        return None
+
+def numpy_for(count: int, min_count: int):
+    """
+    NumPy for a batch of count items, or None to use plain Python.
+
+    Below min_count items a Python loop beats NumPy's per-call overhead;
+    each caller measures its own threshold.
+    """
+    return optional_numpy() if count >= min_count else None
@@ -1,17 +1,21 @@
 # prompts.py
 # Optimized prompt management for TravelBuddy application
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, Iterator, List, Optional, TextIO, Tuple
 import json
+import os
 import sys
 import argparse
+import hashlib
+import itertools
+import socketserver
 
-# Base prompt template for consistent structure
-BASE_PROMPT_TEMPLATE = """You are TravelBuddy, a patient and ultra-clear guide for busy international tourists. Your goal is to instantly simplify complex text into actionable, easy-to-digest information that reduces confusion and stress.
-
-{context}
+from content_classifier import classify_content_type
 
-Text: {complex_text}
+# Base prompt template for consistent structure. Everything except the
+# user's text is fixed per content type and goes first, so it can be sent as
+# a system instruction and reused by model-side prefix caching.
+BASE_PROMPT_TEMPLATE = """You are TravelBuddy, a patient and ultra-clear guide for busy international tourists. Your goal is to instantly simplify complex text into actionable, easy-to-digest information that reduces confusion and stress.
 
 {instructions}
 
@@ -20,6 +24,10 @@ Format as:
 
 Keep under {word_limit} words. Focus on what tourists NEED to know."""
 
+# Separator between the static system instruction and the per-request prompt
+# when they are sent as one string
+PROMPT_SEPARATOR = "\n\n"
+
 # Prompt configurations for different content types
 PROMPT_CONFIGS = {
     "general": {
@@ -83,70 +91,156 @@ PROMPT_CONFIGS = {
     }
 }
 
-# Cached prompt templates for performance
+# Content type that asks for the type to be detected from the text
+AUTO_CONTENT_TYPE = "auto"
+
+# Fingerprint of the prompt configuration; changes whenever templates change,
+# so cached model outputs built from older prompts are not reused
+PROMPT_CONFIG_VERSION = hashlib.sha256(
+    (BASE_PROMPT_TEMPLATE + json.dumps(PROMPT_CONFIGS, sort_keys=True)).encode("utf-8")
+).hexdigest()[:16]
+
+# Cached system instructions (the static prompt prefix) for performance
 _cached_prompts: Dict[str, str] = {}
 
-def get_simplification_prompt(complex_text: str, content_type: str = "general", specific_context: str = "") -> str:
+def get_system_instruction(content_type: str = "general") -> str:
     """
-    Efficient prompt generation with caching and unified structure.
+    Return the static part of a simplification prompt for a content type.
     
-    Args:
-        complex_text: The text to simplify
-        content_type: Type of content (general, public_transport, etc.)
-        specific_context: Additional context if needed
-    
-    Returns:
-        Formatted prompt string
+    It is built once per content type and does not depend on the text, so
+    it can be passed as a model system instruction or reused as a cached
+    prompt prefix.
     """
-    # Use cached prompt if available
-    cache_key = f"{content_type}_{bool(specific_context)}"
-    if cache_key in _cached_prompts:
-        return _cached_prompts[cache_key].format(
-            complex_text=complex_text,
-            context=f"\nContext: {specific_context}" if specific_context else ""
-        )
+    if content_type in _cached_prompts:
+        return _cached_prompts[content_type]
     
     # Get configuration for content type
     config = PROMPT_CONFIGS.get(content_type, PROMPT_CONFIGS["general"])
     
-    # Build context
-    context = f"\nContext: {specific_context}" if specific_context else ""
-    
-    # Generate and cache the prompt template
-    prompt_template = BASE_PROMPT_TEMPLATE.format(
-        context="{context}",
-        complex_text="{complex_text}",
+    system_instruction = BASE_PROMPT_TEMPLATE.format(
         instructions=config["instructions"],
         format_template=config["format_template"],
         word_limit=config["word_limit"]
     )
     
-    _cached_prompts[cache_key] = prompt_template
+    _cached_prompts[content_type] = system_instruction
+    return system_instruction
+
+def _build_user_prompt(complex_text: str, specific_context: str = "") -> str:
+    # Plain concatenation: the text may contain braces, and it is formatted exactly once
+    if specific_context:
+        return "Context: " + specific_context + PROMPT_SEPARATOR + "Text: " + complex_text
+    return "Text: " + complex_text
+
+def resolve_content_type(complex_text: str, content_type: str) -> str:
+    """Resolve "auto" to a PROMPT_CONFIGS key with the local classifier; other types pass through."""
+    if content_type == AUTO_CONTENT_TYPE:
+        return classify_content_type(complex_text)
+    return content_type
+
+def get_simplification_prompt_parts(complex_text: str, content_type: str = "general",
+                                    specific_context: str = "") -> Tuple[str, str]:
+    """
+    Split a simplification prompt into its static and per-request parts.
+    
+    Args:
+        complex_text: The text to simplify
+        content_type: Type of content (general, public_transport, etc.), or "auto" to detect it
+        specific_context: Additional context if needed
     
-    # Return formatted prompt
-    return prompt_template.format(
-        complex_text=complex_text,
-        context=context
-    )
+    Returns:
+        (system_instruction, user_prompt); joined with PROMPT_SEPARATOR they
+        equal get_simplification_prompt()
+    """
+    content_type = resolve_content_type(complex_text, content_type)
+    return get_system_instruction(content_type), _build_user_prompt(complex_text, specific_context)
+
+def get_simplification_prompt(complex_text: str, content_type: str = "general", specific_context: str = "") -> str:
+    """
+    Efficient prompt generation with caching and unified structure.
+    
+    Args:
+        complex_text: The text to simplify
+        content_type: Type of content (general, public_transport, etc.), or "auto" to detect it
+        specific_context: Additional context if needed
+    
+    Returns:
+        Formatted prompt string: the cached system instruction, then the text
+    """
+    system_instruction, user_prompt = get_simplification_prompt_parts(complex_text, content_type, specific_context)
+    return system_instruction + PROMPT_SEPARATOR + user_prompt
 
-def get_quality_improvement_prompt(simplified_text: str, original_complex_text: str) -> str:
+def get_simplification_prompts_batch(items: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """
+    Lazily generate simplification prompts for many texts.
+    
+    Each system instruction is resolved once per content type for the whole
+    batch, and prompts are yielded one at a time so the input can be streamed.
+    
+    Args:
+        items: Dicts with "text" and optional "type" ("auto" allowed) and "context" keys
+    
+    Returns:
+        Iterator of formatted prompt strings, in input order
+    """
+    prefixes: Dict[str, str] = {}
+    for item in items:
+        content_type = resolve_content_type(item["text"], item.get("type", "general"))
+        prefix = prefixes.get(content_type)
+        if prefix is None:
+            prefix = prefixes[content_type] = get_system_instruction(content_type) + PROMPT_SEPARATOR
+        
+        yield prefix + _build_user_prompt(item["text"], item.get("context", ""))
+
+def get_quality_improvement_prompt(simplified_text: str, original_complex_text: str,
+                                   issues: Optional[List[str]] = None, word_limit: int = 60) -> str:
     """
     Optimized prompt for improving simplified text quality.
+    
+    Args:
+        simplified_text: Current simplification
+        original_complex_text: Text it was simplified from
+        issues: Failed checks from the local validator, listed for the model to fix
+        word_limit: Word limit of the content type
     """
+    fixes = ""
+    if issues:
+        fixes = "\n\nFix these problems:\n" + "\n".join(f"• {issue}" for issue in issues)
+    
     return f"""You are TravelBuddy. Make this SHORTER and CLEARER.
 
 Original: {original_complex_text}
 
-Current: {simplified_text}
+Current: {simplified_text}{fixes}
 
 Improve by:
-• Making it shorter (under 60 words)
+• Making it shorter (under {word_limit} words)
 • Keeping only essential info
 • Using simple language
 • Clear formatting
 
 Provide the improved version."""
 
+def get_section_merge_prompt(section_summaries: str, content_type: str = "general") -> str:
+    """
+    Optimized prompt for merging per-section simplifications of one document.
+    
+    The input is already simplified, so this is a short, cheap call.
+    """
+    config = PROMPT_CONFIGS.get(content_type, PROMPT_CONFIGS["general"])
+    return f"""You are TravelBuddy. Merge these section summaries into one SHORT guide.
+
+Summaries:
+{section_summaries}
+
+Rules:
+• Keep every section, in the same order
+• Keep the format of each section
+• Remove repeated tips and facts
+• Keep each section under {config["word_limit"]} words
+
+Provide the merged guide."""
+
 def get_trip_planning_prompt(user_request: str, tourist_profile: Optional[Dict[str, Any]] = None) -> str:
     """
     Optimized prompt for trip planning with optional tourist profile.
@@ -253,18 +347,146 @@ def export_prompts_to_json() -> str:
     """Export prompt configurations to JSON for frontend use."""
     return json.dumps(PROMPT_CONFIGS, indent=2)
 
+def write_prompts_batch(input_stream: TextIO, output_stream: TextIO) -> None:
+    """
+    Stream JSONL items from input_stream and write one JSONL prompt per item.
+    
+    Input lines look like {"id": ..., "type": ..., "text": ..., "context": ...};
+    output lines are {"id": ..., "prompt": ...}. Lines are processed one at a
+    time, so memory use does not grow with the size of the input.
+    """
+    items = (json.loads(line) for line in input_stream if line.strip())
+    
+    # tee keeps at most one item buffered, since both sides advance in lockstep
+    source, ids = itertools.tee(items)
+    for item, prompt in zip(ids, get_simplification_prompts_batch(source)):
+        output_stream.write(json.dumps({"id": item.get("id"), "prompt": prompt}, ensure_ascii=False) + "\n")
+
+# Persistent prompt server for TypeScript integration
+def handle_server_request(request: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Answer a single prompt server request.
+    
+    Args:
+        request: Decoded JSON request with an "op" field and an optional "id"
+    
+    Returns:
+        Response dict echoing the request id
+    """
+    response: Dict[str, Any] = {"id": request.get("id")}
+    op = request.get("op", "get_prompt")
+    
+    if op == "get_prompt":
+        if "text" not in request:
+            response["error"] = "Missing required field: text"
+            return response
+        response["prompt"] = get_simplification_prompt(
+            request["text"],
+            request.get("type", "general"),
+            request.get("context", "")
+        )
+    elif op == "get_prompt_parts":
+        if "text" not in request:
+            response["error"] = "Missing required field: text"
+            return response
+        response["systemInstruction"], response["prompt"] = get_simplification_prompt_parts(
+            request["text"],
+            request.get("type", "general"),
+            request.get("context", "")
+        )
+    elif op == "classify":
+        if "text" not in request:
+            response["error"] = "Missing required field: text"
+            return response
+        response["type"] = classify_content_type(request["text"])
+    elif op == "list_types":
+        response["types"] = get_available_content_types()
+    elif op == "export_json":
+        response["configs"] = PROMPT_CONFIGS
+    elif op == "ping":
+        response["ok"] = True
+    else:
+        response["error"] = f"Unknown op: {op}"
+    
+    return response
+
+def serve_stream(input_stream: TextIO, output_stream: TextIO) -> None:
+    """
+    Answer JSON-lines prompt requests until the input stream closes.
+    
+    One JSON object per line in, one JSON object per line out. The process
+    stays resident, so PROMPT_CONFIGS and the cached system instructions stay warm across
+    requests instead of being rebuilt by a fresh interpreter each time.
+    """
+    for line in input_stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            request = json.loads(line)
+            response = handle_server_request(request)
+        except Exception as e:
+            response = {"id": None, "error": f"Invalid request: {e}"}
+        output_stream.write(json.dumps(response, ensure_ascii=False) + "\n")
+        output_stream.flush()
+
+class _SocketWriter:
+    """Minimal text writer over a socket file object."""
+    
+    def __init__(self, wfile):
+        self.wfile = wfile
+    
+    def write(self, text: str) -> None:
+        self.wfile.write(text.encode("utf-8"))
+    
+    def flush(self) -> None:
+        self.wfile.flush()
+
+class _PromptRequestHandler(socketserver.StreamRequestHandler):
+    """Serve JSON-lines prompt requests over a single socket connection."""
+    
+    def handle(self):
+        reader = (line.decode("utf-8") for line in self.rfile)
+        writer = _SocketWriter(self.wfile)
+        serve_stream(reader, writer)
+
+def serve_unix_socket(socket_path: str) -> None:
+    """Serve JSON-lines prompt requests on a Unix domain socket."""
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    
+    with socketserver.ThreadingUnixStreamServer(socket_path, _PromptRequestHandler) as server:
+        try:
+            server.serve_forever()
+        finally:
+            os.remove(socket_path)
+
 # Command-line interface for TypeScript integration
 def main():
     parser = argparse.ArgumentParser(description='TravelBuddy Prompt Generator')
     parser.add_argument('--get-prompt', action='store_true', help='Generate a prompt')
-    parser.add_argument('--type', type=str, help='Content type for prompt generation')
+    parser.add_argument('--type', type=str, help='Content type for prompt generation ("auto" to detect it)')
     parser.add_argument('--text', type=str, help='Text to simplify')
     parser.add_argument('--context', type=str, default='', help='Additional context')
     parser.add_argument('--list-types', action='store_true', help='List available content types')
     parser.add_argument('--export-json', action='store_true', help='Export prompt configs to JSON')
+    parser.add_argument('--batch', action='store_true', help='Read JSONL items from stdin and write JSONL prompts to stdout')
+    parser.add_argument('--serve', action='store_true', help='Serve JSON-lines prompt requests over stdin/stdout')
+    parser.add_argument('--socket', type=str, help='Serve on this Unix socket path instead of stdin/stdout')
     
     args = parser.parse_args()
     
+    if args.batch:
+        write_prompts_batch(sys.stdin, sys.stdout)
+        return
+    
+    if args.serve:
+        if args.socket:
+            serve_unix_socket(args.socket)
+        else:
+            serve_stream(sys.stdin, sys.stdout)
+        return
+    
     if args.list_types:
         print(json.dumps(get_available_content_types()))
         return
@@ -281,6 +503,8 @@ def main():
     print("Usage: python prompts.py --get-prompt --type <type> --text <text>")
     print("       python prompts.py --list-types")
     print("       python prompts.py --export-json")
+    print("       python prompts.py --batch < items.jsonl > prompts.jsonl")
+    print("       python prompts.py --serve [--socket <path>]")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,163 @@
+# resilience.py
+# Circuit breaker for calls to flaky upstream services
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the upstream service while the circuit is open"""
+
+@dataclass
+class CircuitBreakerStats:
+    """Call counters and state change counters of a circuit breaker"""
+    state: str = CLOSED
+    calls: int = 0
+    successes: int = 0
+    failures: int = 0
+    rejected: int = 0
+    opened: int = 0
+    half_opened: int = 0
+    closed: int = 0
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breaker.
+
+    Closed: calls go through, and failure_threshold consecutive failures
+    open the circuit. Open: calls are rejected at once with
+    CircuitOpenError, so callers fall back without waiting on a service
+    that is down. After recovery_timeout the circuit is half-open and lets
+    up to half_open_max_calls probe calls through. A successful probe closes
+    it; a failed one opens it again for another recovery_timeout.
+
+    Errors that is_failure() rejects (e.g. "no route found") count as
+    successes, since the service answered.
+    """
+
+    def __init__(self, name: str = 'circuit', failure_threshold: int = 5, recovery_timeout: float = 30.0,
+                 half_open_max_calls: int = 1, is_failure: Callable[[Exception], bool] = lambda error: True,
+                 clock: Callable[[], float] = time.monotonic, history: int = 100):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.is_failure = is_failure
+        self.stats = CircuitBreakerStats()
+        # (wall clock time, old state, new state) of recent state changes
+        self.transitions: deque = deque(maxlen=history)
+        self._listeners: List[Callable[[str, str], None]] = []
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+
+    @property
+    def state(self) -> str:
+        """Current state; an open circuit whose timeout has passed reports half-open."""
+        with self._lock:
+            change = self._check_recovery()
+            state = self.stats.state
+        self._notify(change)
+        return state
+
+    def on_state_change(self, listener: Callable[[str, str], None]) -> None:
+        """Call listener(old_state, new_state) on every state change."""
+        self._listeners.append(listener)
+
+    def _set_state(self, state: str) -> Optional[Tuple[str, str]]:
+        # Called with the lock held; returns the change for _notify
+        old_state = self.stats.state
+        if old_state == state:
+            return None
+        self.stats.state = state
+        if state == OPEN:
+            self.stats.opened += 1
+            self._opened_at = self._clock()
+        elif state == HALF_OPEN:
+            self.stats.half_opened += 1
+            self._probes = 0
+        else:
+            self.stats.closed += 1
+        self.transitions.append((time.time(), old_state, state))
+        return old_state, state
+
+    def _notify(self, change: Optional[Tuple[str, str]]) -> None:
+        # Listeners run outside the lock so they may inspect the breaker
+        if change:
+            for listener in self._listeners:
+                listener(*change)
+
+    def _check_recovery(self) -> Optional[Tuple[str, str]]:
+        if self.stats.state == OPEN and self._clock() - self._opened_at >= self.recovery_timeout:
+            return self._set_state(HALF_OPEN)
+        return None
+
+    def allow(self) -> bool:
+        """Reserve a call; False means the caller must not call the service now."""
+        with self._lock:
+            change = self._check_recovery()
+            state = self.stats.state
+            allowed = state == CLOSED or (state == HALF_OPEN and self._probes < self.half_open_max_calls)
+            if allowed:
+                self.stats.calls += 1
+                if state == HALF_OPEN:
+                    self._probes += 1
+            else:
+                self.stats.rejected += 1
+        self._notify(change)
+        return allowed
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.stats.successes += 1
+            self._consecutive_failures = 0
+            change = self._set_state(CLOSED) if self.stats.state == HALF_OPEN else None
+        self._notify(change)
+
+    def record_failure(self, error: Optional[Exception] = None) -> None:
+        if error is not None and not self.is_failure(error):
+            self.record_success()
+            return
+        with self._lock:
+            self.stats.failures += 1
+            self._consecutive_failures += 1
+            change = None
+            if self.stats.state == HALF_OPEN or (
+                    self.stats.state == CLOSED and self._consecutive_failures >= self.failure_threshold):
+                change = self._set_state(OPEN)
+            elif self.stats.state == OPEN:
+                # A call allowed before the circuit opened failed late; restart the timeout
+                self._opened_at = self._clock()
+        self._notify(change)
+
+    def call(self, fn: Callable, *args, **kwargs):
+        """
+        Call fn through the breaker.
+
+        Raises:
+            CircuitOpenError: The circuit is open, fn was not called
+        """
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} circuit is {self.stats.state}")
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            self.record_failure(e)
+            raise
+        self.record_success()
+        return result
+
+    def reset(self) -> None:
+        """Close the circuit and forget recent failures."""
+        with self._lock:
+            self._consecutive_failures = 0
+            change = self._set_state(CLOSED)
+        self._notify(change)
@@ -0,0 +1,202 @@
+# result_cache.py
+# Content-addressed cache for simplification results
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from prompts import PROMPT_CONFIG_VERSION
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'simplifications.sqlite3')
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so formatting-only differences share a cache entry."""
+    return " ".join(text.split())
+
+def make_cache_key(text: str, content_type: str, model_name: str,
+                   config_version: str = PROMPT_CONFIG_VERSION) -> str:
+    """Build a content-addressed key from the normalized text and everything that shapes the output."""
+    digest = hashlib.sha256()
+    for part in (normalize_text(text), content_type, config_version, model_name):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters for a cache"""
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+    
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+class LRUCache:
+    """Bounded in-memory least-recently-used cache"""
+    
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class DiskCache:
+    """Persistent SQLite key/value store with TTL expiry and size-bounded eviction"""
+    
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl_seconds: float = 7 * 24 * 3600,
+                 max_entries: int = 100_000):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS cache ('
+            'key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+            'created_at REAL NOT NULL, accessed_at REAL NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at)')
+        self._conn.commit()
+    
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value, created_at FROM cache WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            
+            value, created_at = row
+            if now - created_at > self.ttl_seconds:
+                self._conn.execute('DELETE FROM cache WHERE key = ?', (key,))
+                self._conn.commit()
+                return None
+            
+            self._conn.execute('UPDATE cache SET accessed_at = ? WHERE key = ?', (now, key))
+            self._conn.commit()
+            return value
+    
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO cache (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)',
+                (key, value, now, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+    
+    def _evict(self, now: float) -> None:
+        """Drop expired rows, then the least recently used rows over max_entries."""
+        self._conn.execute('DELETE FROM cache WHERE created_at < ?', (now - self.ttl_seconds,))
+        count = self._conn.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+        if count > self.max_entries:
+            self._conn.execute(
+                'DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed_at LIMIT ?)',
+                (count - self.max_entries,)
+            )
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute('DELETE FROM cache')
+            self._conn.commit()
+    
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+class SimplificationCache:
+    """Two-tier (memory LRU + SQLite) cache for simplified text"""
+    
+    def __init__(self, memory_entries: int = 256, disk_path: Optional[str] = DEFAULT_CACHE_PATH,
+                 ttl_seconds: float = 7 * 24 * 3600, max_disk_entries: int = 100_000):
+        self.memory = LRUCache(memory_entries)
+        self.disk = DiskCache(disk_path, ttl_seconds, max_disk_entries) if disk_path else None
+        self.stats = CacheStats()
+    
+    def get(self, text: str, content_type: str, model_name: str) -> Optional[str]:
+        """Look up a simplified result, promoting disk hits into memory."""
+        key = make_cache_key(text, content_type, model_name)
+        
+        value = self.memory.get(key)
+        if value is not None:
+            self.stats.memory_hits += 1
+            return value
+        
+        if self.disk:
+            value = self.disk.get(key)
+            if value is not None:
+                self.stats.disk_hits += 1
+                self.memory.set(key, value)
+                return value
+        
+        self.stats.misses += 1
+        return None
+    
+    def set(self, text: str, content_type: str, model_name: str, simplified_text: str) -> None:
+        """Store a simplified result in both tiers."""
+        key = make_cache_key(text, content_type, model_name)
+        self.memory.set(key, simplified_text)
+        if self.disk:
+            self.disk.set(key, simplified_text)
+    
+    def get_or_generate(self, text: str, content_type: str, model_name: str,
+                        generate: Callable[[], str]) -> str:
+        """Return the cached result, or call generate() and cache what it returns."""
+        value = self.get(text, content_type, model_name)
+        if value is None:
+            value = generate()
+            self.set(text, content_type, model_name, value)
+        return value
+    
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.disk:
+            self.disk.clear()
+
+_simplification_cache: Optional[SimplificationCache] = None
+
+def get_simplification_cache() -> SimplificationCache:
+    """Return the shared simplification cache, creating it on first use."""
+    global _simplification_cache
+    if _simplification_cache is None:
+        disk_path = os.getenv('TRAVELBUDDY_CACHE_PATH', DEFAULT_CACHE_PATH)
+        _simplification_cache = SimplificationCache(disk_path=disk_path or None)
+    return _simplification_cache
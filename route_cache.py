@@ -0,0 +1,218 @@
+# route_cache.py
+# Time-bucketed cache of parsed Directions API routes with stale-while-revalidate
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+
+from geocoding import normalize_location_name
+from result_cache import CacheStats
+from route_model import RouteBatch
+
+# Transit schedules barely change within a few minutes
+DEFAULT_BUCKET_SECONDS = 300
+DEFAULT_TTL_SECONDS = 120
+DEFAULT_STALE_SECONDS = 600
+
+@dataclass
+class RouteCacheStats(CacheStats):
+    """Cache hit/miss counters plus stale serving and background refresh counters"""
+    stale_hits: int = 0
+    refreshes: int = 0
+    refresh_errors: int = 0
+
+def departure_bucket(departure_time: Optional[datetime] = None,
+                     bucket_seconds: int = DEFAULT_BUCKET_SECONDS) -> int:
+    """Index of the time bucket a departure falls in; None means leaving now."""
+    timestamp = departure_time.timestamp() if departure_time else time.time()
+    return int(timestamp // bucket_seconds)
+
+def make_route_key(origin: str, destination: str, mode: str = "transit",
+                   departure_time: Optional[datetime] = None,
+                   bucket_seconds: int = DEFAULT_BUCKET_SECONDS) -> Tuple[str, str, str, int]:
+    """Cache key from the normalized endpoints, travel mode and departure bucket."""
+    return (
+        normalize_location_name(origin),
+        normalize_location_name(destination),
+        mode,
+        departure_bucket(departure_time, bucket_seconds)
+    )
+
+class RouteCache:
+    """
+    Bounded LRU cache of parsed routes, stored as RouteBatch columns (or
+    TransportRoute lists).
+
+    An entry is fresh for ttl_seconds. For stale_seconds after that it is
+    still served at once, while a background thread fetches a replacement
+    (stale-while-revalidate). Older entries count as misses. The routes
+    last stored for each trip, whatever their departure bucket, stay
+    available to get_last_known() for when the API is down. Concurrent
+    misses for the same key share one fetch. Callers get fresh
+    TransportRoute objects, so annotating them (real-time info) never
+    changes the cache.
+    """
+
+    def __init__(self, max_entries: int = 2048, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 stale_seconds: float = DEFAULT_STALE_SECONDS, bucket_seconds: int = DEFAULT_BUCKET_SECONDS,
+                 refresh_workers: int = 2, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.bucket_seconds = bucket_seconds
+        self.refresh_workers = refresh_workers
+        self.stats = RouteCacheStats()
+        self._clock = clock
+        self._entries: OrderedDict = OrderedDict()
+        # (origin, destination, mode) to the routes last stored for it, in any bucket
+        self._last_known: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._pending: dict = {}
+        self._refreshing: set = set()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def key(self, origin: str, destination: str, mode: str = "transit",
+            departure_time: Optional[datetime] = None) -> Tuple[str, str, str, int]:
+        return make_route_key(origin, destination, mode, departure_time, self.bucket_seconds)
+
+    @staticmethod
+    def copy_routes(routes) -> List:
+        """Independent TransportRoute objects for a cached RouteBatch or route list."""
+        if isinstance(routes, RouteBatch):
+            return routes.to_routes()
+        return [copy.copy(route) for route in routes]
+
+    @staticmethod
+    def copy_batch(routes) -> RouteBatch:
+        """An independent RouteBatch of cached routes, for ranking without building TransportRoute objects."""
+        if isinstance(routes, RouteBatch):
+            return routes.copy()
+        return RouteBatch.from_routes(routes)
+
+    def _copy(self, routes, as_batch: bool):
+        return self.copy_batch(routes) if as_batch else self.copy_routes(routes)
+
+    def _store(self, key, routes: List) -> None:
+        with self._lock:
+            self._entries[key] = (routes, self._clock())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._last_known[key[:3]] = routes
+            self._last_known.move_to_end(key[:3])
+            while len(self._last_known) > self.max_entries:
+                self._last_known.popitem(last=False)
+
+    def _refresh(self, key, fetch: Callable[[], List]) -> None:
+        try:
+            self._store(key, fetch())
+            with self._lock:
+                self.stats.refreshes += 1
+        except Exception:
+            # Keep serving the stale entry; the next stale hit retries
+            with self._lock:
+                self.stats.refresh_errors += 1
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _schedule_refresh(self, key, fetch: Callable[[], List]) -> None:
+        # Called with the lock held
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.refresh_workers, thread_name_prefix='route-refresh')
+        self._executor.submit(self._refresh, key, fetch)
+
+    def get(self, key, fetch: Optional[Callable[[], List]] = None, as_batch: bool = False) -> Optional[List]:
+        """
+        Return copies of the cached routes for a key, or None on a miss.
+
+        Args:
+            key: Key from key()
+            fetch: Called in the background to replace a stale entry
+            as_batch: Return a RouteBatch instead of TransportRoute objects
+        """
+        with self._lock:
+            routes = self._get_locked(key, fetch)
+            if routes is None:
+                self.stats.misses += 1
+        return self._copy(routes, as_batch) if routes is not None else None
+
+    def get_last_known(self, key, as_batch: bool = False) -> Optional[List]:
+        """
+        Copies of the routes last stored for a key's trip, however old, or None.
+
+        The departure bucket is ignored, so a "leave now" request that has
+        crossed into a new bucket still finds the routes fetched minutes ago.
+        """
+        with self._lock:
+            routes = self._last_known.get(key[:3])
+        return self._copy(routes, as_batch) if routes is not None else None
+
+    def put(self, key, routes: List) -> None:
+        """Store routes fetched by the caller, e.g. by the async API after a get() miss."""
+        self._store(key, routes)
+
+    def _get_locked(self, key, fetch: Optional[Callable[[], List]]) -> Optional[List]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        routes, stored_at = entry
+        age = self._clock() - stored_at
+        if age > self.ttl_seconds + self.stale_seconds:
+            return None  # get_last_known() still serves it
+
+        self._entries.move_to_end(key)
+        self.stats.memory_hits += 1
+        if age > self.ttl_seconds:
+            self.stats.stale_hits += 1
+            if fetch is not None:
+                self._schedule_refresh(key, fetch)
+        return routes
+
+    def get_or_fetch(self, key, fetch: Callable[[], List], as_batch: bool = False) -> List:
+        """
+        Return cached routes, fetching and caching them on a miss.
+
+        fetch() should raise on failure; failures are not cached. as_batch
+        returns a RouteBatch instead of TransportRoute objects.
+        """
+        with self._lock:
+            routes = self._get_locked(key, fetch)
+            if routes is not None:
+                return self._copy(routes, as_batch)
+            self.stats.misses += 1
+            future = self._pending.get(key)
+            owner = future is None
+            if owner:
+                future = self._pending[key] = Future()
+
+        if not owner:
+            return self._copy(future.result(), as_batch)
+
+        try:
+            routes = fetch()
+            self._store(key, routes)
+            future.set_result(routes)
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+        return self._copy(routes, as_batch)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._last_known.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
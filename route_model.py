@@ -0,0 +1,445 @@
+# route_model.py
+# Compact typed route representations: slotted CompactRoute and columnar RouteBatch
+
+import re
+import sys
+from array import array
+from datetime import datetime, timedelta
+from enum import IntEnum
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from numpy_support import optional_numpy
+from transport_api import TransportRoute
+
+# Stored in numeric fields when the source text could not be parsed
+UNKNOWN = -1
+
+class TransportType(IntEnum):
+    """Transport type codes; `label` is the string TransportRoute uses"""
+    UNKNOWN = 0
+    BUS = 1
+    TRAIN = 2
+    SUBWAY = 3
+    TRAM = 4
+    WALKING = 5
+    BICYCLING = 6
+    DRIVING = 7
+    FERRY = 8
+
+    @property
+    def label(self) -> str:
+        return self.name.lower()
+
+    @classmethod
+    def from_label(cls, label: Optional[str]) -> 'TransportType':
+        """TransportRoute.transport_type string to code."""
+        return _TYPES_BY_LABEL.get((label or '').lower(), cls.UNKNOWN)
+
+    @classmethod
+    def from_vehicle(cls, vehicle_type: str) -> 'TransportType':
+        """Directions API vehicle type (e.g. HEAVY_RAIL) to code."""
+        vehicle_type = vehicle_type.lower()
+        if 'bus' in vehicle_type:
+            return cls.BUS
+        if 'train' in vehicle_type or 'rail' in vehicle_type:
+            return cls.TRAIN
+        if 'subway' in vehicle_type or 'metro' in vehicle_type:
+            return cls.SUBWAY
+        if 'tram' in vehicle_type or 'streetcar' in vehicle_type:
+            return cls.TRAM
+        return cls.UNKNOWN
+
+_TYPES_BY_LABEL = {transport_type.label: transport_type for transport_type in TransportType}
+
+_DURATION_PART = re.compile(r'(\d+(?:\.\d+)?)\s*(d|h|m|s)[a-z]*', re.I)
+_DURATION_UNITS = {'d': 86400, 'h': 3600, 'm': 60, 's': 1}
+_AMOUNT = re.compile(r'\d[\d,]*(?:\.\d+)?')
+
+@lru_cache(maxsize=4096)
+def parse_duration_seconds(text: Optional[str]) -> int:
+    """
+    Parse a duration such as "20 minutes", "1 hour 5 mins" or "2 hrs" into seconds.
+
+    Every number/unit pair counts, so multi-unit Directions API texts are
+    read in full. Returns UNKNOWN when there is no number/unit pair.
+    """
+    if not text:
+        return UNKNOWN
+    parts = _DURATION_PART.findall(text)
+    if not parts:
+        return UNKNOWN
+    return round(sum(float(amount) * _DURATION_UNITS[unit.lower()] for amount, unit in parts))
+
+@lru_cache(maxsize=4096)
+def parse_cost_cents(text: Optional[str]) -> int:
+    """Parse a fare such as "$2.50" or "$1,204.00" into cents; UNKNOWN when there is no amount."""
+    if not text:
+        return UNKNOWN
+    match = _AMOUNT.search(text)
+    if not match:
+        return UNKNOWN
+    return round(float(match.group().replace(',', '')) * 100)
+
+def parse_clock_epoch(text: Optional[str], reference: Optional[datetime] = None) -> int:
+    """
+    Parse a clock time ("08:05", "8:05 AM") into epoch seconds on the reference day.
+
+    Times more than 12 hours before the reference are taken to be on the
+    next day, so "00:10" read at 23:50 is 20 minutes away, not 23 hours ago.
+    Returns UNKNOWN for text that is not a clock time.
+    """
+    if not text:
+        return UNKNOWN
+    reference = reference or datetime.now()
+    for time_format in ('%H:%M', '%I:%M %p', '%I:%M%p'):
+        try:
+            clock = datetime.strptime(text.strip().upper(), time_format).time()
+            break
+        except ValueError:
+            continue
+    else:
+        return UNKNOWN
+    moment = datetime.combine(reference.date(), clock)
+    if moment < reference - timedelta(hours=12):
+        moment += timedelta(days=1)
+    return int(moment.timestamp())
+
+CROWDING_LEVELS = {'low': 0, 'medium': 1, 'high': 2}
+# Largest delay the 'h' (signed 16-bit) delay_minutes column holds
+MAX_DELAY_MINUTES = 32767
+# Real-time feeds send 'Low'/'Medium'/'High'; look those up without lowercasing
+_CROWDING_BY_TEXT = {**CROWDING_LEVELS, **{level.capitalize(): value for level, value in CROWDING_LEVELS.items()}}
+
+def real_time_measures(real_time_info: Optional[Dict]) -> tuple:
+    """Crowding level (Low 0, Medium 1, High 2) and delay minutes (early counts as 0) of real-time info."""
+    if not real_time_info:
+        return 0, 0
+    level = real_time_info.get('crowding_level')
+    crowding = _CROWDING_BY_TEXT.get(level)
+    if crowding is None:
+        crowding = CROWDING_LEVELS.get(str(level or '').lower(), 0)
+    delay = real_time_info.get('delay_minutes') or 0
+    if type(delay) is not int:
+        # Feeds may send fractional minutes or numeric strings; the column holds whole minutes
+        try:
+            delay = int(round(float(delay)))
+        except (TypeError, ValueError, OverflowError):
+            delay = 0
+    return crowding, min(delay, MAX_DELAY_MINUTES) if delay > 0 else 0
+
+def _text(value) -> Optional[str]:
+    # Route texts repeat a lot ("Unknown", stop names, "On Time"); share one copy of each
+    return sys.intern(value) if isinstance(value, str) else value
+
+class CompactRoute:
+    """
+    Slotted route with numeric fields parsed once at ingestion.
+
+    The display texts keep TransportRoute's field names (interned, so
+    repeated values cost one pointer), and the numeric fields use UNKNOWN
+    for values that could not be parsed. to_route() gives the
+    TransportRoute view the rest of TravelBuddy works with.
+    """
+
+    __slots__ = ('route_id', 'route_name', 'transport_type', 'destination', 'departure_time', 'arrival_time',
+                 'duration', 'cost', 'platform', 'status', 'duration_seconds', 'cost_cents',
+                 'departure_epoch', 'arrival_epoch', 'transfers', 'real_time_info')
+
+    def __init__(self, route_id: str, route_name: str, transport_type: TransportType, destination: str,
+                 departure_time: str, arrival_time: str, duration: str, cost: Optional[str] = None,
+                 platform: Optional[str] = None, status: str = "On Time", duration_seconds: int = UNKNOWN,
+                 cost_cents: int = UNKNOWN, departure_epoch: int = UNKNOWN, arrival_epoch: int = UNKNOWN,
+                 transfers: int = 0, real_time_info: Optional[Dict] = None):
+        self.route_id = _text(route_id)
+        self.route_name = _text(route_name)
+        self.transport_type = TransportType(transport_type)
+        self.destination = _text(destination)
+        self.departure_time = _text(departure_time)
+        self.arrival_time = _text(arrival_time)
+        self.duration = _text(duration)
+        self.cost = _text(cost)
+        self.platform = _text(platform)
+        self.status = _text(status)
+        self.duration_seconds = duration_seconds
+        self.cost_cents = cost_cents
+        self.departure_epoch = departure_epoch
+        self.arrival_epoch = arrival_epoch
+        self.transfers = transfers
+        self.real_time_info = real_time_info
+
+    @classmethod
+    def from_route(cls, route: TransportRoute, reference: Optional[datetime] = None) -> 'CompactRoute':
+        """Parse a TransportRoute's texts once into a CompactRoute."""
+        reference = reference or datetime.now()
+        return cls(
+            route.route_id, route.route_name, TransportType.from_label(route.transport_type), route.destination,
+            route.departure_time, route.arrival_time, route.duration, route.cost, route.platform, route.status,
+            duration_seconds=parse_duration_seconds(route.duration),
+            cost_cents=parse_cost_cents(route.cost),
+            departure_epoch=parse_clock_epoch(route.departure_time, reference),
+            arrival_epoch=parse_clock_epoch(route.arrival_time, reference),
+            real_time_info=route.real_time_info
+        )
+
+    @property
+    def crowding(self) -> int:
+        return real_time_measures(self.real_time_info)[0]
+
+    @property
+    def delay_minutes(self) -> int:
+        return real_time_measures(self.real_time_info)[1]
+
+    def to_route(self) -> TransportRoute:
+        """TransportRoute view with the original texts."""
+        return TransportRoute(
+            route_id=self.route_id,
+            route_name=self.route_name,
+            transport_type=self.transport_type.label,
+            destination=self.destination,
+            departure_time=self.departure_time,
+            arrival_time=self.arrival_time,
+            duration=self.duration,
+            cost=self.cost,
+            platform=self.platform,
+            status=self.status,
+            real_time_info=self.real_time_info
+        )
+
+    def __repr__(self) -> str:
+        return (f"CompactRoute({self.route_id!r}, {self.transport_type.label}, {self.duration_seconds}s, "
+                f"{self.cost_cents}c, transfers={self.transfers})")
+
+class RouteBatch:
+    """
+    Columnar, array-backed set of routes for bulk work (ranking, caching).
+
+    Numeric columns are array.array buffers (numeric_columns() exposes
+    them to NumPy without copying); text columns are lists of interned
+    strings. Rows are read as CompactRoute objects or TransportRoute views.
+    """
+
+    TEXT_COLUMNS = ('route_id', 'route_name', 'destination', 'departure_time', 'arrival_time',
+                    'duration', 'cost', 'platform', 'status')
+    NUMERIC_COLUMNS = {
+        'transport_type': 'b',
+        'duration_seconds': 'l',
+        'cost_cents': 'l',
+        'departure_epoch': 'q',
+        'arrival_epoch': 'q',
+        'transfers': 'h',
+        # From real_time_info, so ranking never has to look inside the dicts
+        'crowding': 'b',
+        'delay_minutes': 'h'
+    }
+
+    __slots__ = TEXT_COLUMNS + tuple(NUMERIC_COLUMNS) + ('real_time_info',)
+
+    def __init__(self, routes: Iterable[CompactRoute] = ()):
+        for column in self.TEXT_COLUMNS:
+            setattr(self, column, [])
+        for column, typecode in self.NUMERIC_COLUMNS.items():
+            setattr(self, column, array(typecode))
+        self.real_time_info: List[Optional[Dict]] = []
+        for route in routes:
+            self.append(route)
+
+    @classmethod
+    def from_routes(cls, routes: Iterable[TransportRoute], reference: Optional[datetime] = None,
+                    transfers: Optional[Sequence[int]] = None) -> 'RouteBatch':
+        """Parse TransportRoute objects (e.g. mock or timetable routes) into a batch, with their transfers if known."""
+        reference = reference or datetime.now()
+        batch = cls(CompactRoute.from_route(route, reference) for route in routes)
+        if transfers is not None:
+            batch.transfers = array('h', transfers)
+        return batch
+
+    @classmethod
+    def from_directions(cls, data: Dict, transport_mode: str = "transit") -> 'RouteBatch':
+        """
+        Parse a decoded Directions API response straight into a batch.
+
+        Transit responses give one row per transit step, with the epoch
+        times and durations the API reports numerically and the transfers
+        of the alternative it belongs to. Other modes give one row per
+        alternative.
+        """
+        batch = cls()
+        for index, route in enumerate(data.get('routes', [])):
+            if transport_mode != 'transit':
+                legs = route.get('legs')
+                if not legs:
+                    continue
+                leg = legs[0]
+                batch.append_row(
+                    f"{transport_mode}-{index + 1}",
+                    route.get('summary') or f"{transport_mode.capitalize()} route {index + 1}",
+                    TransportType.from_label(transport_mode),
+                    leg.get('end_address', 'Unknown'),
+                    leg.get('departure_time', {}).get('text', 'Unknown'),
+                    leg.get('arrival_time', {}).get('text', 'Unknown'),
+                    leg.get('duration', {}).get('text', 'Unknown'),
+                    duration_seconds=leg.get('duration', {}).get('value', UNKNOWN),
+                    departure_epoch=leg.get('departure_time', {}).get('value', UNKNOWN),
+                    arrival_epoch=leg.get('arrival_time', {}).get('value', UNKNOWN)
+                )
+                continue
+
+            for leg in route.get('legs', []):
+                steps = [step for step in leg.get('steps', []) if step.get('travel_mode') == 'TRANSIT']
+                for step in steps:
+                    transit_details = step.get('transit_details', {})
+                    line = transit_details.get('line', {})
+                    departure = transit_details.get('departure_time', {})
+                    arrival = transit_details.get('arrival_time', {})
+                    duration = step.get('duration', {})
+                    batch.append_row(
+                        line.get('short_name', 'Unknown'),
+                        line.get('name', 'Unknown Route'),
+                        TransportType.from_vehicle(line.get('vehicle', {}).get('type', '')),
+                        transit_details.get('headsign', 'Unknown'),
+                        departure.get('text', 'Unknown'),
+                        arrival.get('text', 'Unknown'),
+                        duration.get('text', 'Unknown'),
+                        platform=transit_details.get('departure_stop', {}).get('name', 'Unknown'),
+                        duration_seconds=duration.get('value', UNKNOWN),
+                        departure_epoch=departure.get('value', UNKNOWN),
+                        arrival_epoch=arrival.get('value', UNKNOWN),
+                        transfers=len(steps) - 1
+                    )
+        return batch
+
+    def append_row(self, route_id: str, route_name: str, transport_type: int, destination: str,
+                   departure_time: str, arrival_time: str, duration: str, cost: Optional[str] = None,
+                   platform: Optional[str] = None, status: str = "On Time", duration_seconds: int = UNKNOWN,
+                   cost_cents: int = UNKNOWN, departure_epoch: int = UNKNOWN, arrival_epoch: int = UNKNOWN,
+                   transfers: int = 0, real_time_info: Optional[Dict] = None) -> None:
+        """Append one route from field values, without building a CompactRoute first."""
+        self.route_id.append(_text(route_id))
+        self.route_name.append(_text(route_name))
+        self.destination.append(_text(destination))
+        self.departure_time.append(_text(departure_time))
+        self.arrival_time.append(_text(arrival_time))
+        self.duration.append(_text(duration))
+        self.cost.append(_text(cost))
+        self.platform.append(_text(platform))
+        self.status.append(_text(status))
+        self.transport_type.append(transport_type)
+        self.duration_seconds.append(duration_seconds)
+        self.cost_cents.append(cost_cents)
+        self.departure_epoch.append(departure_epoch)
+        self.arrival_epoch.append(arrival_epoch)
+        self.transfers.append(transfers)
+        crowding, delay_minutes = real_time_measures(real_time_info)
+        self.crowding.append(crowding)
+        self.delay_minutes.append(delay_minutes)
+        self.real_time_info.append(real_time_info)
+
+    def append(self, route: CompactRoute) -> None:
+        # CompactRoute texts are already interned
+        for column in self.TEXT_COLUMNS:
+            getattr(self, column).append(getattr(route, column))
+        for column in self.NUMERIC_COLUMNS:
+            getattr(self, column).append(getattr(route, column))
+        self.real_time_info.append(route.real_time_info)
+
+    def attach_real_time_info(self, real_time_info: Sequence[Optional[Dict]]) -> None:
+        """Replace the real-time info of every row, updating the crowding and delay columns."""
+        if len(real_time_info) != len(self):
+            raise ValueError(f"Expected {len(self)} real-time entries, got {len(real_time_info)}")
+        self.real_time_info = list(real_time_info)
+        measures = [real_time_measures(info) for info in self.real_time_info]
+        self.crowding = array('b', (crowding for crowding, _ in measures))
+        self.delay_minutes = array('h', (delay for _, delay in measures))
+
+    def __len__(self) -> int:
+        return len(self.route_id)
+
+    def __getitem__(self, index: int) -> CompactRoute:
+        return CompactRoute(
+            self.route_id[index],
+            self.route_name[index],
+            TransportType(self.transport_type[index]),
+            self.destination[index],
+            self.departure_time[index],
+            self.arrival_time[index],
+            self.duration[index],
+            self.cost[index],
+            self.platform[index],
+            self.status[index],
+            duration_seconds=self.duration_seconds[index],
+            cost_cents=self.cost_cents[index],
+            departure_epoch=self.departure_epoch[index],
+            arrival_epoch=self.arrival_epoch[index],
+            transfers=self.transfers[index],
+            real_time_info=self.real_time_info[index]
+        )
+
+    def __iter__(self) -> Iterator[CompactRoute]:
+        return (self[index] for index in range(len(self)))
+
+    def route(self, index: int) -> TransportRoute:
+        """TransportRoute view of one row."""
+        return TransportRoute(
+            route_id=self.route_id[index],
+            route_name=self.route_name[index],
+            transport_type=_LABELS[self.transport_type[index]],
+            destination=self.destination[index],
+            departure_time=self.departure_time[index],
+            arrival_time=self.arrival_time[index],
+            duration=self.duration[index],
+            cost=self.cost[index],
+            platform=self.platform[index],
+            status=self.status[index],
+            real_time_info=self.real_time_info[index]
+        )
+
+    def to_routes(self, indices: Optional[Sequence[int]] = None) -> List[TransportRoute]:
+        """TransportRoute views of all rows, or of the given rows in that order."""
+        if indices is not None:
+            return [self.route(index) for index in indices]
+        # Column-wise and positional: about twice as fast as route() per row
+        return list(map(
+            TransportRoute, self.route_id, self.route_name, map(_LABELS.__getitem__, self.transport_type),
+            self.destination, self.departure_time, self.arrival_time, self.duration, self.cost,
+            self.platform, self.status, self.real_time_info
+        ))
+
+    def take(self, indices: Sequence[int]) -> 'RouteBatch':
+        """New batch with the given rows in that order."""
+        batch = RouteBatch()
+        for column in self.TEXT_COLUMNS + ('real_time_info',):
+            values = getattr(self, column)
+            setattr(batch, column, [values[index] for index in indices])
+        for column, typecode in self.NUMERIC_COLUMNS.items():
+            values = getattr(self, column)
+            setattr(batch, column, array(typecode, (values[index] for index in indices)))
+        return batch
+
+    def copy(self) -> 'RouteBatch':
+        """Independent copy, made column by column rather than row by row."""
+        batch = RouteBatch()
+        for column in self.TEXT_COLUMNS + ('real_time_info',):
+            setattr(batch, column, list(getattr(self, column)))
+        for column in self.NUMERIC_COLUMNS:
+            setattr(batch, column, getattr(self, column)[:])
+        return batch
+
+    def numeric_columns(self) -> Dict[str, object]:
+        """
+        Numeric columns as NumPy arrays sharing the batch's buffers.
+
+        Falls back to the array.array columns when NumPy is not installed.
+        """
+        np = optional_numpy()
+        if np is None:
+            return {column: getattr(self, column) for column in self.NUMERIC_COLUMNS}
+        return {
+            column: np.frombuffer(getattr(self, column), dtype=np.dtype(typecode))
+            for column, typecode in self.NUMERIC_COLUMNS.items()
+        }
+
+    def __repr__(self) -> str:
+        return f"RouteBatch({len(self)} routes)"
+
+_LABELS = {transport_type.value: transport_type.label for transport_type in TransportType}
@@ -0,0 +1,173 @@
+# route_ranking.py
+# Route scoring over parsed numeric columns, NumPy-vectorized for large candidate sets
+
+import heapq
+from dataclasses import dataclass, fields
+from typing import Dict, List, Optional, Sequence
+
+from numpy_support import numpy_for, optional_numpy
+from route_model import (UNKNOWN, RouteBatch, TransportType, parse_cost_cents, parse_duration_seconds,
+                         real_time_measures)
+from transport_api import TransportRoute
+
+# Candidates from which the NumPy scoring path is used (see numpy_support.numpy_for)
+NUMPY_MIN_ROUTES = 512
+
+@dataclass
+class RankingWeights:
+    """
+    Score weights. A route scores preferred_type if its transport type is
+    preferred, minus each weight times its measure:
+    time per minute, cost per dollar, transfers per transfer, crowding per
+    level (Low 0, Medium 1, High 2) and delay per minute.
+    """
+    time: float = 1.0
+    cost: float = 0.1
+    transfers: float = 5.0
+    crowding: float = 2.0
+    delay: float = 1.0
+    preferred_type: float = 10.0
+
+    @classmethod
+    def from_preferences(cls, preferences: Optional[Dict] = None) -> 'RankingWeights':
+        """
+        Weights for a find_best_routes preferences dict.
+
+        Cost only counts when preferences has a 'cost' entry, as it always
+        has; preferences['weights'] overrides any weight by name.
+        """
+        preferences = preferences or {}
+        overrides = preferences.get('weights') or {}
+        names = {field.name for field in fields(cls)}
+        weights = cls(**{name: value for name, value in overrides.items() if name in names})
+        if 'cost' not in preferences and 'cost' not in overrides:
+            weights.cost = 0.0
+        return weights
+
+def _python_scores(duration_seconds, cost_cents, transfers, type_codes, crowding, delay,
+                   weights: RankingWeights, preferred: frozenset) -> List[float]:
+    known = [seconds for seconds in duration_seconds if seconds != UNKNOWN]
+    # An unknown duration ranks like the slowest known one rather than like 0 minutes
+    fallback = max(known) if known else 0
+    preferred_bonus, time_weight, cost_weight = weights.preferred_type, weights.time, weights.cost
+    transfer_weight, crowding_weight, delay_weight = weights.transfers, weights.crowding, weights.delay
+    return [
+        (preferred_bonus if type_code in preferred else 0.0)
+        - time_weight * (seconds if seconds != UNKNOWN else fallback) / 60
+        - cost_weight * (cents if cents != UNKNOWN else 0) / 100
+        - transfer_weight * route_transfers
+        - crowding_weight * level
+        - delay_weight * minutes
+        for seconds, cents, route_transfers, type_code, level, minutes
+        in zip(duration_seconds, cost_cents, transfers, type_codes, crowding, delay)
+    ]
+
+def _numpy_scores(np, duration_seconds, cost_cents, transfers, type_codes, crowding, delay,
+                  weights: RankingWeights, preferred: frozenset):
+    duration = np.asarray(duration_seconds, dtype=np.float64)
+    unknown = duration == UNKNOWN
+    if unknown.any():
+        duration[unknown] = duration[~unknown].max() if not unknown.all() else 0.0
+    cost = np.asarray(cost_cents, dtype=np.float64)
+    cost[cost == UNKNOWN] = 0.0
+
+    bonus = np.zeros(len(duration))
+    if preferred:
+        bonus[np.isin(np.asarray(type_codes), list(preferred))] = weights.preferred_type
+    # Same operation order as _python_scores, so both paths give identical floats and rankings
+    return (
+        bonus
+        - weights.time * duration / 60
+        - weights.cost * cost / 100
+        - weights.transfers * np.asarray(transfers, dtype=np.float64)
+        - weights.crowding * np.asarray(crowding, dtype=np.float64)
+        - weights.delay * np.asarray(delay, dtype=np.float64)
+    )
+
+def top_k_indices(scores, k: Optional[int] = None) -> List[int]:
+    """
+    Indices of the k best scores, best first; ties keep their original order.
+
+    Python lists use heapq.nlargest (O(n log k)); NumPy arrays use
+    argpartition, so only the k winners are sorted.
+    """
+    count = len(scores)
+    if k is None or k >= count:
+        if isinstance(scores, list):
+            return sorted(range(count), key=scores.__getitem__, reverse=True)
+        np = optional_numpy()
+        return np.argsort(-scores, kind='stable').tolist()
+    if k <= 0:
+        return []
+    if isinstance(scores, list):
+        return heapq.nlargest(k, range(count), key=scores.__getitem__)
+
+    np = optional_numpy()
+    negated = -scores
+    kth = np.partition(negated, k - 1)[k - 1]
+    better = np.flatnonzero(negated < kth)
+    ties = np.flatnonzero(negated == kth)[:k - len(better)]
+    chosen = np.concatenate((better, ties))
+    return chosen[np.lexsort((chosen, negated[chosen]))].tolist()
+
+def _rank(duration_seconds, cost_cents, transfers, type_codes, crowding, delay,
+          preferences: Optional[Dict], limit: Optional[int], weights: Optional[RankingWeights],
+          numpy_min_routes: int) -> List[int]:
+    preferences = preferences or {}
+    weights = weights or RankingWeights.from_preferences(preferences)
+    preferred = frozenset(TransportType.from_label(label) for label in preferences.get('transport_types', []))
+
+    np = numpy_for(len(duration_seconds), numpy_min_routes)
+    if np is not None:
+        scores = _numpy_scores(np, duration_seconds, cost_cents, transfers, type_codes, crowding, delay,
+                               weights, preferred)
+    else:
+        scores = _python_scores(duration_seconds, cost_cents, transfers, type_codes, crowding, delay,
+                                weights, preferred)
+    return top_k_indices(scores, limit)
+
+def rank_batch(batch: RouteBatch, preferences: Optional[Dict] = None, limit: Optional[int] = None,
+               weights: Optional[RankingWeights] = None, numpy_min_routes: int = NUMPY_MIN_ROUTES) -> List[int]:
+    """
+    Rank the rows of a RouteBatch.
+
+    Args:
+        batch: Candidate routes
+        preferences: find_best_routes preferences ('transport_types', 'cost', 'weights')
+        limit: Keep only the best `limit` rows (heap/partition selection)
+        weights: Explicit weights instead of ones derived from preferences
+        numpy_min_routes: Use NumPy from this many candidates on
+
+    Returns:
+        Row indices, best first
+    """
+    if len(batch) >= numpy_min_routes:
+        columns = batch.numeric_columns()
+    else:
+        columns = {column: getattr(batch, column) for column in RouteBatch.NUMERIC_COLUMNS}
+    return _rank(columns['duration_seconds'], columns['cost_cents'], columns['transfers'],
+                 columns['transport_type'], columns['crowding'], columns['delay_minutes'],
+                 preferences, limit, weights, numpy_min_routes)
+
+def rank_routes(routes: Sequence[TransportRoute], preferences: Optional[Dict] = None, limit: Optional[int] = None,
+                weights: Optional[RankingWeights] = None,
+                numpy_min_routes: int = NUMPY_MIN_ROUTES) -> List[TransportRoute]:
+    """
+    Rank TransportRoute objects, parsing each duration and cost once.
+
+    Returns:
+        The best `limit` routes (all when None), best first
+    """
+    measures = [real_time_measures(route.real_time_info) for route in routes]
+    # A handful of distinct transport type labels, so look each one up once
+    codes = {label: TransportType.from_label(label) for label in {route.transport_type for route in routes}}
+    indices = _rank(
+        [parse_duration_seconds(route.duration) for route in routes],
+        [parse_cost_cents(route.cost) for route in routes],
+        [0] * len(routes),
+        [codes[route.transport_type] for route in routes],
+        [crowding for crowding, _ in measures],
+        [delay for _, delay in measures],
+        preferences, limit, weights, numpy_min_routes
+    )
+    return [routes[index] for index in indices]
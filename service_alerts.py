@@ -0,0 +1,293 @@
+# service_alerts.py
+# Service alerts indexed by city, route and stop, with active windows and expiry
+
+import heapq
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import chain
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from gtfs_realtime import ApplyStats, _field
+
+# Alert.Effect to the alert types get_service_alerts has always reported
+EFFECT_TYPES = {
+    'NO_SERVICE': 'Suspension', 'REDUCED_SERVICE': 'Service Change', 'SIGNIFICANT_DELAYS': 'Delay',
+    'DETOUR': 'Detour', 'ADDITIONAL_SERVICE': 'Service Change', 'MODIFIED_SERVICE': 'Service Change',
+    'STOP_MOVED': 'Stop Moved', 'NO_EFFECT': 'Notice', 'ACCESSIBILITY_ISSUE': 'Accessibility',
+    1: 'Suspension', 2: 'Service Change', 3: 'Delay', 4: 'Detour', 5: 'Service Change', 6: 'Service Change',
+    9: 'Stop Moved', 10: 'Notice', 11: 'Accessibility'
+}
+# Alert.SeverityLevel to Low/Medium/High
+SEVERITY_NAMES = {
+    'UNKNOWN_SEVERITY': 'Medium', 'INFO': 'Low', 'WARNING': 'Medium', 'SEVERE': 'High',
+    1: 'Medium', 2: 'Low', 3: 'Medium', 4: 'High'
+}
+
+def _key(name: str) -> str:
+    return ' '.join(name.casefold().split())
+
+def _text(translated: Optional[Dict], language: str = 'en') -> str:
+    # TranslatedString: the requested language, else the untagged or first translation
+    translations = (translated or {}).get('translation') or []
+    for translation in translations:
+        if translation.get('language') == language:
+            return translation.get('text', '')
+    for translation in translations:
+        if not translation.get('language'):
+            return translation.get('text', '')
+    return translations[0].get('text', '') if translations else ''
+
+@dataclass
+class ServiceAlert:
+    """A service alert; start/end are epoch seconds, None for an open-ended window"""
+    alert_id: str
+    type: str
+    message: str
+    severity: str = 'Medium'
+    city: Optional[str] = None  # None applies to every city
+    routes: Tuple[str, ...] = ()
+    stops: Tuple[str, ...] = ()
+    start: Optional[float] = None
+    end: Optional[float] = None
+
+    def is_active(self, now: float) -> bool:
+        return (self.start is None or self.start <= now) and (self.end is None or now < self.end)
+
+    def to_dict(self) -> Dict:
+        """The dict get_service_alerts returns"""
+        return {
+            'alert_id': self.alert_id,
+            'type': self.type,
+            'route': ', '.join(self.routes) or None,
+            'message': self.message,
+            'severity': self.severity,
+            'affected_stops': list(self.stops),
+            'city': self.city,
+            'active_until': datetime.fromtimestamp(self.end).strftime('%Y-%m-%d %H:%M') if self.end else None
+        }
+
+class AlertStore:
+    """
+    Service alerts indexed by city, route and stop.
+
+    Each index maps a normalized name to the ids of the alerts naming it,
+    so a lookup reads only the alerts it returns, however many others the
+    store holds. Alerts past their end time are evicted from a min-heap of
+    end times, which costs nothing while the earliest end is still ahead.
+    Alerts not yet started are kept but not returned.
+    """
+
+    def __init__(self, route_aliases: Optional[Dict[str, str]] = None,
+                 stop_names: Optional[Callable[[str], Optional[str]]] = None):
+        """
+        Args:
+            route_aliases: Other names of routes (e.g. GTFS short names) to route ids, for lookups
+            stop_names: Stop name of a GTFS stop id, so feed alerts index stops by name
+        """
+        self.route_aliases = route_aliases or {}
+        self.stop_names = stop_names
+        self.alerts: Dict[str, ServiceAlert] = {}
+        self._by_city: Dict[Optional[str], Set[str]] = {}
+        self._by_route: Dict[str, Set[str]] = {}
+        self._by_stop: Dict[str, Set[str]] = {}
+        # Feed source to entity id to (entity as last applied, ids of the alerts made from it)
+        self._feed_entities: Dict[str, Dict[str, Tuple[Dict, List[str]]]] = {}
+        self._expiry: List[Tuple[float, str]] = []  # (end, alert id); stale entries are skipped
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.alerts)
+
+    def upsert(self, alert: ServiceAlert) -> None:
+        """Add an alert, replacing any alert with the same id."""
+        with self._lock:
+            self._remove(alert.alert_id)
+            self.alerts[alert.alert_id] = alert
+            self._by_city.setdefault(_key(alert.city) if alert.city else None, set()).add(alert.alert_id)
+            for route in alert.routes:
+                self._by_route.setdefault(_key(route), set()).add(alert.alert_id)
+            for stop in alert.stops:
+                self._by_stop.setdefault(_key(stop), set()).add(alert.alert_id)
+            if alert.end is not None:
+                heapq.heappush(self._expiry, (alert.end, alert.alert_id))
+
+    def remove(self, alert_id: str) -> bool:
+        with self._lock:
+            return self._remove(alert_id)
+
+    def _remove(self, alert_id: str) -> bool:
+        alert = self.alerts.pop(alert_id, None)
+        if alert is None:
+            return False
+        for index, names in ((self._by_city, [_key(alert.city) if alert.city else None]),
+                             (self._by_route, [_key(route) for route in alert.routes]),
+                             (self._by_stop, [_key(stop) for stop in alert.stops])):
+            for name in names:
+                ids = index.get(name)
+                if ids is not None:
+                    ids.discard(alert_id)
+                    if not ids:
+                        del index[name]
+        return True
+
+    def evict_expired(self, now: Optional[float] = None) -> int:
+        """Drop the alerts whose window has ended; returns how many."""
+        now = time.time() if now is None else now
+        expiry = self._expiry
+        if not expiry or expiry[0][0] > now:
+            return 0
+        evicted = 0
+        with self._lock:
+            while expiry and expiry[0][0] <= now:
+                end, alert_id = heapq.heappop(expiry)
+                alert = self.alerts.get(alert_id)
+                # The alert may have been replaced by one with another end since this entry was pushed
+                if alert is not None and alert.end == end:
+                    self._remove(alert_id)
+                    evicted += 1
+        return evicted
+
+    def apply_feed(self, feed: Dict, source: str = 'default', city: Optional[str] = None) -> ApplyStats:
+        """
+        Upsert the Alert entities of a decoded GTFS-Realtime FeedMessage.
+
+        Args:
+            feed: FeedMessage as a dict (see gtfs_realtime.load_feed)
+            source: Name of the feed; a FULL_DATASET feed removes only its own source's alerts
+            city: City the feed's alerts apply to (None: every city)
+        """
+        start = time.perf_counter()
+        header = feed.get('header', {})
+        full_dataset = header.get('incrementality', 'FULL_DATASET') in ('FULL_DATASET', 0)
+        stats = ApplyStats()
+        with self._lock:
+            entities = self._feed_entities.setdefault(source, {})
+            seen = set()
+            for entity in feed.get('entity', []):
+                entity_id = entity.get('id')
+                if entity_id is None:
+                    continue
+                if _field(entity, 'isDeleted', 'is_deleted', False):
+                    # A deletion need not repeat the alert it deletes
+                    stats.removed += self._remove_entity(source, entity_id)
+                    continue
+                message = entity.get('alert')
+                if not message:
+                    continue
+                stats.entities += 1
+                seen.add(entity_id)
+                previous = entities.get(entity_id)
+                if previous is not None and previous[0] == entity:
+                    stats.unchanged += 1
+                    continue
+                self._remove_entity(source, entity_id)
+                alerts = self._alerts_from_feed(f"{source}:{entity_id}", message, city)
+                for alert in alerts:
+                    self.upsert(alert)
+                entities[entity_id] = (entity, [alert.alert_id for alert in alerts])
+                stats.changed += 1
+            if full_dataset:
+                for entity_id in [entity_id for entity_id in entities if entity_id not in seen]:
+                    self._remove_entity(source, entity_id)
+                    stats.removed += 1
+        self.evict_expired()
+        stats.seconds = time.perf_counter() - start
+        return stats
+
+    def _remove_entity(self, source: str, entity_id: str) -> bool:
+        entry = self._feed_entities.get(source, {}).pop(entity_id, None)
+        if entry is None:
+            return False
+        for alert_id in entry[1]:
+            self._remove(alert_id)
+        return True
+
+    def _alerts_from_feed(self, alert_id: str, message: Dict, city: Optional[str]) -> List[ServiceAlert]:
+        routes, stops = [], []
+        for informed in _field(message, 'informedEntity', 'informed_entity', []):
+            route_id = _field(informed, 'routeId', 'route_id')
+            if route_id and route_id not in routes:
+                routes.append(route_id)
+            stop_id = _field(informed, 'stopId', 'stop_id')
+            if stop_id:
+                stop = (self.stop_names(stop_id) if self.stop_names else None) or stop_id
+                if stop not in stops:
+                    stops.append(stop)
+        header = _text(_field(message, 'headerText', 'header_text'))
+        description = _text(_field(message, 'descriptionText', 'description_text'))
+        fields = dict(
+            type=EFFECT_TYPES.get(message.get('effect'), 'Notice'),
+            message=header if not description or description == header else f"{header}: {description}",
+            severity=SEVERITY_NAMES.get(_field(message, 'severityLevel', 'severity_level'), 'Medium'),
+            city=city, routes=tuple(routes), stops=tuple(stops)
+        )
+        periods = _field(message, 'activePeriod', 'active_period', []) or [{}]
+        # Several active periods become one alert each, sharing the entity's id as a prefix
+        return [
+            ServiceAlert(alert_id if len(periods) == 1 else f"{alert_id}#{number}",
+                         start=float(period['start']) if period.get('start') else None,
+                         end=float(period['end']) if period.get('end') else None, **fields)
+            for number, period in enumerate(periods)
+        ]
+
+    def _active(self, alert_ids: Iterable[str], now: float, city: Optional[str] = None) -> List[ServiceAlert]:
+        # city is a normalized name; alerts for every city (city None) always match
+        alerts = self.alerts
+        found = [alerts[alert_id] for alert_id in alert_ids if alert_id in alerts]
+        return [alert for alert in found if alert.is_active(now)
+                and (city is None or alert.city is None or _key(alert.city) == city)]
+
+    def _route_ids(self, route: str) -> Set[str]:
+        ids = self._by_route.get(_key(route), set())
+        alias = self.route_aliases.get(route)
+        if alias is not None:
+            ids = ids | self._by_route.get(_key(alias), set())
+        return ids
+
+    def active(self, city: Optional[str] = None, now: Optional[float] = None) -> List[ServiceAlert]:
+        """Active alerts for a city (every alert when city is None)."""
+        now = time.time() if now is None else now
+        self.evict_expired(now)
+        with self._lock:
+            if city is None:
+                return self._active(self.alerts, now)
+            ids = chain(self._by_city.get(_key(city), ()), self._by_city.get(None, ()))
+            return self._active(ids, now)
+
+    def for_route(self, route: str, city: Optional[str] = None, now: Optional[float] = None) -> List[ServiceAlert]:
+        """Active alerts naming a route by id or alias."""
+        return self.alerts_for_routes([route], city, now)[0]
+
+    def for_stop(self, stop: str, city: Optional[str] = None, now: Optional[float] = None) -> List[ServiceAlert]:
+        """Active alerts naming a stop."""
+        now = time.time() if now is None else now
+        self.evict_expired(now)
+        with self._lock:
+            return self._active(self._by_stop.get(_key(stop), ()), now, _key(city) if city else None)
+
+    def alerts_for_routes(self, routes: Sequence, city: Optional[str] = None,
+                          now: Optional[float] = None) -> List[List[ServiceAlert]]:
+        """
+        Active alerts for each of a list of routes.
+
+        Args:
+            routes: Route ids, or TransportRoute objects (matched by route_id)
+            city: Only alerts for this city and for every city (None: any city)
+            now: Epoch seconds to test active windows against
+
+        Returns:
+            A list of alerts per route, in the order of routes
+        """
+        now = time.time() if now is None else now
+        self.evict_expired(now)
+        city = _key(city) if city else None
+        found: Dict[str, List[ServiceAlert]] = {}
+        with self._lock:
+            for route in routes:
+                route_id = route if isinstance(route, str) else route.route_id
+                if route_id not in found:
+                    ids = self._route_ids(route_id)
+                    found[route_id] = self._active(ids, now, city) if ids else []
+        return [found[route if isinstance(route, str) else route.route_id] for route in routes]
@@ -4,26 +4,10 @@ Simple test script for TravelBuddy simplification feature
 This script demonstrates the basic functionality with a simple example
 """
 
-import os
-import sys
-from dotenv import load_dotenv
-import google.generativeai as genai
+from llm_client import create_client
 from prompts import get_public_transport_simplification_prompt
-
-# Load environment variables
-load_dotenv()
-
-def setup_gemini():
-    """Setup Gemini API with the API key from environment variables"""
-    api_key = os.getenv('GEMINI_API_KEY')
-    if not api_key:
-        print("❌ Error: GEMINI_API_KEY not found in environment variables")
-        print("Please add your Gemini API key to the .env file")
-        print("Example: GEMINI_API_KEY=your_api_key_here")
-        sys.exit(1)
-    
-    genai.configure(api_key=api_key)
-    return genai
+from result_cache import get_simplification_cache
+from simplifier import stream_simplify_sync
 
 def main():
     """Main function - demonstrates simplification with a simple example"""
@@ -32,8 +16,7 @@ def main():
     
     # Setup Gemini
     print("🔧 Setting up Gemini API...")
-    genai_client = setup_gemini()
-    model = genai.GenerativeModel('gemini-2.0-flash-exp')
+    client = create_client()
     print("✅ Gemini API configured successfully!")
     
     # Example complex text (Tokyo Metro instructions)
@@ -54,15 +37,19 @@ def main():
     print(f"📋 Prompt length: {len(prompt)} characters")
     
     try:
-        # Generate simplified version
-        response = model.generate_content(prompt)
-        simplified_text = response.text
-        
+        # Stream the simplified version as it is generated, reusing a cached result for repeated text
         print(f"\n✅ SIMPLIFIED RESULT:")
         print(f"{'-'*40}")
-        print(simplified_text)
-        print(f"📊 Length: {len(simplified_text)} characters")
-        print(f"📈 Reduction: {((len(complex_text) - len(simplified_text)) / len(complex_text) * 100):.1f}%")
+        for event in stream_simplify_sync(client, complex_text, "public_transport", get_simplification_cache()):
+            if event['type'] == 'chunk':
+                print(event['text'], end='', flush=True)
+            else:
+                stats = event
+        print()
+        print(f"📊 Length: {stats['simplifiedLength']} characters")
+        print(f"📈 Reduction: {stats['reduction']}")
+        print(f"🧹 Compacted input: {stats['tokensBefore']} → {stats['tokensAfter']} tokens")
+        print(f"⏱️ First text after {stats['firstChunkSeconds']:.2f}s, done after {stats['totalSeconds']:.2f}s")
         
         print(f"\n🎉 SUCCESS! The complex text has been simplified successfully.")
         print(f"💡 You can now use this feature to simplify any tourist information!")
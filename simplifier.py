@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+# simplifier.py
+# Async simplify → validate → improve pipeline on top of the shared LLM client
+
+import argparse
+import asyncio
+import glob
+import os
+import time
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from chunking import split_document
+from content_classifier import DATA_DIR, DATA_FILE_CONTENT_TYPES
+from llm_client import LLMClient, create_client
+from prompts import (
+    resolve_content_type,
+    get_simplification_prompt_parts,
+    get_section_merge_prompt,
+    get_quality_improvement_prompt,
+    get_validation_prompt
+)
+from result_cache import SimplificationCache
+from text_compaction import compact_text
+from validator import ValidationReport, validate_simplification
+
+async def simplify(client: LLMClient, text: str, content_type: str = "general",
+                   cache: Optional[SimplificationCache] = None) -> str:
+    """Simplify text, serving repeated requests from the cache when one is given."""
+    simplified_text, _ = await _simplify(client, text, content_type, cache)
+    return simplified_text
+
+async def _simplify(client: LLMClient, text: str, content_type: str,
+                    cache: Optional[SimplificationCache]) -> Tuple[str, bool]:
+    # (simplified text, whether it came from the cache rather than a model call)
+    content_type = resolve_content_type(text, content_type)
+    if cache:
+        cached = cache.get(text, content_type, client.model_name)
+        if cached is not None:
+            return cached, True
+    
+    # The static instruction goes separately so the model can reuse its cached prefix
+    system_instruction, prompt = get_simplification_prompt_parts(text, content_type)
+    simplified_text = await client.generate(prompt, system_instruction)
+    
+    if cache:
+        cache.set(text, content_type, client.model_name, simplified_text)
+    return simplified_text, False
+
+async def simplify_document(client: LLMClient, text: str, content_type: str = "general",
+                            max_parallel: int = 4, reduce: bool = False,
+                            cache: Optional[SimplificationCache] = None) -> Dict:
+    """
+    Simplify a long document section by section (map), then merge in order.
+    
+    Sections are simplified concurrently with at most max_parallel in
+    flight, so latency follows the largest section rather than the whole
+    file. With reduce=True, one extra short call merges the section
+    summaries and drops repeated tips.
+    
+    Args:
+        client: LLM client
+        text: Document text
+        content_type: Prompt content type for every section
+        max_parallel: Maximum sections simplified at once
+        reduce: Run the merge call over the section summaries
+        cache: Optional result cache, applied per section
+    
+    Returns:
+        Dict with the merged text, per-section results and timings
+    """
+    start = time.perf_counter()
+    compaction = compact_text(text)
+    document = split_document(compaction.text)
+    content_type = resolve_content_type(compaction.text, content_type)
+    limiter = asyncio.Semaphore(max_parallel)
+    
+    async def simplify_section(section):
+        async with limiter:
+            section_start = time.perf_counter()
+            simplified_text = await simplify(client, section.text, content_type, cache)
+            return {
+                'title': section.title,
+                'simplified_text': simplified_text,
+                'seconds': time.perf_counter() - section_start
+            }
+    
+    sections = await asyncio.gather(*(simplify_section(section) for section in document.sections))
+    merged_text = "\n\n".join(section['simplified_text'].strip() for section in sections)
+    
+    if reduce and len(sections) > 1:
+        merged_text = await client.generate(get_section_merge_prompt(merged_text, content_type))
+    
+    return {
+        'title': document.title,
+        'tokens_before': compaction.tokens_before,
+        'tokens_after': compaction.tokens_after,
+        'simplified_text': merged_text,
+        'sections': sections,
+        'slowest_section_seconds': max((section['seconds'] for section in sections), default=0.0),
+        'total_seconds': time.perf_counter() - start
+    }
+
+class StreamStats:
+    """Length and reduction stats updated chunk by chunk while a response streams"""
+    
+    def __init__(self, original_text: str):
+        self.original_length = len(original_text)
+        self.simplified_length = 0
+        self.chunks = 0
+        self.started_at = time.perf_counter()
+        self.first_chunk_seconds: Optional[float] = None
+    
+    def add(self, chunk: str) -> None:
+        if self.first_chunk_seconds is None:
+            self.first_chunk_seconds = time.perf_counter() - self.started_at
+        self.chunks += 1
+        self.simplified_length += len(chunk)
+    
+    def to_dict(self) -> Dict:
+        reduction = 0
+        if self.original_length > 0:
+            reduction = round((self.original_length - self.simplified_length) / self.original_length * 100)
+        return {
+            'originalLength': self.original_length,
+            'simplifiedLength': self.simplified_length,
+            'reduction': f"{reduction}%",
+            'chunks': self.chunks,
+            'firstChunkSeconds': self.first_chunk_seconds,
+            'totalSeconds': time.perf_counter() - self.started_at
+        }
+
+async def stream_simplify(client: LLMClient, text: str, content_type: str = "general",
+                          cache: Optional[SimplificationCache] = None,
+                          token_budget: Optional[int] = None) -> AsyncIterator[Dict]:
+    """
+    Stream a simplification as events.
+    
+    Yields {"type": "chunk", "text": ...} for each piece of output as it
+    arrives, then a single {"type": "stats", ...} event with the length and
+    reduction stats and the input compaction token counts. A cached result
+    is sent as one chunk.
+    """
+    content_type = resolve_content_type(text, content_type)
+    stats = StreamStats(text)
+    compaction = compact_text(text, token_budget)
+    
+    cached = cache.get(compaction.text, content_type, client.model_name) if cache else None
+    if cached is not None:
+        stats.add(cached)
+        yield {'type': 'chunk', 'text': cached}
+    else:
+        chunks = []
+        system_instruction, prompt = get_simplification_prompt_parts(compaction.text, content_type)
+        async for chunk in client.stream(prompt, system_instruction):
+            stats.add(chunk)
+            chunks.append(chunk)
+            yield {'type': 'chunk', 'text': chunk}
+        if cache:
+            cache.set(compaction.text, content_type, client.model_name, ''.join(chunks))
+    
+    yield {'type': 'stats', **stats.to_dict(), **compaction.to_dict()}
+
+def stream_simplify_sync(client: LLMClient, text: str, content_type: str = "general",
+                         cache: Optional[SimplificationCache] = None,
+                         token_budget: Optional[int] = None) -> Iterator[Dict]:
+    """Blocking generator version of stream_simplify() for scripts."""
+    loop = asyncio.new_event_loop()
+    events = stream_simplify(client, text, content_type, cache, token_budget)
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(events.__anext__())
+            except StopAsyncIteration:
+                break
+    finally:
+        loop.run_until_complete(events.aclose())
+        loop.close()
+
+async def improve(client: LLMClient, original_text: str, simplified_text: str,
+                  report: Optional[ValidationReport] = None) -> str:
+    """Ask the model for a shorter, clearer version of a simplification, fixing any failed checks."""
+    if report is None:
+        return await client.generate(get_quality_improvement_prompt(simplified_text, original_text))
+    return await client.generate(get_quality_improvement_prompt(
+        simplified_text, original_text, report.messages(), report.word_limit
+    ))
+
+async def validate(client: LLMClient, original_text: str, simplified_text: str) -> str:
+    """Ask the model to check a simplification against the original (superseded by validator.py)."""
+    return await client.generate(get_validation_prompt(original_text, simplified_text))
+
+async def run_pipeline(client: LLMClient, text: str, content_type: str = "general",
+                       cache: Optional[SimplificationCache] = None,
+                       token_budget: Optional[int] = None) -> Dict:
+    """
+    Compact the input, run simplify, then validate locally and improve only on failure.
+    
+    Validation is a deterministic local check (validator.py), so a passing
+    simplification costs a single model call, or none when the cache
+    answers. A failing one gets one improvement call that lists the failed
+    checks, and the improved text is validated again.
+    """
+    start = time.perf_counter()
+    compaction = compact_text(text, token_budget)
+    content_type = resolve_content_type(compaction.text, content_type)
+    simplified_text, cached = await _simplify(client, compaction.text, content_type, cache)
+    simplified_at = time.perf_counter()
+    
+    report = validate_simplification(compaction.text, simplified_text, content_type)
+    improved_text = None
+    model_calls = 0 if cached else 1  # A cache hit costs no model call
+    if not report.passed:
+        improved_text = await improve(client, compaction.text, simplified_text, report)
+        report = validate_simplification(compaction.text, improved_text, content_type)
+        model_calls += 1
+    
+    return {
+        'content_type': content_type,
+        'tokens_before': compaction.tokens_before,
+        'tokens_after': compaction.tokens_after,
+        'simplified_text': simplified_text,
+        'improved_text': improved_text,
+        'validation_result': report,
+        'model_calls': model_calls,
+        'simplify_seconds': simplified_at - start,
+        'total_seconds': time.perf_counter() - start
+    }
+
+async def run_pipelines(client: LLMClient, items: List[Dict],
+                        cache: Optional[SimplificationCache] = None,
+                        token_budget: Optional[int] = None) -> List[Dict]:
+    """Run the pipeline for many {"text", "type"} items concurrently, preserving order."""
+    return await asyncio.gather(*(
+        run_pipeline(client, item['text'], item.get('type', 'general'), cache, token_budget)
+        for item in items
+    ))
+
+def load_data_files(data_dir: str = DATA_DIR) -> List[Dict]:
+    """Load the bundled tourist texts as pipeline items."""
+    items = []
+    for path in sorted(glob.glob(os.path.join(data_dir, '*.txt'))):
+        with open(path, 'r', encoding='utf-8') as file:
+            items.append({
+                'name': os.path.basename(path),
+                'text': file.read(),
+                'type': DATA_FILE_CONTENT_TYPES.get(os.path.basename(path), 'general')
+            })
+    return items
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the TravelBuddy simplification pipeline over the data files')
+    parser.add_argument('--backend', choices=['gemini', 'fake'], help='LLM backend (default: TRAVELBUDDY_LLM_BACKEND or gemini)')
+    parser.add_argument('--concurrency', type=int, default=8, help='Maximum concurrent model calls')
+    parser.add_argument('--repeat', type=int, default=1, help='Repeat the data set to simulate load')
+    parser.add_argument('--sections', action='store_true', help='Simplify each file section by section instead of as one prompt')
+    parser.add_argument('--reduce', action='store_true', help='With --sections, merge the section summaries with one extra call')
+    parser.add_argument('--token-budget', type=int, help='Hard token budget for each input after compaction')
+    args = parser.parse_args()
+    
+    client = create_client(args.backend, max_concurrency=args.concurrency)
+    items = load_data_files() * args.repeat
+    
+    if args.sections:
+        for item in items:
+            result = asyncio.run(simplify_document(client, item['text'], item['type'], args.concurrency, args.reduce))
+            print(f"  • {item['name']}: {len(result['sections'])} sections in {result['total_seconds']:.2f}s "
+                  f"(slowest section {result['slowest_section_seconds']:.2f}s)")
+        return
+    
+    print(f"🚀 Running {len(items)} pipelines on {client.model_name} (concurrency {args.concurrency})")
+    start = time.perf_counter()
+    results = asyncio.run(run_pipelines(client, items, token_budget=args.token_budget))
+    elapsed = time.perf_counter() - start
+    
+    for item, result in zip(items, results):
+        status = '✅' if result['validation_result'].passed else '⚠️'
+        improved = ', improved' if result['improved_text'] is not None else ''
+        print(f"  • {item['name']}: {result['total_seconds']:.2f}s, "
+              f"input {result['tokens_before']} → {result['tokens_after']} tokens, validation {status}{improved}")
+    model_calls = sum(result['model_calls'] for result in results)
+    print(f"✅ {len(results)} pipelines in {elapsed:.2f}s ({model_calls} model calls, {model_calls / elapsed:.1f}/s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+# stop_index.py
+# Spatial index over transit stops: a lat/lon grid with radius and k-nearest queries
+
+import math
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Sequence, Tuple
+
+from numpy_support import numpy_for, optional_numpy
+
+EARTH_RADIUS_KM = 6371.0088
+# Candidates from which radius queries use NumPy (see numpy_support.numpy_for)
+NUMPY_MIN_CANDIDATES = 48
+
+def haversine_km(latitude1: float, longitude1: float, latitude2: float, longitude2: float) -> float:
+    """Great-circle distance between two points in degrees."""
+    phi1, phi2 = math.radians(latitude1), math.radians(latitude2)
+    a = (math.sin((phi2 - phi1) / 2) ** 2
+         + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(longitude2 - longitude1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(a, 1.0)))
+
+class StopIndex:
+    """
+    Stops bucketed into grid cells of about cell_km × cell_km.
+
+    A cell's key is row * columns + column, and stops are stored sorted by
+    key, so the cells of one grid row that a query overlaps form one
+    contiguous slice. A radius query reads one slice per row it spans and
+    computes haversine distances only for those candidates, vectorized
+    with NumPy when there are many. Longitude cells are sized for the
+    stops' mean latitude, which suits a city or region; queries across the
+    antimeridian are not supported.
+    """
+
+    def __init__(self, latitudes: Sequence[float], longitudes: Sequence[float], cell_km: float = 0.5):
+        """
+        Args:
+            latitudes: Stop latitudes in degrees; a stop's position is its stop number
+            longitudes: Stop longitudes in degrees
+            cell_km: Grid cell size; about the typical query radius works best
+        """
+        count = len(latitudes)
+        self.cell_km = cell_km
+        self.cell_latitude = math.degrees(cell_km / EARTH_RADIUS_KM)
+        reference = sum(latitudes) / count if count else 0.0
+        self.cell_longitude = self.cell_latitude / max(math.cos(math.radians(reference)), 0.01)
+        self.columns = int(360 / self.cell_longitude) + 2
+
+        keys = [self._row(latitude) * self.columns + self._column(longitude)
+                for latitude, longitude in zip(latitudes, longitudes)]
+        order = sorted(range(count), key=keys.__getitem__)
+        self.keys = array('q', (keys[stop] for stop in order))
+        self.stops = array('i', order)
+        self.latitudes = array('d', (math.radians(latitudes[stop]) for stop in order))
+        self.longitudes = array('d', (math.radians(longitudes[stop]) for stop in order))
+        self.cos_latitudes = array('d', (math.cos(latitude) for latitude in self.latitudes))
+        # Where each occupied grid row starts and ends, so bisects only search within one row
+        self._rows: Dict[int, Tuple[int, int]] = {}
+        for position, key in enumerate(self.keys):
+            row = key // self.columns
+            start, _ = self._rows.get(row, (position, position))
+            self._rows[row] = (start, position + 1)
+        np = optional_numpy()
+        if np is not None:
+            self._np_stops = np.frombuffer(self.stops, dtype=np.int32)
+            # Unit vectors: the chord between two of them orders points like the great-circle distance
+            latitudes, longitudes = np.frombuffer(self.latitudes), np.frombuffer(self.longitudes)
+            self._np_points = np.column_stack((np.cos(latitudes) * np.cos(longitudes),
+                                               np.cos(latitudes) * np.sin(longitudes), np.sin(latitudes)))
+
+    def __len__(self) -> int:
+        return len(self.stops)
+
+    def _row(self, latitude: float) -> int:
+        return int((latitude + 90.0) // self.cell_latitude)
+
+    def _column(self, longitude: float) -> int:
+        return int((longitude + 180.0) // self.cell_longitude)
+
+    def _candidate_slices(self, latitude: float, longitude: float, radius_km: float) -> List[Tuple[int, int]]:
+        latitude_span = math.degrees(radius_km / EARTH_RADIUS_KM)
+        longitude_span = latitude_span / max(math.cos(math.radians(min(abs(latitude) + latitude_span, 90.0))), 1e-9)
+        first_column = max(self._column(max(longitude - longitude_span, -180.0)), 0)
+        last_column = min(self._column(min(longitude + longitude_span, 180.0)), self.columns - 1)
+        slices = []
+        keys, rows, columns = self.keys, self._rows, self.columns
+        for row in range(self._row(max(latitude - latitude_span, -90.0)),
+                         self._row(min(latitude + latitude_span, 90.0)) + 1):
+            bounds = rows.get(row)
+            if bounds is None:
+                continue
+            start = bisect_left(keys, row * columns + first_column, *bounds)
+            end = bisect_right(keys, row * columns + last_column, start, bounds[1])
+            if start < end:
+                slices.append((start, end))
+        return slices
+
+    def within(self, latitude: float, longitude: float, radius_km: float) -> List[Tuple[int, float]]:
+        """
+        Stops within radius_km of a point.
+
+        Returns:
+            (stop, distance km) pairs, nearest first
+        """
+        if radius_km < 0 or not self.stops:
+            return []
+        slices = self._candidate_slices(latitude, longitude, radius_km)
+        if not slices:
+            return []
+        candidates = sum(end - start for start, end in slices)
+        np = numpy_for(candidates, NUMPY_MIN_CANDIDATES)
+        if np is not None:
+            return self._numpy_within(np, slices, latitude, longitude, radius_km)
+
+        phi = math.radians(latitude)
+        lam = math.radians(longitude)
+        cos_phi = math.cos(phi)
+        scale = 2 * EARTH_RADIUS_KM
+        sin, asin, sqrt = math.sin, math.asin, math.sqrt
+        stops, latitudes, longitudes, cos_latitudes = self.stops, self.latitudes, self.longitudes, self.cos_latitudes
+        found = []
+        for start, end in slices:
+            for position in range(start, end):
+                a = (sin((latitudes[position] - phi) / 2) ** 2
+                     + cos_phi * cos_latitudes[position] * sin((longitudes[position] - lam) / 2) ** 2)
+                distance = scale * asin(sqrt(min(a, 1.0)))
+                if distance <= radius_km:
+                    found.append((stops[position], distance))
+        found.sort(key=lambda item: item[1])
+        return found
+
+    def _numpy_within(self, np, slices: List[Tuple[int, int]], latitude: float, longitude: float,
+                      radius_km: float) -> List[Tuple[int, float]]:
+        if len(slices) == 1:
+            points, stops = self._np_points[slice(*slices[0])], self._np_stops[slice(*slices[0])]
+        else:
+            points = np.concatenate([self._np_points[start:end] for start, end in slices])
+            stops = np.concatenate([self._np_stops[start:end] for start, end in slices])
+        phi, lam = math.radians(latitude), math.radians(longitude)
+        offsets = points - (math.cos(phi) * math.cos(lam), math.cos(phi) * math.sin(lam), math.sin(phi))
+        chords = np.einsum('ij,ij->i', offsets, offsets)  # Squared chord lengths
+        limit = (2 * math.sin(min(radius_km / EARTH_RADIUS_KM, math.pi) / 2)) ** 2
+        inside = np.flatnonzero(chords <= limit)
+        inside = inside[np.argsort(chords[inside], kind='stable')]
+        distances = 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(np.sqrt(chords[inside]) / 2, 1.0))
+        return list(zip(stops[inside].tolist(), distances.tolist()))
+
+    def nearest(self, latitude: float, longitude: float, k: int = 5,
+                max_radius_km: float = math.pi * EARTH_RADIUS_KM) -> List[Tuple[int, float]]:
+        """
+        The k stops nearest to a point, searching out to max_radius_km.
+
+        The search radius starts at one cell and doubles until k stops are
+        inside it; any stop outside is further than all of those, so the
+        first k are exact.
+
+        Returns:
+            (stop, distance km) pairs, nearest first
+        """
+        if k <= 0:
+            return []
+        radius = min(self.cell_km, max_radius_km)
+        while True:
+            found = self.within(latitude, longitude, radius)
+            if len(found) >= k or radius >= max_radius_km:
+                return found[:k]
+            radius = min(radius * 2, max_radius_km)
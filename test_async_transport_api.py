@@ -0,0 +1,123 @@
+"""
+Checks for AsyncTransportAPI against httpx.MockTransport: in-flight
+request sharing, cancellation, circuit-breaker fallbacks and multi-mode merging.
+"""
+
+import asyncio
+
+import httpx
+
+from async_transport_api import AsyncTransportAPI
+from benchmarks.directions_fixture import make_directions_response
+from resilience import OPEN
+from route_cache import RouteCache
+from transport_api import TransportAPI
+
+def walking_response() -> dict:
+    return {'status': 'OK', 'routes': [{'summary': 'Broadway', 'legs': [{
+        'end_address': 'JFK Airport', 'duration': {'text': '3 hours 5 mins', 'value': 11100},
+        'departure_time': {'text': '10:00', 'value': 0}, 'arrival_time': {'text': '13:05', 'value': 11100}
+    }]}]}
+
+class Directions:
+    """MockTransport handler answering per travel mode, counting requests"""
+
+    def __init__(self, responses: dict, gate: asyncio.Event = None):
+        self.responses = responses
+        self.gate = gate
+        self.requests = []
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        mode = request.url.params['mode']
+        self.requests.append(mode)
+        if self.gate is not None:
+            await self.gate.wait()
+        response = self.responses.get(mode, 500)
+        if isinstance(response, int):
+            return httpx.Response(response, json={'status': 'UNKNOWN_ERROR'})
+        return httpx.Response(200, json=response)
+
+def make_api(directions: Directions, failure_threshold: int = 5) -> AsyncTransportAPI:
+    api = TransportAPI(failure_threshold=failure_threshold)
+    api.google_maps_api_key = 'test-key'
+    api.gtfs_feed_path = None
+    api._route_cache = RouteCache()
+    return AsyncTransportAPI(api, transport=httpx.MockTransport(directions))
+
+def test_concurrent_misses_share_one_request():
+    async def run():
+        gate = asyncio.Event()
+        directions = Directions({'transit': make_directions_response(routes=2, polyline_length=1)}, gate)
+        async with make_api(directions) as api:
+            calls = [asyncio.create_task(api.get_google_maps_routes('Times Square', 'JFK Airport'))
+                     for _ in range(5)]
+            await asyncio.sleep(0.01)
+            gate.set()
+            results = await asyncio.gather(*calls)
+            assert directions.requests == ['transit']
+            assert all(len(routes) == len(results[0]) > 0 for routes in results)
+            # Each caller gets its own route objects
+            assert len({id(routes[0]) for routes in results}) == 5
+            # Later calls are cache hits
+            await api.get_google_maps_routes('Times Square', 'JFK Airport')
+            assert directions.requests == ['transit']
+    asyncio.run(run())
+
+def test_cancelled_caller_does_not_cancel_shared_request():
+    async def run():
+        gate = asyncio.Event()
+        directions = Directions({'transit': make_directions_response(routes=2, polyline_length=1)}, gate)
+        async with make_api(directions) as api:
+            first = asyncio.create_task(api._get_routes('Times Square', 'JFK Airport'))
+            second = asyncio.create_task(api._get_routes('Times Square', 'JFK Airport'))
+            await asyncio.sleep(0.01)
+            first.cancel()
+            await asyncio.sleep(0)
+            gate.set()
+            routes = await second
+            assert first.cancelled() and routes and directions.requests == ['transit']
+            key = api.api.route_cache.key('Times Square', 'JFK Airport')
+            assert api.api.route_cache.get(key) is not None and not api._inflight
+    asyncio.run(run())
+
+def test_open_circuit_falls_back_without_requests():
+    async def run():
+        directions = Directions({'transit': 500})
+        async with make_api(directions, failure_threshold=2) as api:
+            # Entries expire at once, so every call goes past the cache
+            api.api._route_cache = RouteCache(ttl_seconds=0, stale_seconds=0)
+            mock_ids = [route.route_id for route in api.api.get_mock_routes('Times Square', 'JFK Airport')]
+            for _ in range(2):
+                routes = await api.get_google_maps_routes('Times Square', 'JFK Airport')
+                assert [route.route_id for route in routes] == mock_ids
+            assert api.api.directions_breaker.state == OPEN and len(directions.requests) == 2
+
+            # With the circuit open, calls do not reach the API; last-known routes are served when there are any
+            key = api.api.route_cache.key('Times Square', 'JFK Airport')
+            api.api.route_cache.put(key, api.api.get_mock_routes('Times Square', 'JFK Airport')[:1])
+            routes = await api.get_google_maps_routes('Times Square', 'JFK Airport')
+            assert [route.route_id for route in routes] == mock_ids[:1]
+            routes = await api.get_multimodal_routes('Times Square', 'JFK Airport', ('transit', 'walking'))
+            assert [route.route_id for route in routes] == mock_ids[:1]
+            assert len(directions.requests) == 2 and api.api.directions_breaker.stats.rejected == 3
+    asyncio.run(run())
+
+def test_multimodal_routes_merge_modes():
+    async def run():
+        transit = make_directions_response(routes=3, transit_steps=2, polyline_length=1)
+        # A repeated alternative shares its transit legs with the first one
+        transit['routes'].append(transit['routes'][0])
+        directions = Directions({'transit': transit, 'walking': walking_response(), 'driving': 500})
+        async with make_api(directions) as api:
+            routes = await api.get_multimodal_routes('Times Square', 'JFK Airport', ('transit', 'walking', 'driving'))
+            assert sorted(directions.requests) == ['driving', 'transit', 'walking']
+            identities = [(route.transport_type, route.route_id, route.departure_time, route.platform)
+                          for route in routes]
+            assert len(identities) == len(set(identities)) == 6 + 1
+            assert [route.transport_type for route in routes][-1] == 'walking'
+            assert 'driving' not in {route.transport_type for route in routes}
+
+            ranked = await api.find_best_routes('Times Square', 'JFK Airport', {'transport_types': ['walking']},
+                                                modes=('transit', 'walking'), limit=3)
+            assert len(ranked) == 3 and ranked[0].transport_type != 'walking'  # 3 hours on foot ranks low
+    asyncio.run(run())
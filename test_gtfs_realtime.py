@@ -0,0 +1,99 @@
+"""
+Checks for gtfs_realtime.RealtimeState: diffs, per-source full datasets
+and the running route totals, plus RealtimeFeed file refreshes.
+"""
+
+import json
+import os
+import random
+import tempfile
+
+from benchmarks.gtfs_realtime_fixture import FeedGenerator, trip_update, vehicle_position
+from gtfs_realtime import RealtimeFeed, RealtimeState
+
+NOW = 1_800_000_000
+
+def feed(*entities, incrementality: str = 'FULL_DATASET') -> dict:
+    return {'header': {'incrementality': incrementality, 'timestamp': str(NOW)}, 'entity': list(entities)}
+
+def vehicle(trip_id: str, route_id: str, occupancy: str = 'FULL') -> dict:
+    return vehicle_position(trip_id, route_id, f"V-{trip_id}", occupancy, random.Random(trip_id))
+
+def test_route_summary_and_diffs():
+    state = RealtimeState()
+    stats = state.apply_feed(feed(trip_update('T1', 'R1', 300, NOW + 120), trip_update('T2', 'R1', 60, NOW + 60),
+                                  vehicle('T1', 'R1')))
+    assert (stats.changed, stats.routes_touched) == (3, 1)
+    info = state.route_info('R1')
+    assert (info['status'], info['delay_minutes'], info['trips'], info['vehicles']) == ('Delayed', 3, 2, 1)
+    assert info['crowding_level'] == 'High'
+
+    # The same snapshot changes nothing; a DIFFERENTIAL update moves only its trip
+    assert state.apply_feed(feed(trip_update('T1', 'R1', 300, NOW + 120), trip_update('T2', 'R1', 60, NOW + 60),
+                                 vehicle('T1', 'R1'))).unchanged == 3
+    state.apply_feed(feed(trip_update('T1', 'R1', 0, NOW + 120), incrementality='DIFFERENTIAL'))
+    info = state.route_info('R1')
+    assert (info['status'], info['delay_minutes'], info['trips']) == ('On Time', 0, 2)
+    assert state.trip('T1').vehicle_id == 'V-T1'
+
+def test_full_dataset_removes_only_its_own_source():
+    state = RealtimeState()
+    state.apply_feed(feed(trip_update('T1', 'R1', 120, NOW + 60), trip_update('T2', 'R2', 0, NOW + 60)),
+                     source='trip-updates')
+    state.apply_feed(feed(vehicle('T1', 'R1'), vehicle('T3', 'R3')), source='vehicle-positions')
+
+    # T2 left the trip-updates snapshot; the vehicle-positions entities stay
+    stats = state.apply_feed(feed(trip_update('T1', 'R1', 120, NOW + 60)), source='trip-updates')
+    assert stats.removed == 1
+    assert state.route_info('R2') is None and state.trip('T2') is None
+    assert state.route_info('R3')['vehicles'] == 1
+    assert state.trip('T1').delay_seconds == 120 and state.trip('T1').vehicle_id == 'V-T1'
+
+    # Removing T1's vehicle keeps its trip update, and its delay in the route totals
+    state.apply_feed(feed(vehicle('T3', 'R3')), source='vehicle-positions')
+    assert state.trip('T1').vehicle_id is None
+    assert (state.route_info('R1')['delay_minutes'], state.route_info('R1')['vehicles']) == (2, 0)
+    assert 'crowding_level' not in state.route_info('R1')
+
+def test_cancelled_and_deleted_trips():
+    state = RealtimeState()
+    state.apply_feed(feed(trip_update('T1', 'R1', 0, NOW + 60, cancelled=True)))
+    assert state.route_info('R1')['status'] == 'Cancelled'
+    state.apply_feed(feed({'id': 'tu-T1', 'isDeleted': True}, incrementality='DIFFERENTIAL'))
+    assert state.route_info('R1') is None and state.trips == {}
+
+def test_aliases_and_trip_routes():
+    state = RealtimeState(route_aliases={'B1': 'route-b1'}, trip_routes={'T9': 'route-b1'}.get)
+    update = trip_update('T9', '', 600, NOW + 60)
+    del update['tripUpdate']['trip']['routeId']
+    state.apply_feed(feed(update))
+    assert state.route_info('B1') is state.route_info('route-b1')
+    assert state.route_info('B1')['delay_minutes'] == 10
+
+def test_running_totals_match_recomputation():
+    generator = FeedGenerator(trips=300, routes=7, seed=3, now=NOW)
+    state = RealtimeState()
+    state.apply_feed(generator.full_feed())
+    for _ in range(5):
+        state.apply_feed(generator.mutate(0.2))
+    state.apply_feed(generator.full_feed())
+    fresh = RealtimeState()
+    fresh.apply_feed(generator.full_feed())
+    for route in range(7):
+        assert state.route_info(f"R{route}") == fresh.route_info(f"R{route}")
+
+def test_feed_rereads_changed_files():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'trip-updates.json')
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(feed(trip_update('T1', 'R1', 0, NOW + 60)), file)
+        realtime = RealtimeFeed([path], refresh_seconds=3600)
+        assert list(realtime.refresh()) == [path]
+        assert realtime.refresh() == {}  # Within refresh_seconds
+        assert realtime.refresh(force=True) == {}  # File unchanged
+
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(feed(trip_update('T1', 'R1', 300, NOW + 60)), file)
+        os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1_000_000))
+        assert list(realtime.refresh(force=True)) == [path]
+        assert realtime.state.route_info('R1')['status'] == 'Delayed'
@@ -0,0 +1,115 @@
+"""
+Checks for gtfs_timetable: journeys, transfers, service dates and saved builds.
+"""
+
+import os
+import tempfile
+import zipfile
+from datetime import datetime
+
+from benchmarks.gtfs_fixture import make_gtfs_feed, stop_name
+from gtfs_timetable import GTFSTimetable, JourneyPlanner
+
+MONDAY = datetime(2026, 10, 19, 7, 55)
+
+def _station_feed(path: str, transfers: str = '') -> str:
+    """
+    A to C changing at station B: R1 runs A → B Platform 1, R2 runs B Platform 2 → C at 08:12 and 08:20.
+    Night route N runs A → C at 00:10 and past midnight at 24:20 (00:20 the next day).
+    Service WK runs weekdays except 2026-10-20; service SUN runs only on 2026-10-25.
+    """
+    files = {
+        'stops.txt': 'stop_id,stop_name,stop_lat,stop_lon,location_type,parent_station\n'
+                     'A,A,40.700,-74.000,,\n'
+                     'B,B,40.710,-74.000,1,\n'
+                     'B1,B Platform 1,40.710,-74.000,,B\n'
+                     'B2,B Platform 2,40.710,-74.001,,B\n'
+                     'C,C,40.720,-74.000,,\n',
+        'routes.txt': 'route_id,route_short_name,route_long_name,route_type\nR1,R1,,3\nR2,R2,,3\nN,N,,3\n',
+        'trips.txt': 'route_id,service_id,trip_id\nR1,WK,T1\nR2,WK,T2\nR2,WK,T3\nR1,SUN,T4\nN,WK,N1\nN,WK,N2\n',
+        'stop_times.txt': 'trip_id,arrival_time,departure_time,stop_id,stop_sequence\n'
+                          'T1,08:00:00,08:00:00,A,1\nT1,08:10:00,08:10:00,B1,2\n'
+                          'T2,08:12:00,08:12:00,B2,1\nT2,08:30:00,08:30:00,C,2\n'
+                          'T3,08:20:00,08:20:00,B2,1\nT3,08:40:00,08:40:00,C,2\n'
+                          'T4,09:00:00,09:00:00,A,1\nT4,09:10:00,09:10:00,B1,2\n'
+                          'N1,00:10:00,00:10:00,A,1\nN1,00:30:00,00:30:00,C,2\n'
+                          'N2,24:20:00,24:20:00,A,1\nN2,24:40:00,24:40:00,C,2\n',
+        'calendar.txt': 'service_id,monday,tuesday,wednesday,thursday,friday,saturday,sunday,start_date,end_date\n'
+                        'WK,1,1,1,1,1,0,0,20260101,20261231\n',
+        'calendar_dates.txt': 'service_id,date,exception_type\nWK,20261020,2\nSUN,20261025,1\n'
+    }
+    if transfers:
+        files['transfers.txt'] = 'from_stop_id,to_stop_id,transfer_type,min_transfer_time\n' + transfers
+    with zipfile.ZipFile(path, 'w') as feed:
+        for name, text in files.items():
+            feed.writestr(name, text)
+    return path
+
+def _plan(transfers: str = '', departure: datetime = MONDAY, destination: str = 'C'):
+    with tempfile.TemporaryDirectory() as directory:
+        timetable = GTFSTimetable.from_zip(_station_feed(os.path.join(directory, 'feed.zip'), transfers))
+    return JourneyPlanner(timetable).plan('A', destination, departure, alternatives=1)
+
+def test_transfer_journey_on_grid():
+    with tempfile.TemporaryDirectory() as directory:
+        feed_path = os.path.join(directory, 'grid.zip')
+        make_gtfs_feed(feed_path, grid=8)
+        planner = JourneyPlanner(GTFSTimetable.from_zip(feed_path))
+    itineraries = planner.plan(stop_name(0, 0), stop_name(2, 3), datetime(2026, 10, 19, 8, 0))
+    assert len(itineraries) == 3
+    first = itineraries[0]
+    assert [leg.route_id for leg in first.rides] == ['B1', 'M4']
+    assert first.transfers == 1
+    assert first.departure == datetime(2026, 10, 19, 8, 0)
+    assert first.arrival == datetime(2026, 10, 19, 8, 14)
+    assert all(later.departure > earlier.departure for earlier, later in zip(itineraries, itineraries[1:]))
+
+def test_station_footpath_between_platforms():
+    itineraries = _plan()
+    assert len(itineraries) == 1
+    assert [leg.route_id for leg in itineraries[0].rides] == ['R1', 'R2']
+    assert itineraries[0].arrival == datetime(2026, 10, 19, 8, 30)
+
+def test_min_transfer_time_overrides_station_default():
+    itineraries = _plan('B1,B2,2,300\n')
+    assert itineraries[0].arrival == datetime(2026, 10, 19, 8, 40)
+
+def test_transfer_type_3_excludes_station_footpath():
+    assert _plan('B1,B2,3,\n') == []
+
+def test_removed_and_added_service_dates():
+    assert _plan(departure=datetime(2026, 10, 20, 7, 55)) == []
+    assert _plan(departure=datetime(2026, 10, 21, 7, 55))[0].arrival == datetime(2026, 10, 21, 8, 30)
+    itineraries = _plan(departure=datetime(2026, 10, 25, 7, 55), destination='B Platform 1')
+    assert itineraries[0].departure == datetime(2026, 10, 25, 9, 0)
+    assert _plan(departure=datetime(2026, 11, 1, 7, 55), destination='B Platform 1') == []
+
+def test_previous_service_day_runs_past_midnight():
+    # Monday's 24:20 trip leaves at 00:20 on Tuesday, a day WK does not run
+    itineraries = _plan(departure=datetime(2026, 10, 20, 0, 5))
+    assert [leg.route_id for leg in itineraries[0].rides] == ['N']
+    assert itineraries[0].departure == datetime(2026, 10, 20, 0, 20)
+    assert itineraries[0].arrival == datetime(2026, 10, 20, 0, 40)
+
+def test_next_service_day_within_max_duration():
+    # Friday's 00:10 trip beats Thursday's own 24:20 trip
+    itineraries = _plan(departure=datetime(2026, 10, 22, 23, 50))
+    assert itineraries[0].departure == datetime(2026, 10, 23, 0, 10)
+    assert itineraries[0].arrival == datetime(2026, 10, 23, 0, 30)
+
+def test_saved_build_matches_parsed_zip():
+    with tempfile.TemporaryDirectory() as directory:
+        feed_path = _station_feed(os.path.join(directory, 'feed.zip'), 'B2,B1,2,90\n')
+        parsed = GTFSTimetable.from_zip(feed_path)
+        parsed.save(os.path.join(directory, 'build'))
+        mapped = GTFSTimetable.open(os.path.join(directory, 'build'))
+        for name in GTFSTimetable.COLUMNS:
+            assert list(getattr(mapped, name)) == list(getattr(parsed, name)), name
+        for name in GTFSTimetable.TEXTS:
+            assert getattr(mapped, name) == getattr(parsed, name), name
+        assert mapped.service_exceptions == parsed.service_exceptions
+        for departure in (MONDAY, datetime(2026, 10, 20, 7, 55), datetime(2026, 10, 25, 7, 55)):
+            for destination in ('C', 'B Platform 1'):
+                expected = JourneyPlanner(parsed).plan('A', destination, departure)
+                assert JourneyPlanner(mapped).plan('A', destination, departure) == expected
+        del mapped
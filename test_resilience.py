@@ -0,0 +1,128 @@
+"""
+Checks for resilience.CircuitBreaker state changes with a fake clock.
+"""
+
+import asyncio
+import time
+
+from async_transport_api import AsyncTransportAPI
+from resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+from route_cache import RouteCache
+from transport_api import TransportAPI, TransportRoute
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+class RequestError(Exception):
+    """An answer from the service, e.g. no route found"""
+
+def failing():
+    raise ConnectionError('down')
+
+def make_breaker(clock: FakeClock, changes: list) -> CircuitBreaker:
+    breaker = CircuitBreaker('test', failure_threshold=3, recovery_timeout=30, clock=clock,
+                             is_failure=lambda error: not isinstance(error, RequestError))
+    breaker.on_state_change(lambda old, new: changes.append((old, new)))
+    return breaker
+
+def call_failing(breaker: CircuitBreaker, times: int = 1) -> None:
+    for _ in range(times):
+        try:
+            breaker.call(failing)
+        except ConnectionError:
+            pass
+
+def test_opens_after_consecutive_failures():
+    clock, changes = FakeClock(), []
+    breaker = make_breaker(clock, changes)
+    call_failing(breaker, 2)
+    assert breaker.call(lambda: 'ok') == 'ok'  # A success resets the count
+    call_failing(breaker, 2)
+    assert breaker.state == CLOSED
+    call_failing(breaker)
+    assert breaker.state == OPEN and changes == [(CLOSED, OPEN)]
+
+    calls = []
+    try:
+        breaker.call(calls.append, 1)
+        assert False, 'open circuit let a call through'
+    except CircuitOpenError:
+        pass
+    assert calls == [] and breaker.stats.rejected == 1
+
+def test_half_open_probe_closes_or_reopens():
+    clock, changes = FakeClock(), []
+    breaker = make_breaker(clock, changes)
+    call_failing(breaker, 3)
+    clock.now = 29.9
+    assert breaker.state == OPEN
+    clock.now = 30
+    assert breaker.state == HALF_OPEN
+
+    # One probe at a time; its failure opens the circuit for another timeout
+    assert breaker.allow() and not breaker.allow()
+    breaker.record_failure(ConnectionError('still down'))
+    assert breaker.state == OPEN
+    clock.now = 59
+    assert breaker.state == OPEN
+    clock.now = 60
+    assert breaker.call(lambda: 'ok') == 'ok'
+    assert breaker.state == CLOSED
+    assert changes == [(CLOSED, OPEN), (OPEN, HALF_OPEN), (HALF_OPEN, OPEN), (OPEN, HALF_OPEN), (HALF_OPEN, CLOSED)]
+    assert (breaker.stats.opened, breaker.stats.half_opened, breaker.stats.closed) == (2, 2, 1)
+
+def test_request_errors_do_not_count():
+    clock, changes = FakeClock(), []
+    breaker = make_breaker(clock, changes)
+    for _ in range(5):
+        breaker.record_failure(RequestError('ZERO_RESULTS'))
+    assert breaker.state == CLOSED and breaker.stats.failures == 0 and breaker.stats.successes == 5
+
+def test_late_failure_restarts_timeout_and_reset():
+    clock, changes = FakeClock(), []
+    breaker = make_breaker(clock, changes)
+    call_failing(breaker, 3)
+    clock.now = 20
+    breaker.record_failure(ConnectionError('allowed before the circuit opened'))
+    clock.now = 40
+    assert breaker.state == OPEN
+    clock.now = 50
+    assert breaker.state == HALF_OPEN
+    breaker.reset()
+    assert breaker.state == CLOSED and breaker.allow()
+
+def test_async_stale_refresh_goes_through_breaker():
+    clock, changes = FakeClock(), []
+    api = TransportAPI()
+    api.google_maps_api_key = 'test-key'
+    api.directions_breaker = make_breaker(clock, changes)
+    api._route_cache = RouteCache(ttl_seconds=60, stale_seconds=300, clock=clock)
+    fetches = []
+    def fetch(*args):
+        fetches.append(args)
+        raise ConnectionError('down')
+    api._fetch_google_maps_routes = fetch
+    async_api = AsyncTransportAPI(api)
+    key = api.route_cache.key('A', 'B')
+    api.route_cache.put(key, [TransportRoute('old', 'Bus old', 'bus', 'Downtown', '10:00', '10:20', '20 mins')])
+    clock.now += 61
+
+    def stale_read(refresh_errors: int):
+        routes = asyncio.run(async_api._get_routes('A', 'B'))
+        assert [route.route_id for route in routes] == ['old']
+        deadline = time.monotonic() + 2
+        while api.route_cache.stats.refresh_errors < refresh_errors and time.monotonic() < deadline:
+            time.sleep(0.005)
+        assert api.route_cache.stats.refresh_errors == refresh_errors
+
+    # Failed stale refreshes count against the breaker...
+    for attempt in range(1, 4):
+        stale_read(attempt)
+    assert len(fetches) == 3 and api.directions_breaker.state == OPEN
+    # ...and once it is open, they no longer reach the API
+    stale_read(4)
+    assert len(fetches) == 3 and api.directions_breaker.stats.rejected == 1
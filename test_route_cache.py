@@ -0,0 +1,154 @@
+"""
+Checks for route_cache.RouteCache with a fake clock: freshness,
+stale-while-revalidate, departure buckets and the last-known fallback.
+"""
+
+import asyncio
+import threading
+import time
+from datetime import datetime
+from unittest.mock import patch
+
+from async_transport_api import AsyncTransportAPI
+from route_cache import RouteCache
+from transport_api import DirectionsAPIError, TransportAPI, TransportRoute
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+def routes(name: str):
+    return [TransportRoute(name, f"Bus {name}", 'bus', 'Downtown', '10:00', '10:20', '20 mins')]
+
+def wait_for(condition, timeout: float = 2.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+def make_cache(clock: FakeClock) -> RouteCache:
+    return RouteCache(ttl_seconds=60, stale_seconds=300, clock=clock)
+
+def test_fresh_hit_and_copies():
+    cache = make_cache(FakeClock())
+    key = cache.key('Times Square', 'JFK Airport')
+    assert cache.get(key) is None and cache.stats.misses == 1
+    cache.put(key, routes('1'))
+    hit = cache.get(key)
+    hit[0].real_time_info = {'status': 'Delayed'}
+    assert cache.get(key)[0].real_time_info is None  # Annotating a copy leaves the cache alone
+    assert cache.stats.memory_hits == 2
+
+def test_stale_entry_served_while_refreshing():
+    clock = FakeClock()
+    cache = make_cache(clock)
+    key = cache.key('Times Square', 'JFK Airport')
+    cache.put(key, routes('old'))
+    clock.now += 61  # Past the TTL, inside the stale window
+
+    started, release = threading.Event(), threading.Event()
+    def fetch():
+        started.set()
+        release.wait(2)
+        return routes('new')
+    assert cache.get(key, fetch)[0].route_id == 'old'
+    assert started.wait(2)
+    assert cache.get(key, fetch)[0].route_id == 'old'  # One refresh at a time
+    release.set()
+    assert wait_for(lambda: cache.stats.refreshes == 1)
+    assert cache.stats.stale_hits == 2
+    assert cache.get(key)[0].route_id == 'new' and cache.stats.stale_hits == 2
+
+def test_failed_refresh_keeps_stale_entry():
+    clock = FakeClock()
+    cache = make_cache(clock)
+    key = cache.key('A', 'B')
+    cache.put(key, routes('old'))
+    clock.now += 120
+    def fetch():
+        raise RuntimeError('Directions API down')
+    assert cache.get(key, fetch)[0].route_id == 'old'
+    assert wait_for(lambda: cache.stats.refresh_errors == 1)
+    assert cache.get(key)[0].route_id == 'old'
+
+def test_expired_entry_is_a_miss_but_last_known():
+    clock = FakeClock()
+    cache = make_cache(clock)
+    key = cache.key('A', 'B')
+    cache.put(key, routes('old'))
+    clock.now += 361  # Past TTL + stale window
+    assert cache.get(key) is None
+    assert cache.get_last_known(key)[0].route_id == 'old'
+    assert cache.get_or_fetch(key, lambda: routes('new'))[0].route_id == 'new'
+    assert cache.get_last_known(cache.key('A', 'C')) is None
+
+def test_departure_bucket_rollover():
+    cache = RouteCache(bucket_seconds=300)
+    bucket_start = 300 * 6_000_000
+    first = cache.key('Times Square', 'JFK Airport', departure_time=datetime.fromtimestamp(bucket_start))
+    same = cache.key(' times  square', 'JFK AIRPORT', departure_time=datetime.fromtimestamp(bucket_start + 299))
+    next_bucket = cache.key('Times Square', 'JFK Airport', departure_time=datetime.fromtimestamp(bucket_start + 300))
+    assert first == same and first != next_bucket
+    assert first != cache.key('Times Square', 'JFK Airport', 'walking', datetime.fromtimestamp(bucket_start))
+
+def test_last_known_crosses_bucket_boundary():
+    cache = make_cache(FakeClock())
+    with patch('route_cache.time.time', return_value=300 * 6_000_000 + 250):
+        cache.put(cache.key('Times Square', 'JFK Airport'), routes('earlier'))
+    with patch('route_cache.time.time', return_value=300 * 6_000_000 + 650):
+        key = cache.key('Times Square', 'JFK Airport')
+        assert cache.get(key) is None
+        assert cache.get_last_known(key)[0].route_id == 'earlier'
+        assert cache.get_last_known(cache.key('Times Square', 'JFK Airport', 'walking')) is None
+
+def failing_api() -> TransportAPI:
+    api = TransportAPI()
+    api.google_maps_api_key = 'test-key'
+    api._route_cache = make_cache(FakeClock())
+    def fail(*args):
+        raise DirectionsAPIError('HTTP 503', 'HTTP_503')
+    api._fetch_google_maps_routes = fail
+    return api
+
+def test_outage_fallback_after_bucket_rollover():
+    api = failing_api()
+    async_api = AsyncTransportAPI(api)
+    async_api._fetch_google_maps_routes = api._fetch_google_maps_routes
+    async def fetch_async():
+        return await async_api.get_google_maps_routes('Times Square', 'JFK Airport')
+    with patch('route_cache.time.time', return_value=300 * 6_000_000 + 250):
+        api.route_cache.put(api.route_cache.key('Times Square', 'JFK Airport'), routes('earlier'))
+    with patch('route_cache.time.time', return_value=300 * 6_000_000 + 650):
+        assert [route.route_id for route in api.get_google_maps_routes('Times Square', 'JFK Airport')] == ['earlier']
+        assert [route.route_id for route in asyncio.run(fetch_async())] == ['earlier']
+        merged = asyncio.run(async_api.get_multimodal_routes('Times Square', 'JFK Airport', ('transit',)))
+        assert [route.route_id for route in merged] == ['earlier']
+
+def test_concurrent_misses_share_one_fetch():
+    cache = make_cache(FakeClock())
+    key = cache.key('A', 'B')
+    calls, gate = [], threading.Event()
+    def fetch():
+        calls.append(1)
+        gate.wait(2)
+        return routes('1')
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_fetch(key, fetch))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    assert wait_for(lambda: len(calls) == 1)
+    gate.set()
+    for thread in threads:
+        thread.join(2)
+    assert len(calls) == 1 and len(results) == 4
+
+def test_lru_eviction():
+    cache = RouteCache(max_entries=2, clock=FakeClock())
+    for name in ('a', 'b', 'c'):
+        cache.put(cache.key(name, 'x'), routes(name))
+    assert len(cache) == 2 and cache.get_last_known(cache.key('a', 'x')) is None
@@ -0,0 +1,29 @@
+"""
+Checks for route_model: real-time measures parsed at ingestion.
+"""
+
+from route_model import MAX_DELAY_MINUTES, RouteBatch, TransportType, real_time_measures
+
+def test_delay_minutes_coerced():
+    assert real_time_measures({'delay_minutes': 2.6}) == (0, 3)
+    assert real_time_measures({'delay_minutes': '5'}) == (0, 5)
+    assert real_time_measures({'delay_minutes': 'soon'}) == (0, 0)
+    assert real_time_measures({'delay_minutes': float('nan')}) == (0, 0)
+    assert real_time_measures({'delay_minutes': -4}) == (0, 0)
+    assert real_time_measures({'delay_minutes': 10 ** 9}) == (0, MAX_DELAY_MINUTES)
+
+def test_crowding_level_names():
+    assert real_time_measures({'crowding_level': 'High'}) == (2, 0)
+    assert real_time_measures({'crowding_level': 'medium'}) == (1, 0)
+    assert real_time_measures({'crowding_level': 'Packed'}) == (0, 0)
+    assert real_time_measures(None) == (0, 0)
+
+def test_batch_accepts_fractional_and_text_delays():
+    batch = RouteBatch()
+    for info in ({'delay_minutes': 2.5, 'crowding_level': 'High'}, {'delay_minutes': '7'}):
+        batch.append_row('B1', 'Bus B1', TransportType.BUS, 'Downtown', '10:00', '10:20', '20 mins',
+                         real_time_info=info)
+    assert list(batch.delay_minutes) == [2, 7]
+    assert list(batch.crowding) == [2, 0]
+    batch.attach_real_time_info([{'delay_minutes': '12.4'}, {'delay_minutes': 10 ** 6}])
+    assert list(batch.delay_minutes) == [12, MAX_DELAY_MINUTES]
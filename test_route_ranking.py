@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Checks for route_ranking: the Python and NumPy scoring paths, duration
+parsing in the ranking, and find_best_routes ranking cached RouteBatch rows.
+"""
+
+import random
+
+from benchmarks.directions_fixture import make_directions_response
+from route_model import RouteBatch
+from route_ranking import RankingWeights, rank_batch, rank_routes
+from transport_api import TransportAPI, TransportRoute
+
+PREFERENCES = {'transport_types': ['subway', 'train'], 'cost': 'low'}
+
+def make_batch(count: int, seed: int = 0) -> RouteBatch:
+    rng = random.Random(seed)
+    data = make_directions_response(routes=count // 3 + 1, transit_steps=3, polyline_length=1, seed=seed)
+    batch = RouteBatch.from_directions(data).take(range(count))
+    batch.attach_real_time_info([
+        {'crowding_level': rng.choice(['Low', 'Medium', 'High']), 'delay_minutes': rng.choice([0, 0, 5, 10])}
+        for _ in range(count)
+    ])
+    return batch
+
+def route(route_id: str, duration: str, transport_type: str = 'bus', cost: str = None) -> TransportRoute:
+    return TransportRoute(route_id, f"Route {route_id}", transport_type, 'Downtown', '10:00', '11:00', duration, cost)
+
+def test_python_and_numpy_paths_agree():
+    for seed, count in ((0, 40), (1, 700), (2, 3000)):
+        batch = make_batch(count, seed)
+        for preferences in (PREFERENCES, {}, {'weights': {'transfers': 20, 'delay': 3}}):
+            for limit in (1, 5, None):
+                python = rank_batch(batch, preferences, limit, numpy_min_routes=count + 1)
+                vectorized = rank_batch(batch, preferences, limit, numpy_min_routes=0)
+                assert python == vectorized, (seed, preferences, limit)
+
+def test_multi_unit_durations_rank_in_full():
+    routes = [route('long', '1 hour 5 mins'), route('short', '50 mins'), route('mid', '1 hr'),
+              route('unknown', 'soon')]
+    ranked = [ranked.route_id for ranked in rank_routes(routes)]
+    # An unknown duration ranks like the slowest known one, keeping its original order on ties
+    assert ranked == ['short', 'mid', 'long', 'unknown']
+    batch = RouteBatch.from_routes(routes)
+    assert list(batch.duration_seconds[:3]) == [3900, 3000, 3600]
+    assert [batch.route_id[index] for index in rank_batch(batch)] == ranked
+
+def test_transfers_weight():
+    batch = RouteBatch.from_routes([route('changes', '30 mins'), route('direct', '33 mins')], transfers=[2, 0])
+    assert [batch.route_id[index] for index in rank_batch(batch)] == ['direct', 'changes']
+    weights = RankingWeights(transfers=0.0)
+    assert [batch.route_id[index] for index in rank_batch(batch, weights=weights)] == ['changes', 'direct']
+
+def test_find_best_routes_ranks_cached_batch_with_transfers():
+    api = TransportAPI()
+    api.google_maps_api_key = 'test-key'
+    api.gtfs_realtime_paths = []
+    api.gtfs_alerts_paths = []
+    def fetch(*args):
+        raise AssertionError('cached routes were fetched again')
+    api._fetch_google_maps_routes = fetch
+    api.real_time_fetcher = lambda route_id, transport_type, city: {'delay_minutes': 0}
+    routes = [route(f"R{index}", f"{30 + index} mins", 'subway') for index in range(8)]
+    cached = RouteBatch.from_routes(routes, transfers=[3, 0, 0, 2, 0, 0, 0, 0])
+    api.route_cache.put(api.route_cache.key('Times Square', 'JFK Airport'), cached)
+
+    best = api.find_best_routes('Times Square', 'JFK Airport', {'transport_types': ['subway']})
+    # R0 is the fastest but changes three times; the transfers weight ranks it below the direct routes
+    assert [found.route_id for found in best] == ['R1', 'R2', 'R4', 'R5', 'R6']
+    assert all(found.real_time_info == {'delay_minutes': 0, 'route_id': found.route_id} for found in best)
+    # Ranking works on a copy: the cached rows keep no real-time info
+    assert cached.real_time_info == [None] * 8
@@ -0,0 +1,121 @@
+"""
+Checks for service_alerts.AlertStore and the alert feeds behind
+TransportAPI.get_service_alerts, with a fixed clock and temporary feed files.
+"""
+
+import json
+import os
+import tempfile
+import time
+
+from benchmarks.gtfs_realtime_fixture import service_alert
+from service_alerts import AlertStore, ServiceAlert
+from transport_api import TransportAPI, parse_alert_feed_paths
+
+NOW = 1_800_000_000.0  # Fixed clock for the store checks
+
+def feed(*entities, incrementality: str = 'FULL_DATASET') -> dict:
+    return {'header': {'incrementality': incrementality}, 'entity': list(entities)}
+
+def ids(alerts) -> list:
+    return sorted(alert.alert_id for alert in alerts)
+
+def write_feed(directory: str, name: str, entities) -> str:
+    path = os.path.join(directory, name)
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump({'header': {'gtfsRealtimeVersion': '2.0', 'incrementality': 'FULL_DATASET'}, 'entity': entities},
+                  file)
+    return path
+
+def test_expired_alerts_evicted():
+    store = AlertStore()
+    store.upsert(ServiceAlert('soon', 'Delay', 'ends soon', routes=('B1',), end=NOW + 60))
+    store.upsert(ServiceAlert('later', 'Delay', 'ends later', routes=('B1',), end=NOW + 600))
+    store.upsert(ServiceAlert('open', 'Notice', 'no end', routes=('B1',)))
+    store.upsert(ServiceAlert('future', 'Notice', 'not started', routes=('B1',), start=NOW + 300))
+
+    assert ids(store.for_route('B1', now=NOW)) == ['later', 'open', 'soon']
+    assert store.evict_expired(NOW + 59) == 0
+    assert ids(store.for_route('B1', now=NOW + 120)) == ['later', 'open']
+    assert 'soon' not in store.alerts and len(store) == 3
+    assert ids(store.for_route('B1', now=NOW + 700)) == ['future', 'open']
+    # Evicted alerts leave no empty index entries behind
+    assert store.evict_expired(NOW + 10 ** 6) == 0 and len(store) == 2
+
+def test_updated_alert_keeps_its_new_window():
+    store = AlertStore()
+    store.upsert(ServiceAlert('works', 'Service Change', 'first', routes=('M1',), stops=('Central',), end=NOW + 60))
+    store.upsert(ServiceAlert('works', 'Service Change', 'extended', routes=('M2',), end=NOW + 3600))
+
+    # The first version's heap entry is stale and must not evict the extended alert
+    assert store.evict_expired(NOW + 120) == 0
+    assert [alert.message for alert in store.active(now=NOW + 120)] == ['extended']
+    assert store.for_route('M1', now=NOW) == [] and store.for_stop('Central', now=NOW) == []
+    assert store.evict_expired(NOW + 3600) == 1 and len(store) == 0
+
+def test_city_route_and_stop_indexes():
+    store = AlertStore(route_aliases={'B1': 'route-b1'})
+    store.upsert(ServiceAlert('nyc', 'Delay', 'nyc', city='New York', routes=('route-b1',), stops=('Main St',)))
+    store.upsert(ServiceAlert('lon', 'Delay', 'lon', city='London', routes=('route-b1',)))
+    store.upsert(ServiceAlert('all', 'Notice', 'all', routes=('M1',)))
+
+    assert ids(store.active('new york', now=NOW)) == ['all', 'nyc']
+    assert ids(store.active(now=NOW)) == ['all', 'lon', 'nyc']
+    assert [ids(alerts) for alerts in store.alerts_for_routes(['B1', 'M1', 'Z9'], 'London', now=NOW)] == [
+        ['lon'], ['all'], []]
+    assert ids(store.for_stop(' main  st ', now=NOW)) == ['nyc']
+    assert store.for_stop('Main St', city='London', now=NOW) == []
+
+def test_feed_updates_and_removals():
+    store = AlertStore()
+    first = service_alert('e1', ['B1'], [], None, None, text='Detour')
+    second = service_alert('e2', ['B2'], [], None, None, text='Closed')
+    stats = store.apply_feed(feed(first, second), source='agency')
+    assert (stats.changed, stats.unchanged) == (2, 0)
+    assert store.apply_feed(feed(first, second), source='agency').unchanged == 2
+
+    # A changed entity replaces its alert; one missing from a full dataset goes
+    changed = service_alert('e1', ['B3'], [], None, None, text='Detour moved')
+    stats = store.apply_feed(feed(changed), source='agency')
+    assert (stats.changed, stats.removed) == (1, 1)
+    assert store.for_route('B1', now=NOW) == [] and ids(store.for_route('B3', now=NOW)) == ['agency:e1']
+    assert store.for_route('B2', now=NOW) == []
+
+    # Another source's full dataset leaves these alerts alone; a deletion removes one
+    store.apply_feed(feed(service_alert('e1', ['B4'], [], None, None)), source='other')
+    assert ids(store.for_route('B3', now=NOW)) == ['agency:e1']
+    store.apply_feed(feed({'id': 'e1', 'isDeleted': True, 'alert': {}}, incrementality='DIFFERENTIAL'),
+                     source='agency')
+    assert store.for_route('B3', now=NOW) == [] and ids(store.active(now=NOW)) == ['other:e1']
+
+def test_feed_alert_with_several_periods():
+    store = AlertStore()
+    entity = service_alert('e1', ['B1'], [], None, None)
+    entity['alert']['activePeriod'] = [{'start': str(int(NOW)), 'end': str(int(NOW + 60))},
+                                       {'start': str(int(NOW + 3600)), 'end': str(int(NOW + 7200))}]
+    store.apply_feed(feed(entity), source='agency')
+    assert len(store) == 2
+    assert len(store.for_route('B1', now=NOW + 30)) == 1
+    assert store.for_route('B1', now=NOW + 600) == [] and len(store) == 1
+    assert len(store.for_route('B1', now=NOW + 4000)) == 1
+    # Dropping the entity removes the alert of every period
+    store.apply_feed(feed(), source='agency')
+    assert len(store) == 0
+
+def test_alert_feeds_per_city():
+    now = int(time.time())
+    with tempfile.TemporaryDirectory() as directory:
+        city_a = write_feed(directory, 'a.json', [service_alert('a1', ['A1'], [], now - 60, now + 3600, text='A delay')])
+        city_b = write_feed(directory, 'b.json', [service_alert('b1', ['B1'], [], now - 60, now + 3600, text='B delay')])
+        everywhere = write_feed(directory, 'all.json', [service_alert('x1', ['X1'], [], None, None, text='Strike')])
+        api = TransportAPI(gtfs_alerts_paths=[(city_a, 'A'), (city_b, 'B'), everywhere])
+        api.gtfs_feed_path = None
+
+        assert sorted(alert['message'] for alert in api.get_service_alerts('A')) == ['A delay', 'Strike']
+        assert sorted(alert['message'] for alert in api.get_service_alerts('b')) == ['B delay', 'Strike']
+        assert len(api.get_service_alerts()) == 3
+        assert [alert['city'] for alert in api.get_service_alerts('A') if alert['message'] == 'A delay'] == ['A']
+
+def test_alert_feed_paths_from_environment():
+    value = os.pathsep.join(['New York=/feeds/nyc.pb', '/feeds/all.pb', ''])
+    assert parse_alert_feed_paths(value) == [('/feeds/nyc.pb', 'New York'), '/feeds/all.pb']
@@ -4,36 +4,20 @@ Test script for TravelBuddy simplification feature
 This script demonstrates how to use the prompts to simplify complex tourist information
 """
 
-import os
+import argparse
 import sys
-from dotenv import load_dotenv
-import google.generativeai as genai
+import time
+from llm_client import create_client
+from llm_cassette import create_cassette_client
 from prompts import (
+    resolve_content_type,
     get_simplification_prompt,
-    get_public_transport_simplification_prompt,
-    get_museum_exhibit_simplification_prompt,
-    get_restaurant_menu_simplification_prompt,
-    get_cultural_customs_simplification_prompt,
-    get_emergency_safety_simplification_prompt,
-    get_currency_exchange_simplification_prompt,
-    get_quality_improvement_prompt,
-    get_validation_prompt
+    get_quality_improvement_prompt
 )
-
-# Load environment variables
-load_dotenv()
-
-def setup_gemini():
-    """Setup Gemini API with the API key from environment variables"""
-    api_key = os.getenv('GEMINI_API_KEY')
-    if not api_key:
-        print("❌ Error: GEMINI_API_KEY not found in environment variables")
-        print("Please add your Gemini API key to the .env file")
-        print("Example: GEMINI_API_KEY=your_api_key_here")
-        sys.exit(1)
-    
-    genai.configure(api_key=api_key)
-    return genai
+from result_cache import SimplificationCache, get_simplification_cache
+from text_compaction import compact_text
+from simplifier import DATA_FILE_CONTENT_TYPES, DATA_DIR, stream_simplify_sync
+from validator import validate_simplification
 
 def read_file_content(file_path):
     """Read content from a file"""
@@ -47,23 +31,28 @@ def read_file_content(file_path):
         print(f"❌ Error reading file {file_path}: {e}")
         return None
 
-def test_simplification(model, complex_text, prompt_function, test_name):
-    """Test simplification with a specific prompt function"""
+def test_simplification(client, complex_text, content_type, test_name, cache=None):
+    """Test simplification for a specific content type"""
     print(f"\n{'='*60}")
     print(f"🧪 TESTING: {test_name}")
     print(f"{'='*60}")
     
     # Get the prompt
-    prompt = prompt_function(complex_text)
+    prompt = get_simplification_prompt(complex_text, content_type)
     
     print(f"📝 Original text length: {len(complex_text)} characters")
     print(f"📋 Prompt length: {len(prompt)} characters")
     
     try:
-        # Generate simplified version
+        # Generate simplified version, reusing a cached result for repeated text
         print("\n🔄 Generating simplified version...")
-        response = model.generate_content(prompt)
-        simplified_text = response.text
+        cache = cache or get_simplification_cache()
+        simplified_text = cache.get(complex_text, content_type, client.model_name)
+        if simplified_text is not None:
+            print("⚡ Served from cache")
+        else:
+            simplified_text = client.generate_sync(prompt)
+            cache.set(complex_text, content_type, client.model_name, simplified_text)
         
         print(f"✅ Simplified text length: {len(simplified_text)} characters")
         print(f"📊 Reduction: {((len(complex_text) - len(simplified_text)) / len(complex_text) * 100):.1f}%")
@@ -79,19 +68,21 @@ def test_simplification(model, complex_text, prompt_function, test_name):
         print(f"❌ Error during simplification: {e}")
         return None
 
-def test_quality_improvement(model, original_text, simplified_text, test_name):
-    """Test quality improvement of simplified text"""
+def test_quality_improvement(client, original_text, simplified_text, test_name, report=None):
+    """Test quality improvement of simplified text, fixing the validator's issues when given"""
     print(f"\n{'='*60}")
     print(f"🔍 QUALITY CHECK: {test_name}")
     print(f"{'='*60}")
     
     try:
         # Get quality improvement prompt
-        prompt = get_quality_improvement_prompt(simplified_text, original_text)
+        if report is not None:
+            prompt = get_quality_improvement_prompt(simplified_text, original_text, report.messages(), report.word_limit)
+        else:
+            prompt = get_quality_improvement_prompt(simplified_text, original_text)
         
         print("🔄 Checking quality and improving...")
-        response = model.generate_content(prompt)
-        improved_text = response.text
+        improved_text = client.generate_sync(prompt)
         
         print(f"✅ Quality check complete!")
         print(f"\n📖 IMPROVED RESULT:")
@@ -104,67 +95,61 @@ def test_quality_improvement(model, original_text, simplified_text, test_name):
         print(f"❌ Error during quality check: {e}")
         return None
 
-def test_validation(model, original_text, simplified_text, test_name):
-    """Test validation of simplified text"""
+def test_validation(original_text, simplified_text, content_type, test_name):
+    """Test validation of simplified text with the local validator (no model call)"""
     print(f"\n{'='*60}")
     print(f"✅ VALIDATION: {test_name}")
     print(f"{'='*60}")
     
-    try:
-        # Get validation prompt
-        prompt = get_validation_prompt(original_text, simplified_text)
-        
-        print("🔄 Validating simplified text...")
-        response = model.generate_content(prompt)
-        validation_result = response.text
-        
-        print(f"✅ Validation complete!")
-        print(f"\n📋 VALIDATION RESULT:")
-        print(f"{'-'*40}")
-        print(validation_result)
-        
-        return validation_result
-        
-    except Exception as e:
-        print(f"❌ Error during validation: {e}")
-        return None
+    start = time.perf_counter()
+    report = validate_simplification(original_text, simplified_text, content_type)
+    elapsed = time.perf_counter() - start
+    
+    print(f"✅ Validation complete in {elapsed * 1e6:.0f}µs")
+    print(f"\n📋 VALIDATION RESULT:")
+    print(f"{'-'*40}")
+    print(report)
+    
+    return report
 
-def run_comprehensive_test():
+def run_comprehensive_test(client=None, cache=None):
     """Run comprehensive tests with all data files"""
     print("🚀 TRAVELBUDDY SIMPLIFICATION TEST SUITE")
     print("=" * 60)
+    start_time = time.perf_counter()
     
     # Setup Gemini
-    print("🔧 Setting up Gemini API...")
-    genai_client = setup_gemini()
-    model = genai.GenerativeModel('gemini-2.0-flash-exp')
-    print("✅ Gemini API configured successfully!")
+    if client is None:
+        print("🔧 Setting up Gemini API...")
+        client = create_client()
+        print("✅ Gemini API configured successfully!")
+    cache = cache or get_simplification_cache()
     
     # Test data files
     test_cases = [
         {
             'raw_file': 'data/raw_tourist_texts/public_transport_instructions.txt',
-            'prompt_function': get_public_transport_simplification_prompt,
+            'content_type': 'public_transport',
             'name': 'Public Transport Instructions'
         },
         {
             'raw_file': 'data/raw_tourist_texts/museum_exhibit_descriptions.txt',
-            'prompt_function': get_museum_exhibit_simplification_prompt,
+            'content_type': 'museum_exhibit',
             'name': 'Museum Exhibit Descriptions'
         },
         {
             'raw_file': 'data/raw_tourist_texts/restaurant_menus.txt',
-            'prompt_function': get_restaurant_menu_simplification_prompt,
+            'content_type': 'restaurant_menu',
             'name': 'Restaurant Menus'
         },
         {
             'raw_file': 'data/raw_tourist_texts/local_laws_customs.txt',
-            'prompt_function': get_cultural_customs_simplification_prompt,
+            'content_type': 'cultural_customs',
             'name': 'Local Laws and Customs'
         },
         {
             'raw_file': 'data/raw_tourist_texts/emergency_contact_safety.txt',
-            'prompt_function': get_emergency_safety_simplification_prompt,
+            'content_type': 'emergency_safety',
             'name': 'Emergency Contact and Safety'
         }
     ]
@@ -185,35 +170,38 @@ def run_comprehensive_test():
         
         # Test simplification
         simplified_text = test_simplification(
-            model, 
+            client, 
             raw_text, 
-            test_case['prompt_function'], 
-            test_case['name']
+            test_case['content_type'], 
+            test_case['name'],
+            cache
         )
         
         if simplified_text:
-            # Test quality improvement
-            improved_text = test_quality_improvement(
-                model,
-                raw_text,
-                simplified_text,
-                test_case['name']
-            )
-            
-            # Test validation
+            # Validate locally; only ask the model to improve a failing result
             validation_result = test_validation(
-                model,
                 raw_text,
                 simplified_text,
+                test_case['content_type'],
                 test_case['name']
             )
             
+            improved_text = None
+            if not validation_result.passed:
+                improved_text = test_quality_improvement(
+                    client,
+                    raw_text,
+                    simplified_text,
+                    test_case['name'],
+                    validation_result
+                )
+            
             results.append({
                 'name': test_case['name'],
                 'raw_length': len(raw_text),
                 'simplified_length': len(simplified_text),
                 'reduction_percent': ((len(raw_text) - len(simplified_text)) / len(raw_text) * 100),
-                'success': True
+                'success': validation_result.passed or improved_text is not None
             })
         else:
             results.append({
@@ -243,6 +231,12 @@ def run_comprehensive_test():
         print(f"\n❌ FAILED TESTS:")
         for result in failed_tests:
             print(f"  • {result['name']}")
+    
+    cache_stats = cache.stats
+    print(f"\n⚡ CACHE: {cache_stats.hits} hits, {cache_stats.misses} misses ({cache_stats.hit_rate * 100:.0f}% hit rate)")
+    print(f"⏱️ Total time: {time.perf_counter() - start_time:.2f}s")
+    
+    return results
 
 def run_single_test():
     """Run a single test with user input"""
@@ -251,8 +245,7 @@ def run_single_test():
     
     # Setup Gemini
     print("🔧 Setting up Gemini API...")
-    genai_client = setup_gemini()
-    model = genai.GenerativeModel('gemini-pro')
+    client = create_client(model_name='gemini-pro')
     print("✅ Gemini API configured successfully!")
     
     # Get user input
@@ -276,6 +269,7 @@ def run_single_test():
     
     # Choose prompt type
     print("\n🎯 Choose simplification type:")
+    print("0. Auto-detect")
     print("1. General simplification")
     print("2. Public transport")
     print("3. Museum exhibits")
@@ -283,35 +277,117 @@ def run_single_test():
     print("5. Cultural customs")
     print("6. Emergency safety")
     
-    choice = input("Enter choice (1-6): ").strip()
+    choice = input("Enter choice (0-6, Enter to auto-detect): ").strip() or '0'
     
-    prompt_functions = {
-        '1': get_simplification_prompt,
-        '2': get_public_transport_simplification_prompt,
-        '3': get_museum_exhibit_simplification_prompt,
-        '4': get_restaurant_menu_simplification_prompt,
-        '5': get_cultural_customs_simplification_prompt,
-        '6': get_emergency_safety_simplification_prompt
+    content_types = {
+        '0': 'auto',
+        '1': 'general',
+        '2': 'public_transport',
+        '3': 'museum_exhibit',
+        '4': 'restaurant_menu',
+        '5': 'cultural_customs',
+        '6': 'emergency_safety'
     }
     
-    if choice not in prompt_functions:
-        print("❌ Invalid choice. Using general simplification.")
-        choice = '1'
+    if choice not in content_types:
+        print("❌ Invalid choice. Auto-detecting the content type.")
+        choice = '0'
     
-    prompt_function = prompt_functions[choice]
+    content_type = resolve_content_type(complex_text, content_types[choice])
+    if choice == '0':
+        print(f"🔎 Detected content type: {content_type}")
     test_name = f"Custom {choice}"
     
     # Test simplification
-    simplified_text = test_simplification(model, complex_text, prompt_function, test_name)
+    simplified_text = test_simplification(client, complex_text, content_type, test_name)
     
     if simplified_text:
+        report = test_validation(complex_text, simplified_text, content_type, test_name)
+        
         # Ask if user wants quality improvement
         improve = input("\n🔍 Would you like to run quality improvement? (y/n): ").lower().strip()
         if improve == 'y':
-            test_quality_improvement(model, complex_text, simplified_text, test_name)
+            test_quality_improvement(client, complex_text, simplified_text, test_name, report)
+
+def check_streaming(client, complex_text, content_type, test_name):
+    """Test that streamed simplification matches the non-streamed result"""
+    print(f"\n{'='*60}")
+    print(f"📡 STREAMING: {test_name}")
+    print(f"{'='*60}")
+    
+    try:
+        chunks = []
+        stats = None
+        for event in stream_simplify_sync(client, complex_text, content_type):
+            if event['type'] == 'chunk':
+                chunks.append(event['text'])
+            else:
+                stats = event
+        
+        streamed_text = ''.join(chunks)
+        compacted_text = compact_text(complex_text).text
+        expected_text = client.generate_sync(get_simplification_prompt(compacted_text, content_type))
+        
+        checks = {
+            'streamed text matches full response': streamed_text == expected_text,
+            'stats sent once, after all chunks': stats is not None and stats['chunks'] == len(chunks),
+            'incremental length matches final text': stats is not None and stats['simplifiedLength'] == len(streamed_text)
+        }
+        for check, passed in checks.items():
+            print(f"{'✅' if passed else '❌'} {check}")
+        
+        if stats:
+            print(f"⏱️ First chunk after {stats['firstChunkSeconds']:.3f}s, "
+                  f"{stats['chunks']} chunks in {stats['totalSeconds']:.3f}s")
+        return all(checks.values())
+        
+    except Exception as e:
+        print(f"❌ Error during streaming: {e}")
+        return False
+
+def run_streaming_test():
+    """Check streamed simplification for every data file with the fake backend"""
+    print("📡 TRAVELBUDDY STREAMING TEST")
+    print("=" * 60)
+    
+    client = create_client('fake')
+    failures = 0
+    for file_name, content_type in DATA_FILE_CONTENT_TYPES.items():
+        raw_text = read_file_content(f"{DATA_DIR}/{file_name}")
+        if raw_text and not check_streaming(client, raw_text, content_type, file_name):
+            failures += 1
+    
+    print(f"\n{'✅ All streaming checks passed' if not failures else f'❌ {failures} streaming tests failed'}")
+    if failures:
+        sys.exit(1)
+
+def run_cassette_test(cassette_path, mode):
+    """Run the comprehensive test recording to, or replaying from, a cassette"""
+    print(f"📼 Cassette {mode}: {cassette_path}")
+    client = create_cassette_client(cassette_path, mode)
+    
+    # A fresh in-memory cache, so every model call reaches the cassette
+    results = run_comprehensive_test(client, SimplificationCache(disk_path=None))
+    
+    if not results or not all(r['success'] for r in results):
+        sys.exit(1)
 
 def main():
     """Main function"""
+    parser = argparse.ArgumentParser(description='TravelBuddy simplification tester')
+    parser.add_argument('--record', type=str, metavar='CASSETTE', help='Run the comprehensive test and record model calls')
+    parser.add_argument('--replay', type=str, metavar='CASSETTE', help='Run the comprehensive test from recorded model calls')
+    parser.add_argument('--stream', action='store_true', help='Check streamed simplification offline with the fake backend')
+    args = parser.parse_args()
+    
+    if args.stream:
+        run_streaming_test()
+        return
+    
+    if args.record or args.replay:
+        run_cassette_test(args.record or args.replay, 'record' if args.record else 'replay')
+        return
+    
     print("🚀 TRAVELBUDDY SIMPLIFICATION TESTER")
     print("=" * 50)
     
@@ -0,0 +1,55 @@
+"""
+Checks for simplifier: streamed output and model calls counted by the pipeline.
+"""
+
+import asyncio
+
+from llm_client import FakeBackend, LLMClient
+from result_cache import SimplificationCache
+from simplifier import load_data_files, run_pipelines, simplify, stream_simplify
+from text_compaction import compact_text
+
+async def collect(events):
+    return [event async for event in events]
+
+def test_stream_matches_simplify():
+    client = LLMClient(FakeBackend(latency=0, chunk_interval=0, chunk_words=3))
+    for item in load_data_files():
+        events = asyncio.run(collect(stream_simplify(client, item['text'], item['type'])))
+        chunks = [event['text'] for event in events[:-1]]
+        assert all(event['type'] == 'chunk' for event in events[:-1]) and len(chunks) > 1
+        streamed = ''.join(chunks)
+        compaction = compact_text(item['text'])
+        assert streamed == asyncio.run(simplify(client, compaction.text, item['type'])), item['name']
+
+        stats = events[-1]
+        assert stats['type'] == 'stats'
+        assert stats['chunks'] == len(chunks)
+        assert stats['originalLength'] == len(item['text'])
+        assert stats['simplifiedLength'] == len(streamed)
+        assert (stats['tokensBefore'], stats['tokensAfter']) == (compaction.tokens_before, compaction.tokens_after)
+        assert stats['firstChunkSeconds'] <= stats['totalSeconds']
+
+def test_cached_stream_is_one_chunk():
+    client = LLMClient(FakeBackend(latency=0, chunk_interval=0))
+    cache = SimplificationCache(disk_path=None)
+    item = load_data_files()[0]
+    first = asyncio.run(collect(stream_simplify(client, item['text'], item['type'], cache)))
+    second = asyncio.run(collect(stream_simplify(client, item['text'], item['type'], cache)))
+    assert second[0]['text'] == ''.join(event['text'] for event in first[:-1])
+    assert len(second) == 2 and second[1]['chunks'] == 1
+
+def test_model_calls_match_backend_calls():
+    backend = FakeBackend(latency=0)
+    client = LLMClient(backend)
+    cache = SimplificationCache(disk_path=None)
+    items = load_data_files()
+
+    results = asyncio.run(run_pipelines(client, items, cache))
+    assert sum(result['model_calls'] for result in results) == backend.calls
+
+    # Every simplification is now cached; only improvements reach the model
+    calls = backend.calls
+    results = asyncio.run(run_pipelines(client, items, cache))
+    improved = sum(result['improved_text'] is not None for result in results)
+    assert sum(result['model_calls'] for result in results) == backend.calls - calls == improved
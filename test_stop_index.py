@@ -0,0 +1,96 @@
+"""
+Checks for stop_index.StopIndex against haversine scans, on both the
+Python and NumPy distance paths, and for TransportAPI.get_nearby_stops.
+"""
+
+import os
+import random
+import tempfile
+from unittest.mock import patch
+
+from benchmarks.gtfs_fixture import make_gtfs_feed
+from gtfs_timetable import GTFSTimetable, JourneyPlanner
+from stop_index import StopIndex, haversine_km
+from transport_api import TransportAPI
+
+CENTER = (40.75, -73.98)
+
+def make_stops(count: int, seed: int = 0) -> tuple:
+    rng = random.Random(seed)
+    latitudes = [CENTER[0] + rng.uniform(-0.1, 0.1) for _ in range(count)]
+    longitudes = [CENTER[1] + rng.uniform(-0.13, 0.13) for _ in range(count)]
+    return latitudes, longitudes
+
+def scan(latitudes, longitudes, latitude: float, longitude: float):
+    distances = [(stop, haversine_km(latitude, longitude, stop_latitude, stop_longitude))
+                 for stop, (stop_latitude, stop_longitude) in enumerate(zip(latitudes, longitudes))]
+    return sorted(distances, key=lambda item: item[1])
+
+def both_paths(check):
+    # Every candidate set on the Python path, then every one on the NumPy path
+    for threshold in (10 ** 9, 0):
+        with patch('stop_index.NUMPY_MIN_CANDIDATES', threshold):
+            check()
+
+def test_radius_boundaries():
+    latitudes, longitudes = make_stops(500)
+    index = StopIndex(latitudes, longitudes, cell_km=0.5)
+    rng = random.Random(1)
+    def check():
+        for _ in range(30):
+            latitude, longitude = CENTER[0] + rng.uniform(-0.05, 0.05), CENTER[1] + rng.uniform(-0.05, 0.05)
+            expected = scan(latitudes, longitudes, latitude, longitude)
+            for radius in (0.3, 1.0, 2.5):
+                found = index.within(latitude, longitude, radius)
+                assert [stop for stop, _ in found] == [stop for stop, distance in expected if distance <= radius]
+                assert all(abs(distance - haversine_km(latitude, longitude, latitudes[stop], longitudes[stop])) < 1e-6
+                           for stop, distance in found)
+            # A radius just past or just short of a stop's distance includes or excludes it
+            stop, distance = expected[10]
+            assert stop in {found for found, _ in index.within(latitude, longitude, distance + 1e-6)}
+            assert stop not in {found for found, _ in index.within(latitude, longitude, distance - 1e-6)}
+        assert index.within(*CENTER, -1) == []
+    both_paths(check)
+
+def test_nearest_matches_scan():
+    latitudes, longitudes = make_stops(800, seed=2)
+    index = StopIndex(latitudes, longitudes, cell_km=0.5)
+    rng = random.Random(3)
+    def check():
+        for _ in range(30):
+            # Some points lie well outside the stops, so the search radius has to grow
+            latitude, longitude = CENTER[0] + rng.uniform(-0.3, 0.3), CENTER[1] + rng.uniform(-0.3, 0.3)
+            expected = scan(latitudes, longitudes, latitude, longitude)
+            for k in (1, 5, 20):
+                found = index.nearest(latitude, longitude, k)
+                assert [stop for stop, _ in found] == [stop for stop, _ in expected[:k]]
+                assert [distance for _, distance in found] == sorted(distance for _, distance in found)
+        assert index.nearest(*CENTER, 0) == []
+        assert len(index.nearest(*CENTER, 2000)) == 800
+        assert index.nearest(*CENTER, 5, max_radius_km=0.0001) == []
+    both_paths(check)
+
+def test_empty_index():
+    index = StopIndex([], [])
+    assert len(index) == 0
+    assert index.within(*CENTER, 5) == []
+    assert index.nearest(*CENTER, 3) == []
+
+def test_get_nearby_stops_respects_radius_and_limit():
+    with tempfile.TemporaryDirectory() as directory:
+        feed_path = os.path.join(directory, 'grid.zip')
+        make_gtfs_feed(feed_path, grid=12)
+        timetable = GTFSTimetable.from_zip(feed_path)
+    api = TransportAPI()
+    api._journey_planner = JourneyPlanner(timetable)
+    # Stop S5-5; grid stops are about 550 m apart
+    latitude, longitude = 40.70 + 5 * 0.005, -74.02 + 5 * 0.0065
+    expected = [(stop, distance) for stop, distance in scan(timetable.stop_lat, timetable.stop_lon, latitude, longitude)
+                if distance <= 1.2]
+
+    stops = api.get_nearby_stops(latitude, longitude, radius_km=1.2)
+    assert [stop['stop_id'] for stop in stops] == [timetable.stop_ids[stop] for stop, _ in expected]
+    assert stops[0]['stop_id'] == 'S5-5' and all(stop['distance_km'] <= 1.2 for stop in stops)
+    limited = api.get_nearby_stops(latitude, longitude, radius_km=1.2, limit=3)
+    assert limited == stops[:3]
+    assert api.get_nearby_stops(latitude, longitude, radius_km=0.1) == stops[:1]
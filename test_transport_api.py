@@ -0,0 +1,45 @@
+"""
+Checks for TransportAPI real-time lookups, offline (mock routes, no API key).
+"""
+
+from route_model import RouteBatch
+from transport_api import TransportAPI
+
+def offline_api(**kwargs) -> TransportAPI:
+    api = TransportAPI(**kwargs)
+    api.google_maps_api_key = None
+    api.gtfs_feed_path = None
+    api.gtfs_realtime_paths = []
+    api.gtfs_alerts_paths = []
+    return api
+
+def test_fetcher_payload_normalized():
+    calls = []
+    def fetcher(route_id, transport_type, city):
+        calls.append((route_id, city))
+        return {'status': 'Delayed', 'delay_minutes': 2.5 if route_id == '101' else '7', 'crowding_level': 'HIGH '}
+
+    api = offline_api(real_time_fetcher=fetcher)
+    routes = api.find_best_routes('Times Square', 'JFK Airport', {'transport_types': ['subway'], 'cost': 'low'},
+                                  city='New York')
+    assert routes and all(city == 'New York' for _, city in calls)
+    for route in routes:
+        info = route.real_time_info
+        assert isinstance(info['delay_minutes'], int) and info['crowding_level'] == 'High'
+        assert info['route_id'] == route.route_id
+    # The normalized info goes into the numeric columns without a TypeError
+    batch = RouteBatch.from_routes(routes)
+    assert sorted(batch.delay_minutes) == sorted(route.real_time_info['delay_minutes'] for route in routes)
+
+def test_fetcher_bad_payloads():
+    api = offline_api(real_time_fetcher=lambda *key: {'delay_minutes': 'soon', 'crowding_level': 'Packed'})
+    info = api.get_real_time_info('101', 'bus', 'New York')
+    assert info['delay_minutes'] == 0 and 'crowding_level' not in info
+    api = offline_api(real_time_fetcher=lambda *key: None)
+    assert api.get_real_time_info('101', 'bus')['real_time_available'] is False
+
+def test_batch_dedupes_keys():
+    calls = []
+    api = offline_api(real_time_fetcher=lambda route_id, transport_type, city: calls.append(route_id) or {})
+    infos = api.get_real_time_info_batch([('1', 'bus'), ('2', 'bus'), ('1', 'bus')], 'Paris')
+    assert sorted(calls) == ['1', '2'] and set(infos) == {('1', 'bus'), ('2', 'bus')}
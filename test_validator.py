@@ -0,0 +1,22 @@
+"""
+Checks for validator: prices written with symbols or currency codes compare by amount and currency.
+"""
+
+from validator import extract_entities, validate_simplification
+
+def _price_issues(original: str, simplified: str):
+    report = validate_simplification(original, simplified)
+    return [message for message in report.messages() if 'price' in message]
+
+def test_symbol_and_code_prices_normalize_alike():
+    assert extract_entities('A ticket costs 2.50 USD.')['prices'] == {'2.50 USD'}
+    assert extract_entities('Tickets: $2.5, €1,200 or 3 euros')['prices'] == {'2.50 USD', '1200.00 EUR', '3.00 EUR'}
+
+def test_currency_code_simplified_to_symbol_is_kept():
+    assert _price_issues('A single ticket costs 2.50 USD on the bus.', '🎫 Ticket: $2.50') == []
+
+def test_changed_amount_or_currency_is_flagged():
+    issues = _price_issues('A single ticket costs 2.50 USD on the bus.', '🎫 Ticket: €2.50')
+    assert issues == ['Lost every price from the original (e.g. 2.50 USD)',
+                      'Introduced a price not in the original: 2.50 EUR']
+    assert len(_price_issues('A single ticket costs 2.50 USD on the bus.', '🎫 Ticket: $3.50')) == 2
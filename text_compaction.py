@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# text_compaction.py
+# Input compaction and token budgeting before prompt construction
+
+import argparse
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from chunking import is_section_header
+from prompts import PROMPT_CONFIGS, get_simplification_prompt
+
+_INLINE_WHITESPACE = re.compile(r'[ \t ]+')
+_BLANK_LINES = re.compile(r'\n{3,}')
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+(?=[A-Z0-9"“(])')
+_TOKEN_PIECES = re.compile(r'\w+|[^\w\s]')
+_WHITESPACE_RUNS = re.compile(r'\s{2,}')
+_NON_WORD = re.compile(r'[\W_]+')
+
+# Whole lines that are web-page furniture rather than tourist information
+BOILERPLATE_PATTERNS = [
+    re.compile(pattern, re.I) for pattern in (
+        r'^(click|tap) here\b.*$',
+        r'^read more\.?$',
+        r'^(share|share this|print|email)( page| article)?:?$',
+        r'^(advertisement|sponsored)$',
+        r'^(subscribe|sign up)( to| for)? (our )?newsletter.*$',
+        r'^.*\b(uses|use) cookies\b.*$',
+        r'^(©|\(c\)|copyright)\s.*$',
+        r'^all rights reserved\.?$',
+        r'^(back to top|skip to (main )?content)$',
+    )
+]
+
+@dataclass
+class CompactionResult:
+    """Compacted text with before/after token estimates"""
+    text: str
+    tokens_before: int
+    tokens_after: int
+    duplicate_sentences: int = 0
+    boilerplate_lines: int = 0
+    truncated: bool = False
+    
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+    
+    def to_dict(self) -> Dict:
+        return {
+            'tokensBefore': self.tokens_before,
+            'tokensAfter': self.tokens_after,
+            'tokensSaved': self.tokens_saved,
+            'duplicateSentences': self.duplicate_sentences,
+            'boilerplateLines': self.boilerplate_lines,
+            'truncated': self.truncated
+        }
+
+def estimate_tokens(text: str) -> int:
+    """
+    Fast local token estimate.
+    
+    Counts words and punctuation, charging long words one extra token per
+    six characters and runs of whitespace (indentation, blank lines) one
+    token per eight characters. That tracks subword tokenizers closely
+    enough for budgeting without loading one.
+    """
+    tokens = 0
+    for piece in _TOKEN_PIECES.findall(text):
+        tokens += 1 + (len(piece) - 1) // 6
+    for run in _WHITESPACE_RUNS.findall(text):
+        tokens += 1 + (len(run) - 1) // 8
+    return tokens
+
+def normalize_whitespace(text: str) -> str:
+    """Strip indentation and runs of spaces, keeping line and paragraph breaks."""
+    lines = [_INLINE_WHITESPACE.sub(' ', line).strip() for line in text.splitlines()]
+    return _BLANK_LINES.sub('\n\n', '\n'.join(lines)).strip()
+
+def remove_boilerplate(text: str) -> tuple:
+    """Drop boilerplate lines; returns (text, lines removed)."""
+    kept = []
+    removed = 0
+    for line in text.split('\n'):
+        if line and any(pattern.match(line) for pattern in BOILERPLATE_PATTERNS):
+            removed += 1
+        else:
+            kept.append(line)
+    return _BLANK_LINES.sub('\n\n', '\n'.join(kept)).strip(), removed
+
+def remove_duplicate_sentences(text: str) -> tuple:
+    """
+    Drop sentences already seen earlier in the same section; returns (text, sentences removed).
+    
+    Each section header starts a fresh scope, because sections are
+    simplified independently and a repeat across sections ("Dial 112 for
+    all emergencies.") is real information for each of them.
+    """
+    seen = set()
+    removed = 0
+    lines = []
+    for line in text.split('\n'):
+        if is_section_header(line):
+            seen = set()
+        kept = []
+        for sentence in _SENTENCE_END.split(line):
+            key = _NON_WORD.sub(' ', sentence.lower()).strip()
+            # Short fragments ("Dessert:", "Yes.") repeat legitimately
+            if len(key.split()) >= 4 and key in seen:
+                removed += 1
+                continue
+            seen.add(key)
+            kept.append(sentence)
+        if kept or not line:
+            lines.append(' '.join(kept))
+    return '\n'.join(lines), removed
+
+def truncate_to_budget(text: str, token_budget: int) -> tuple:
+    """
+    Cut text to a token budget at sentence boundaries; returns (text, truncated).
+    
+    Section headers are kept first. Sentences are then taken breadth-first
+    across sections, preferring ones that carry numbers (prices, times,
+    phone numbers). Whatever is kept is emitted in its original order.
+    """
+    if estimate_tokens(text) <= token_budget:
+        return text, False
+    
+    # Rank sentences within each section (number-bearing ones first), then
+    # take rank 0 of every section before rank 1 of any, so a tight budget
+    # still covers every section instead of only the first few
+    units = []
+    sections: List[List[int]] = [[]]
+    for line_number, line in enumerate(text.split('\n')):
+        for sentence in _SENTENCE_END.split(line) if line else ['']:
+            header = is_section_header(sentence)
+            if header:
+                sections.append([])
+            units.append((line_number, sentence, header))
+            if not header:
+                sections[-1].append(len(units) - 1)
+    
+    rank = {}
+    for members in sections:
+        ordered = sorted(members, key=lambda i: (not any(c.isdigit() for c in units[i][1]), i))
+        for position, i in enumerate(ordered):
+            rank[i] = position
+    
+    order = sorted(range(len(units)), key=lambda i: (not units[i][2], rank.get(i, 0), i))
+    keep = set()
+    used = 0
+    for i in order:
+        # One extra token per unit covers the line and paragraph breaks between them
+        cost = estimate_tokens(units[i][1]) + 1
+        if used + cost <= token_budget:
+            keep.add(i)
+            used += cost
+    
+    lines: Dict[int, List[str]] = {}
+    for i, (line_number, sentence, _) in enumerate(units):
+        if i in keep:
+            lines.setdefault(line_number, []).append(sentence)
+    truncated = '\n'.join(' '.join(sentences) for _, sentences in sorted(lines.items()))
+    return _BLANK_LINES.sub('\n\n', truncated).strip(), True
+
+def compact_text(text: str, token_budget: Optional[int] = None, boilerplate: bool = True,
+                 dedupe: bool = True) -> CompactionResult:
+    """
+    Compact text before it goes into a prompt.
+    
+    Args:
+        text: Raw input text
+        token_budget: Optional hard cap on the estimated tokens of the result
+        boilerplate: Drop web boilerplate lines
+        dedupe: Drop repeated sentences
+    
+    Returns:
+        CompactionResult with the compacted text and token counts
+    """
+    tokens_before = estimate_tokens(text)
+    compacted = normalize_whitespace(text)
+    
+    boilerplate_lines = 0
+    if boilerplate:
+        compacted, boilerplate_lines = remove_boilerplate(compacted)
+    
+    duplicate_sentences = 0
+    if dedupe:
+        compacted, duplicate_sentences = remove_duplicate_sentences(compacted)
+    
+    truncated = False
+    if token_budget is not None:
+        compacted, truncated = truncate_to_budget(compacted, token_budget)
+    
+    return CompactionResult(
+        text=compacted,
+        tokens_before=tokens_before,
+        tokens_after=estimate_tokens(compacted),
+        duplicate_sentences=duplicate_sentences,
+        boilerplate_lines=boilerplate_lines,
+        truncated=truncated
+    )
+
+def prompt_size_report(text: str, token_budget: Optional[int] = None) -> Dict[str, Dict[str, int]]:
+    """Estimated prompt tokens per content type, for the raw and the compacted text."""
+    compacted = compact_text(text, token_budget).text
+    return {
+        content_type: {
+            'raw_prompt_tokens': estimate_tokens(get_simplification_prompt(text, content_type)),
+            'compacted_prompt_tokens': estimate_tokens(get_simplification_prompt(compacted, content_type))
+        }
+        for content_type in PROMPT_CONFIGS
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Report token savings from input compaction')
+    parser.add_argument('files', nargs='+', help='Text files to compact')
+    parser.add_argument('--budget', type=int, help='Hard token budget for the compacted text')
+    parser.add_argument('--per-type', action='store_true', help='Also report prompt size per content type')
+    args = parser.parse_args()
+    
+    for path in args.files:
+        with open(path, 'r', encoding='utf-8') as file:
+            text = file.read()
+        result = compact_text(text, args.budget)
+        print(f"📄 {path}: {result.tokens_before} → {result.tokens_after} tokens "
+              f"(-{result.tokens_saved}, {result.duplicate_sentences} duplicate sentences, "
+              f"{result.boilerplate_lines} boilerplate lines{', truncated' if result.truncated else ''})")
+        if args.per_type:
+            for content_type, sizes in prompt_size_report(text, args.budget).items():
+                print(f"   {content_type:<18} prompt {sizes['raw_prompt_tokens']:>6} → {sizes['compacted_prompt_tokens']:>6} tokens")
+
+if __name__ == "__main__":
+    main()
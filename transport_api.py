@@ -2,19 +2,24 @@
 # Real-time transportation data integration for TravelBuddy
 
 import os
-import requests
+import threading
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
 from dataclasses import dataclass
-from geopy.geocoders import Nominatim
 import json
 
+from resilience import CircuitBreaker, CircuitOpenError
+
+# geopy and requests are imported on first use: together they take over
+# 100 ms to import, which short-lived scripts that never geocode or call
+# the Directions API should not pay for
+
 @dataclass
 class TransportRoute:
     """Data class for transport route information"""
     route_id: str
     route_name: str
-    transport_type: str  # 'bus', 'train', 'subway', 'tram'
+    transport_type: str  # 'bus', 'train', 'subway', 'tram', 'ferry', or 'walking', 'bicycling', 'driving'
     destination: str
     departure_time: str
     arrival_time: str
@@ -24,6 +29,36 @@ class TransportRoute:
     status: str = "On Time"
     real_time_info: Optional[Dict] = None
 
+class DirectionsAPIError(Exception):
+    """Raised when the Directions API answers with an error instead of routes"""
+    
+    def __init__(self, message: str, status: Optional[str] = None):
+        super().__init__(message)
+        self.status = status
+
+# Directions API statuses that describe the request, not an unhealthy service
+DIRECTIONS_REQUEST_ERRORS = frozenset({
+    'NOT_FOUND', 'ZERO_RESULTS', 'INVALID_REQUEST', 'MAX_WAYPOINTS_EXCEEDED', 'MAX_ROUTE_LENGTH_EXCEEDED'
+})
+
+def is_directions_outage(error: Exception) -> bool:
+    """Whether an error should count against the Directions circuit breaker"""
+    return not (isinstance(error, DirectionsAPIError) and error.status in DIRECTIONS_REQUEST_ERRORS)
+
+def parse_alert_feed_paths(value: str) -> List[Union[str, Tuple[str, str]]]:
+    """
+    $GTFS_ALERTS_PATH entries, joined with os.pathsep: "city=path" is a feed
+    for one city, a bare path a feed for every city.
+    """
+    entries = []
+    for entry in value.split(os.pathsep):
+        city, separator, path = entry.partition('=')
+        if separator and city.strip() and path:
+            entries.append((path, city.strip()))
+        elif entry:
+            entries.append(entry)
+    return entries
+
 @dataclass
 class Location:
     """Data class for location information"""
@@ -35,85 +70,299 @@ class Location:
 class TransportAPI:
     """Main class for handling real-time transportation data using Google Maps API"""
     
-    def __init__(self):
-        self.geolocator = Nominatim(user_agent="TravelBuddy")
-        self.session = requests.Session()
+    def __init__(self, connect_timeout: float = 3.05, read_timeout: float = 10.0,
+                 pool_maxsize: int = 20, max_retries: int = 2, backoff_factor: float = 0.25,
+                 failure_threshold: int = 5, recovery_timeout: float = 30.0,
+                 gtfs_feed_path: Optional[str] = None, gtfs_realtime_paths: Optional[List[str]] = None,
+                 gtfs_alerts_paths: Optional[List[Union[str, Tuple[str, str]]]] = None,
+                 real_time_fetcher: Optional[Callable[[str, str, Optional[str]], Dict]] = None):
+        """
+        Args:
+            connect_timeout: Seconds to wait for a connection to the Directions API
+            read_timeout: Seconds to wait between bytes of a response
+            pool_maxsize: Keep-alive connections kept per host, for concurrent callers
+            max_retries: Retries of connection errors, timeouts and 5xx responses
+            backoff_factor: Exponential backoff between retries (0, 2x, 4x ... seconds)
+            failure_threshold: Consecutive failed calls that open the circuit breaker
+            recovery_timeout: Seconds the circuit stays open before a probe call
+            gtfs_feed_path: GTFS static feed (zip) for offline journey planning; defaults to $GTFS_FEED_PATH
+            gtfs_realtime_paths: GTFS-Realtime TripUpdates/VehiclePositions files for get_real_time_info;
+                defaults to $GTFS_REALTIME_PATH (several joined with os.pathsep)
+            gtfs_alerts_paths: GTFS-Realtime Alerts files for get_service_alerts, as (path, city) pairs for
+                one city's feed or bare paths for feeds for every city; defaults to $GTFS_ALERTS_PATH
+                ("city=path" entries, see parse_alert_feed_paths)
+            real_time_fetcher: Calls a city transit API as (route_id, transport_type, city) -> real-time info,
+                for when there is no GTFS-Realtime feed; batch lookups call it concurrently
+        """
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.real_time_fetcher = real_time_fetcher
+        self.pool_maxsize = pool_maxsize
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        # Trips to cached or mock routes when the Directions API keeps failing
+        self.directions_breaker = CircuitBreaker(
+            'directions', failure_threshold=failure_threshold, recovery_timeout=recovery_timeout,
+            is_failure=is_directions_outage
+        )
+        self.directions_breaker.on_state_change(
+            lambda old_state, new_state: print(f"⚡ Directions API circuit {old_state} → {new_state}")
+        )
+        self._geolocator = None
+        self._geocoder = None
+        self._route_cache = None
+        self._session = None
+        self._journey_planner = None
+        self._realtime_feed = None
+        self._alert_feed = None
+        # Guards first-use creation; worker threads may race for it
+        self._lazy_lock = threading.RLock()
         
         # Google Maps API configuration
         self.google_maps_api_key = os.getenv('GOOGLE_MAPS_API_KEY')
         self.google_maps_base_url = 'https://maps.googleapis.com/maps/api/directions/json'
+        self.gtfs_feed_path = gtfs_feed_path or os.getenv('GTFS_FEED_PATH')
+        self.gtfs_realtime_paths = gtfs_realtime_paths or [
+            path for path in os.getenv('GTFS_REALTIME_PATH', '').split(os.pathsep) if path
+        ]
+        self.gtfs_alerts_paths = gtfs_alerts_paths or parse_alert_feed_paths(os.getenv('GTFS_ALERTS_PATH', ''))
+    
+    @property
+    def geolocator(self):
+        """Nominatim geocoder, created on first use"""
+        if self._geolocator is None:
+            with self._lazy_lock:
+                if self._geolocator is None:
+                    from geopy.geocoders import Nominatim
+                    self._geolocator = Nominatim(user_agent="TravelBuddy")
+        return self._geolocator
+    
+    @property
+    def geocoder(self):
+        """Cached, rate-limited geocoder in front of the Nominatim geocoder"""
+        if self._geocoder is None:
+            with self._lazy_lock:
+                if self._geocoder is None:
+                    from geocoding import create_geocoder
+                    self._geocoder = create_geocoder(lambda: self.geolocator)
+        return self._geocoder
+    
+    @property
+    def route_cache(self):
+        """Time-bucketed cache of parsed Directions routes"""
+        if self._route_cache is None:
+            with self._lazy_lock:
+                if self._route_cache is None:
+                    from route_cache import RouteCache
+                    self._route_cache = RouteCache()
+        return self._route_cache
+    
+    @property
+    def session(self):
+        """HTTP session for the Directions API with a sized keep-alive pool and retries, created on first use"""
+        if self._session is None:
+            with self._lazy_lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+                    from urllib3.util.retry import Retry
+                    
+                    retry = Retry(
+                        total=self.max_retries,
+                        backoff_factor=self.backoff_factor,
+                        status_forcelist=(500, 502, 503, 504),
+                        allowed_methods=frozenset({'GET'}),
+                        raise_on_status=False  # The last 5xx response is handled like any other
+                    )
+                    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_maxsize, max_retries=retry)
+                    session = requests.Session()
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    self._session = session
+        return self._session
+    
+    @property
+    def journey_planner(self):
+        """Offline GTFS journey planner, loaded on first use; None without a GTFS feed"""
+        if self._journey_planner is None and self.gtfs_feed_path:
+            with self._lazy_lock:
+                if self._journey_planner is None and self.gtfs_feed_path:
+                    from gtfs_timetable import GTFSTimetable, JourneyPlanner
+                    try:
+                        timetable = GTFSTimetable.load(self.gtfs_feed_path)
+                    except Exception as e:
+                        print(f"Error loading GTFS feed {self.gtfs_feed_path}: {e}")
+                        self.gtfs_feed_path = None  # Do not retry on every call
+                        return None
+                    self._journey_planner = JourneyPlanner(timetable, geocode=self.get_location_coordinates)
+        return self._journey_planner
+    
+    @property
+    def realtime_feed(self):
+        """GTFS-Realtime feed state, created on first use; None without real-time feeds"""
+        if self._realtime_feed is None and self.gtfs_realtime_paths:
+            with self._lazy_lock:
+                if self._realtime_feed is None and self.gtfs_realtime_paths:
+                    from gtfs_realtime import RealtimeFeed, RealtimeState
+                    planner = self.journey_planner
+                    if planner is not None:
+                        state = RealtimeState(planner.timetable.route_aliases(), planner.timetable.trip_route_id)
+                    else:
+                        state = RealtimeState()
+                    self._realtime_feed = RealtimeFeed(self.gtfs_realtime_paths, state)
+        return self._realtime_feed
+    
+    @property
+    def alert_feed(self):
+        """Service alert store fed by GTFS-Realtime Alerts files, created on first use; None without them"""
+        if self._alert_feed is None and self.gtfs_alerts_paths:
+            with self._lazy_lock:
+                if self._alert_feed is None and self.gtfs_alerts_paths:
+                    from gtfs_realtime import RealtimeFeed
+                    from service_alerts import AlertStore
+                    planner = self.journey_planner
+                    if planner is not None:
+                        store = AlertStore(planner.timetable.route_aliases(), planner.timetable.stop_name)
+                    else:
+                        store = AlertStore()
+                    self._alert_feed = RealtimeFeed(self.gtfs_alerts_paths, store)
+        return self._alert_feed
     
     def get_location_coordinates(self, location_name: str) -> Optional[Location]:
         """Get coordinates for a location name"""
         try:
-            location = self.geolocator.geocode(location_name)
-            if location:
-                return Location(
-                    name=location_name,
-                    latitude=location.latitude,
-                    longitude=location.longitude,
-                    address=location.address
-                )
+            return self.geocoder.geocode(location_name)
         except Exception as e:
             print(f"Error getting coordinates for {location_name}: {e}")
         return None
     
+    def get_locations_coordinates(self, location_names: List[str]) -> Dict[str, Optional[Location]]:
+        """Get coordinates for many location names, geocoding each distinct name at most once"""
+        try:
+            return self.geocoder.geocode_many(location_names)
+        except Exception as e:
+            # Names resolved before the failure are cached; retry the rest one by one
+            print(f"Error getting coordinates: {e}")
+            return {name: self.get_location_coordinates(name) for name in location_names}
+    
     def get_google_maps_routes(self, origin: str, destination: str, 
-                              transport_mode: str = "transit") -> List[TransportRoute]:
-        """Get routes using Google Maps Directions API"""
+                              transport_mode: str = "transit",
+                              departure_time: Optional[datetime] = None) -> List[TransportRoute]:
+        """Get routes using Google Maps Directions API, served from the route cache when possible"""
+        return self._directions_routes(origin, destination, transport_mode, departure_time)
+    
+    def _directions_routes(self, origin: str, destination: str, transport_mode: str = "transit",
+                           departure_time: Optional[datetime] = None, as_batch: bool = False):
+        """get_google_maps_routes, or its routes as a RouteBatch (cached rows are copied, not re-parsed)"""
         if not self.google_maps_api_key:
-            print("Warning: GOOGLE_MAPS_API_KEY not found. Using mock data.")
-            return self.get_mock_routes(origin, destination)
+            print("Warning: GOOGLE_MAPS_API_KEY not found. Using offline timetable or mock data.")
+            return self._offline_routes(origin, destination, transport_mode, departure_time, as_batch)
         
+        cache_key = self.route_cache.key(origin, destination, transport_mode, departure_time)
         try:
-            params = {
-                'origin': origin,
-                'destination': destination,
-                'mode': transport_mode,
-                'key': self.google_maps_api_key,
-                'alternatives': 'true',
-                'transit_mode': 'bus|subway|train|tram'
-            }
-            
-            response = self.session.get(
-                self.google_maps_base_url,
-                params=params
+            return self.route_cache.get_or_fetch(
+                cache_key,
+                lambda: self.directions_breaker.call(
+                    self._fetch_google_maps_routes, origin, destination, transport_mode, departure_time
+                ),
+                as_batch
             )
-            
-            if response.status_code == 200:
-                data = response.json()
-                routes = []
-                
-                if data.get('status') == 'OK':
-                    for route in data.get('routes', []):
-                        for leg in route.get('legs', []):
-                            for step in leg.get('steps', []):
-                                if step.get('travel_mode') == 'TRANSIT':
-                                    transit_details = step.get('transit_details', {})
-                                    line = transit_details.get('line', {})
-                                    
-                                    route_obj = TransportRoute(
-                                        route_id=line.get('short_name', 'Unknown'),
-                                        route_name=line.get('name', 'Unknown Route'),
-                                        transport_type=self._get_transport_type(line.get('vehicle', {}).get('type', '')),
-                                        destination=transit_details.get('headsign', 'Unknown'),
-                                        departure_time=transit_details.get('departure_time', {}).get('text', 'Unknown'),
-                                        arrival_time=transit_details.get('arrival_time', {}).get('text', 'Unknown'),
-                                        duration=step.get('duration', {}).get('text', 'Unknown'),
-                                        platform=transit_details.get('departure_stop', {}).get('name', 'Unknown')
-                                    )
-                                    routes.append(route_obj)
-                    
-                    return routes
-                else:
-                    print(f"Google Maps API error: {data.get('status')} - {data.get('error_message', 'Unknown error')}")
-                    return self.get_mock_routes(origin, destination)
-                
+        except CircuitOpenError:
+            pass  # The API has been failing; do not wait on it
+        except DirectionsAPIError as e:
+            print(f"Google Maps API error: {e}")
         except Exception as e:
             print(f"Error getting Google Maps routes: {e}")
-            return self.get_mock_routes(origin, destination)
         
-        return self.get_mock_routes(origin, destination)
+        return self._fallback_routes(cache_key, origin, destination, transport_mode, departure_time, as_batch)
+    
+    def _fallback_routes(self, cache_key, origin: str, destination: str, transport_mode: str = "transit",
+                         departure_time: Optional[datetime] = None, as_batch: bool = False):
+        """Last routes fetched for this trip however old, else offline timetable or mock routes"""
+        routes = self.route_cache.get_last_known(cache_key, as_batch)
+        if routes is not None:
+            return routes
+        return self._offline_routes(origin, destination, transport_mode, departure_time, as_batch)
+    
+    def get_timetable_routes(self, origin: str, destination: str,
+                             departure_time: Optional[datetime] = None) -> List[TransportRoute]:
+        """Transit routes planned on the GTFS timetable, without the network; empty without a feed"""
+        return [itinerary.to_route() for itinerary in self._timetable_itineraries(origin, destination, departure_time)]
+    
+    def _timetable_itineraries(self, origin: str, destination: str, departure_time: Optional[datetime] = None):
+        """Itineraries planned on the GTFS timetable; empty without a feed or when planning fails"""
+        planner = self.journey_planner
+        if planner is None:
+            return []
+        try:
+            return planner.plan(origin, destination, departure_time)
+        except Exception as e:
+            print(f"Error planning {origin} → {destination} on the GTFS timetable: {e}")
+            return []
+    
+    def _offline_routes(self, origin: str, destination: str, transport_mode: str = "transit",
+                        departure_time: Optional[datetime] = None, as_batch: bool = False):
+        """Routes when the Directions API cannot answer: the GTFS timetable for transit, else mock routes"""
+        from route_model import RouteBatch
+        if transport_mode == "transit":
+            itineraries = self._timetable_itineraries(origin, destination, departure_time)
+            if itineraries:
+                routes = [itinerary.to_route() for itinerary in itineraries]
+                if as_batch:
+                    return RouteBatch.from_routes(routes, transfers=[itinerary.transfers for itinerary in itineraries])
+                return routes
+        routes = self.get_mock_routes(origin, destination)
+        return RouteBatch.from_routes(routes) if as_batch else routes
+    
+    def _fetch_google_maps_routes(self, origin: str, destination: str, transport_mode: str = "transit",
+                                  departure_time: Optional[datetime] = None):
+        """Call the Directions API and return a RouteBatch; raises DirectionsAPIError for failed responses"""
+        response = self.session.get(
+            self.google_maps_base_url,
+            params=self._directions_params(origin, destination, transport_mode, departure_time),
+            timeout=(self.connect_timeout, self.read_timeout)
+        )
+        
+        if response.status_code != 200:
+            raise DirectionsAPIError(f"HTTP {response.status_code}", f"HTTP_{response.status_code}")
+        return self._batch_from_directions_data(response.json(), transport_mode)
+    
+    def _directions_params(self, origin: str, destination: str, transport_mode: str = "transit",
+                           departure_time: Optional[datetime] = None) -> Dict:
+        """Query parameters for a Directions API request"""
+        params = {
+            'origin': origin,
+            'destination': destination,
+            'mode': transport_mode,
+            'key': self.google_maps_api_key,
+            'alternatives': 'true'
+        }
+        if transport_mode == 'transit':
+            params['transit_mode'] = 'bus|subway|train|tram'
+        if departure_time:
+            params['departure_time'] = int(departure_time.timestamp())
+        return params
+    
+    def _batch_from_directions_data(self, data: Dict, transport_mode: str = "transit"):
+        """Check the status of a decoded Directions API response and parse its routes into a RouteBatch"""
+        if data.get('status') != 'OK':
+            raise DirectionsAPIError(f"{data.get('status')} - {data.get('error_message', 'Unknown error')}", data.get('status'))
+        return self._parse_directions_batch(data, transport_mode)
+    
+    def _parse_directions_routes(self, data: Dict, transport_mode: str = "transit") -> List[TransportRoute]:
+        """
+        Convert a Directions API response into routes.
+        
+        Transit responses give one route per transit step. Walking, bicycling
+        and driving responses have no transit steps, so each alternative
+        becomes one route of that mode.
+        """
+        return self._parse_directions_batch(data, transport_mode).to_routes()
+    
+    def _parse_directions_batch(self, data: Dict, transport_mode: str = "transit"):
+        """Parse a Directions API response once into a columnar route_model.RouteBatch"""
+        from route_model import RouteBatch
+        return RouteBatch.from_directions(data, transport_mode)
     
     def get_mock_routes(self, origin: str, destination: str) -> List[TransportRoute]:
         """Generate mock routes for demonstration when API is not available"""
@@ -171,18 +420,88 @@ class TransportAPI:
         ]
         return routes
     
-    def get_real_time_info(self, route_id: str, transport_type: str, city: str) -> Dict:
-    """Get real-time information for a specific route"""
-    # This would integrate with specific city transit APIs
-    # For now, return mock data
-    return self.get_mock_real_time_data(route_id, transport_type)
-
-def generate_google_maps_link(self, origin: str, destination: str) -> str:
-    """Generate a Google Maps directions link for the route"""
-    import urllib.parse
-    encoded_origin = urllib.parse.quote(origin)
-    encoded_destination = urllib.parse.quote(destination)
-    return f"https://www.google.com/maps/dir/{encoded_origin}/{encoded_destination}/data=!3m1!4b1!4m2!4m1!3e3"
+    def get_real_time_info(self, route_id: str, transport_type: str, city: Optional[str] = None) -> Dict:
+        """Get real-time information for a specific route"""
+        return self.get_real_time_info_batch([(route_id, transport_type)], city)[(route_id, transport_type)]
+    
+    def get_real_time_info_batch(self, route_keys: Iterable[Tuple[str, str]],
+                                 city: Optional[str] = None) -> Dict[Tuple[str, str], Dict]:
+        """
+        Get real-time information for many routes in one pass.
+        
+        Each distinct (route_id, transport_type) key is looked up once: all of
+        them in the GTFS-Realtime state after a single refresh, or through
+        real_time_fetcher concurrently, or as mock data.
+        
+        Args:
+            route_keys: (route_id, transport_type) pairs, duplicates allowed
+            city: City the routes are in
+        
+        Returns:
+            Real-time info per distinct key
+        """
+        keys = list(dict.fromkeys(route_keys))
+        feed = self.realtime_feed
+        if feed is not None:
+            feed.refresh()
+            return {key: self._real_time_info_from_state(feed.state, key[0]) for key in keys}
+        
+        if self.real_time_fetcher is None:
+            # No real-time source configured, return mock data
+            return {key: self.get_mock_real_time_data(*key) for key in keys}
+        
+        if len(keys) <= 1:
+            return {key: self._fetch_real_time_info(key, city) for key in keys}
+        # Remote lookups spend their time waiting, so run them side by side
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=min(len(keys), self.pool_maxsize),
+                                thread_name_prefix='real-time') as executor:
+            infos = executor.map(lambda key: self._fetch_real_time_info(key, city), keys)
+            return dict(zip(keys, infos))
+    
+    def _real_time_info_from_state(self, state, route_id: str) -> Dict:
+        """Real-time info for a route from the GTFS-Realtime state"""
+        info = state.route_info(route_id)
+        if info is None:
+            return self._scheduled_info(route_id)
+        return dict(info)
+    
+    def _fetch_real_time_info(self, key: Tuple[str, str], city: Optional[str]) -> Dict:
+        """Real-time info for a route from real_time_fetcher, or schedule-only info if it fails"""
+        route_id, transport_type = key
+        try:
+            return self._normalize_real_time_info(self.real_time_fetcher(route_id, transport_type, city), route_id)
+        except Exception as e:
+            print(f"Error getting real-time info for {transport_type} {route_id}: {e}")
+            return self._scheduled_info(route_id)
+    
+    def _normalize_real_time_info(self, info: Dict, route_id: str) -> Dict:
+        """City API payload with whole-minute delay_minutes and a Low/Medium/High crowding_level (or none)"""
+        if not isinstance(info, dict):
+            return self._scheduled_info(route_id)
+        info = dict(info)
+        info.setdefault('route_id', route_id)
+        try:
+            info['delay_minutes'] = int(round(float(info.get('delay_minutes') or 0)))
+        except (TypeError, ValueError, OverflowError):
+            info['delay_minutes'] = 0
+        crowding_level = str(info.get('crowding_level') or '').strip().capitalize()
+        if crowding_level in ('Low', 'Medium', 'High'):
+            info['crowding_level'] = crowding_level
+        else:
+            info.pop('crowding_level', None)
+        return info
+    
+    def _scheduled_info(self, route_id: str) -> Dict:
+        """Real-time info for a route no real-time source knows about"""
+        return {'route_id': route_id, 'status': 'Scheduled', 'delay_minutes': 0, 'real_time_available': False}
+    
+    def generate_google_maps_link(self, origin: str, destination: str) -> str:
+        """Generate a Google Maps directions link for the route"""
+        import urllib.parse
+        encoded_origin = urllib.parse.quote(origin)
+        encoded_destination = urllib.parse.quote(destination)
+        return f"https://www.google.com/maps/dir/{encoded_origin}/{encoded_destination}/data=!3m1!4b1!4m2!4m1!3e3"
     
     def get_mock_real_time_data(self, route_id: str, transport_type: str) -> Dict:
         """Generate mock real-time data for demonstration purposes"""
@@ -202,75 +521,77 @@ def generate_google_maps_link(self, origin: str, destination: str) -> str:
         }
     
     def find_best_routes(self, origin: str, destination: str, 
-                        preferences: Dict = None) -> List[TransportRoute]:
-        """Find the best transportation routes between two locations"""
+                        preferences: Dict = None, offline: bool = False,
+                        city: Optional[str] = None) -> List[TransportRoute]:
+        """Find the best transportation routes between two locations (offline: GTFS timetable only)"""
         
-        # Get routes from Google Maps API
-        routes = self.get_google_maps_routes(origin, destination)
+        # Get routes from Google Maps API, or plan them on the GTFS timetable, as columns:
+        # cached Directions results are ranked without parsing them again
+        if offline:
+            batch = self._offline_routes(origin, destination, as_batch=True)
+        else:
+            batch = self._directions_routes(origin, destination, as_batch=True)
         
-        # Add real-time information to routes
-        for route in routes:
-            route.real_time_info = self.get_real_time_info(
-                route.route_id, route.transport_type, "default"
-            )
+        # Real-time delays and crowding count in the ranking, so attach them first
+        from route_model import TransportType
+        labels = [TransportType(code).label for code in batch.transport_type]
+        batch.attach_real_time_info(self._real_time_infos(list(zip(batch.route_id, labels)), city))
         
-        # Sort routes based on preferences
+        # Pick the top 5 routes based on preferences; only those become TransportRoute objects
         if preferences:
-            routes = self._sort_routes_by_preferences(routes, preferences)
-        
-        return routes[:5]  # Return top 5 routes
+            from route_ranking import rank_batch
+            indices = rank_batch(batch, preferences, limit=5)
+        else:
+            indices = range(min(5, len(batch)))
+        routes = batch.to_routes(indices)
+        self._add_service_alerts(routes, city)
+        return routes
+    
+    def _add_real_time_info(self, routes: List[TransportRoute], city: Optional[str] = None) -> None:
+        """Set each route's real_time_info with one batched lookup"""
+        infos = self._real_time_infos([(route.route_id, route.transport_type) for route in routes], city)
+        for route, info in zip(routes, infos):
+            route.real_time_info = info
+    
+    def _real_time_infos(self, keys: List[Tuple[str, str]], city: Optional[str] = None) -> List[Dict]:
+        """Real-time info for each (route_id, transport_type), with one lookup per distinct route"""
+        infos = self.get_real_time_info_batch(keys, city)
+        # Routes sharing a line get their own copy of its info
+        return [dict(infos[key]) for key in keys]
+    
+    def _add_service_alerts(self, routes: List[TransportRoute], city: Optional[str] = None) -> None:
+        """Put the active alerts for each route's line into its real_time_info['alerts']"""
+        feed = self.alert_feed
+        if feed is None or not routes:
+            return
+        feed.refresh()
+        for route, alerts in zip(routes, feed.state.alerts_for_routes(routes, city)):
+            if alerts:
+                route.real_time_info = dict(route.real_time_info or {}, alerts=[alert.to_dict() for alert in alerts])
     
     def _sort_routes_by_preferences(self, routes: List[TransportRoute], 
-                                   preferences: Dict) -> List[TransportRoute]:
-        """Sort routes based on user preferences"""
-        def route_score(route):
-            score = 0
-            
-            # Prefer faster routes
-            if 'duration' in route.duration:
-                try:
-                    duration_minutes = int(route.duration.split()[0])
-                    score -= duration_minutes  # Lower duration = higher score
-                except:
-                    pass
-            
-            # Prefer certain transport types
-            transport_preferences = preferences.get('transport_types', [])
-            if route.transport_type in transport_preferences:
-                score += 10
-            
-            # Prefer cheaper routes
-            if route.cost and 'cost' in preferences:
-                try:
-                    cost = float(route.cost.replace('$', '').replace(',', ''))
-                    score -= cost * 0.1  # Lower cost = higher score
-                except:
-                    pass
-            
-            return score
-        
-        return sorted(routes, key=route_score, reverse=True)
+                                   preferences: Dict, limit: Optional[int] = None) -> List[TransportRoute]:
+        """Sort routes based on user preferences, keeping only the best `limit` when given"""
+        # Durations and costs are parsed once per route, not in the sort key;
+        # see route_ranking.RankingWeights for the scoring
+        from route_ranking import rank_routes
+        return rank_routes(routes, preferences, limit)
     
     def _get_transport_type(self, vehicle_type: str) -> str:
         """Convert vehicle type to standardized transport type"""
-        vehicle_type = vehicle_type.lower()
-        
-        if 'bus' in vehicle_type:
-            return 'bus'
-        elif 'train' in vehicle_type or 'rail' in vehicle_type:
-            return 'train'
-        elif 'subway' in vehicle_type or 'metro' in vehicle_type:
-            return 'subway'
-        elif 'tram' in vehicle_type or 'streetcar' in vehicle_type:
-            return 'tram'
-        else:
-            return 'unknown'
+        from route_model import TransportType
+        return TransportType.from_vehicle(vehicle_type).label
     
     def get_nearby_stops(self, latitude: float, longitude: float, 
-                        radius_km: float = 1.0) -> List[Dict]:
-        """Get nearby transportation stops"""
-        # This would integrate with Google Places API for real data
-        # For now, return mock data
+                        radius_km: float = 1.0, limit: Optional[int] = None) -> List[Dict]:
+        """Get transportation stops within radius_km, nearest first (at most `limit`)"""
+        planner = self.journey_planner
+        if planner is not None:
+            timetable = planner.timetable
+            stops = timetable.stop_index.within(latitude, longitude, radius_km)
+            return [self._stop_info(timetable, stop, distance) for stop, distance in stops[:limit]]
+        
+        # Without a GTFS feed there is no stop data; return mock data
         return [
             {
                 'name': 'Central Station',
@@ -286,10 +607,39 @@ def generate_google_maps_link(self, origin: str, destination: str) -> str:
             }
         ]
     
+    def get_nearest_stops(self, latitude: float, longitude: float, count: int = 5) -> List[Dict]:
+        """Get the `count` transportation stops nearest to a point, however far"""
+        planner = self.journey_planner
+        if planner is None:
+            return self.get_nearby_stops(latitude, longitude)[:count]
+        timetable = planner.timetable
+        stops = timetable.stop_index.nearest(latitude, longitude, count)
+        return [self._stop_info(timetable, stop, distance) for stop, distance in stops]
+    
+    def _stop_info(self, timetable, stop: int, distance_km: float) -> Dict:
+        """Nearby-stop dict for a GTFS stop"""
+        from gtfs_timetable import transport_type_for_route_type
+        return {
+            'name': timetable.stop_names[stop],
+            'stop_id': timetable.stop_ids[stop],
+            'distance': f"{distance_km:.1f} km",
+            'distance_km': distance_km,
+            'routes': [
+                f"{transport_type_for_route_type(timetable.route_type[route]).label.capitalize()} "
+                f"{timetable.route_label(route)}"
+                for route in timetable.routes_at(stop)
+            ],
+            'coordinates': [timetable.stop_lat[stop], timetable.stop_lon[stop]]
+        }
+    
     def get_service_alerts(self, city: str = None) -> List[Dict]:
-        """Get service alerts and disruptions"""
-        # This would integrate with transit agency APIs
-        # For now, return mock data
+        """Get the active service alerts for a city (all cities when None)"""
+        feed = self.alert_feed
+        if feed is not None:
+            feed.refresh()
+            return [alert.to_dict() for alert in feed.state.active(city)]
+        
+        # No alerts feed configured, return mock data
         return [
             {
                 'type': 'Delay',
@@ -307,5 +657,22 @@ def generate_google_maps_link(self, origin: str, destination: str) -> str:
             }
         ]
 
-# Global instance for easy access
-transport_api = TransportAPI() 
\ No newline at end of file
+# Global instance for easy access, created on first use
+_transport_api: Optional[TransportAPI] = None
+_transport_api_lock = threading.Lock()
+
+def get_transport_api() -> TransportAPI:
+    """Return the shared TransportAPI instance, creating it on first call."""
+    global _transport_api
+    if _transport_api is None:
+        with _transport_api_lock:
+            if _transport_api is None:
+                _transport_api = TransportAPI()
+    return _transport_api
+
+def __getattr__(name: str):
+    # Keeps `from transport_api import transport_api` working without
+    # building the instance at import time
+    if name == 'transport_api':
+        return get_transport_api()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}") 
\ No newline at end of file
@@ -1,36 +1,119 @@
 import type { NextRequest } from 'next/server';
 import { NextResponse } from 'next/server';
-import { spawn } from 'child_process';
+import { GoogleGenerativeAI } from '@google/generative-ai';
+import { spawn, type ChildProcessWithoutNullStreams } from 'child_process';
 import * as path from 'path';
+import * as readline from 'readline';
+
+// Resident Python prompt server (prompts.py --serve), shared across requests
+// so interpreter startup and the prompt template cache are paid for once.
+let promptServer: ChildProcessWithoutNullStreams | null = null;
+let nextRequestId = 0;
+
+// A request the prompt server has not answered by then is rejected, so the
+// caller falls back to OPTIMIZED_PROMPTS instead of hanging.
+const PROMPT_SERVER_TIMEOUT_MS = 5000;
+
+// The static per-type instruction is sent as the model's system instruction,
+// so Gemini can reuse it as a cached prefix; only the prompt varies per request.
+interface PromptParts {
+  systemInstruction?: string;
+  prompt: string;
+}
 
-// Optimized prompt generation using Python backend
-async function getOptimizedPrompt(complexText: string, promptType: string): Promise<string> {
-  return new Promise((resolve, reject) => {
-    const pythonProcess = spawn('python', [
-      path.join(process.cwd(), '..', '..', '..', '..', 'prompts.py'),
-      '--get-prompt',
-      '--type', promptType,
-      '--text', complexText
-    ]);
-
-    let output = '';
-    let error = '';
-
-    pythonProcess.stdout.on('data', (data) => {
-      output += data.toString();
-    });
+const pendingPrompts = new Map<number, { resolve: (parts: PromptParts) => void; reject: (error: Error) => void }>();
 
-    pythonProcess.stderr.on('data', (data) => {
-      error += data.toString();
-    });
+function failPendingPrompts(error: Error) {
+  for (const { reject } of pendingPrompts.values()) {
+    reject(error);
+  }
+  pendingPrompts.clear();
+}
+
+function getPromptServer(): ChildProcessWithoutNullStreams {
+  if (promptServer) {
+    return promptServer;
+  }
 
-    pythonProcess.on('close', (code) => {
-      if (code === 0) {
-        resolve(output.trim());
-      } else {
-        reject(new Error(`Python process failed: ${error}`));
+  const server = spawn('python', [
+    path.join(process.cwd(), '..', '..', '..', '..', 'prompts.py'),
+    '--serve'
+  ]);
+
+  readline.createInterface({ input: server.stdout }).on('line', (line) => {
+    let message: { id: number; systemInstruction?: string; prompt?: string; error?: string };
+    try {
+      message = JSON.parse(line);
+    } catch {
+      return;
+    }
+
+    const pending = pendingPrompts.get(message.id);
+    if (!pending) {
+      return;
+    }
+    pendingPrompts.delete(message.id);
+
+    if (message.prompt !== undefined) {
+      pending.resolve({ systemInstruction: message.systemInstruction, prompt: message.prompt.trim() });
+    } else {
+      pending.reject(new Error(`Prompt server error: ${message.error}`));
+    }
+  });
+
+  // Drain stderr so a chatty or failing server cannot block on a full pipe
+  readline.createInterface({ input: server.stderr }).on('line', (line) => {
+    console.error(`Prompt server: ${line}`);
+  });
+
+  const reset = (error: Error) => {
+    if (promptServer === server) {
+      promptServer = null;
+    }
+    failPendingPrompts(error);
+  };
+
+  server.on('error', reset);
+  // Writing to a server that has died emits EPIPE asynchronously, outside the caller's try/catch
+  server.stdin.on('error', reset);
+  server.on('exit', (code) => reset(new Error(`Prompt server exited with code ${code}`)));
+
+  promptServer = server;
+  return server;
+}
+
+// Optimized prompt generation using Python backend
+async function getOptimizedPrompt(complexText: string, promptType: string): Promise<PromptParts> {
+  return new Promise((resolve, reject) => {
+    const id = nextRequestId++;
+    const timeout = setTimeout(() => {
+      if (pendingPrompts.delete(id)) {
+        reject(new Error(`Prompt server timed out after ${PROMPT_SERVER_TIMEOUT_MS} ms`));
+      }
+    }, PROMPT_SERVER_TIMEOUT_MS);
+    pendingPrompts.set(id, {
+      resolve: (parts) => {
+        clearTimeout(timeout);
+        resolve(parts);
+      },
+      reject: (error) => {
+        clearTimeout(timeout);
+        reject(error);
       }
     });
+
+    try {
+      getPromptServer().stdin.write(JSON.stringify({
+        id,
+        op: 'get_prompt_parts',
+        type: promptType,
+        text: complexText
+      }) + '\n');
+    } catch (error) {
+      pendingPrompts.delete(id);
+      clearTimeout(timeout);
+      reject(error as Error);
+    }
   });
 }
 
@@ -120,7 +203,7 @@ Keep under 60 words.`
 
 export async function POST(request: NextRequest) {
   try {
-    const { userInput, promptType } = await request.json();
+    const { userInput, promptType, stream } = await request.json();
 
     if (!userInput || !promptType) {
       return NextResponse.json(
@@ -138,19 +221,64 @@ export async function POST(request: NextRequest) {
       );
     }
 
-    // Initialize Gemini
-    const genAI = new GoogleGenerativeAI(apiKey);
-    const model = genAI.getGenerativeModel({ model: "gemini-2.0-flash-exp" });
-
     // Get optimized prompt
-    let prompt: string;
+    let promptParts: PromptParts;
     try {
       // Try to use Python backend first
-      prompt = await getOptimizedPrompt(userInput, promptType);
+      promptParts = await getOptimizedPrompt(userInput, promptType);
     } catch (error) {
       // Fallback to TypeScript prompts
       const promptGenerator = OPTIMIZED_PROMPTS[promptType as keyof typeof OPTIMIZED_PROMPTS] || OPTIMIZED_PROMPTS.general;
-      prompt = promptGenerator(userInput);
+      promptParts = { prompt: promptGenerator(userInput) };
+    }
+    const { systemInstruction, prompt } = promptParts;
+
+    // Initialize Gemini
+    const genAI = new GoogleGenerativeAI(apiKey);
+    const model = genAI.getGenerativeModel({
+      model: "gemini-2.0-flash-exp",
+      ...(systemInstruction ? { systemInstruction } : {})
+    });
+
+    // Stream the response as NDJSON: one {"type":"chunk"} line per piece of
+    // text as it arrives, then a final {"type":"stats"} line
+    if (stream) {
+      const result = await model.generateContentStream(prompt);
+      const encoder = new TextEncoder();
+      const originalLength = userInput.length;
+
+      const body = new ReadableStream({
+        async start(controller) {
+          const send = (event: object) => controller.enqueue(encoder.encode(JSON.stringify(event) + '\n'));
+          let simplifiedLength = 0;
+
+          try {
+            for await (const chunk of result.stream) {
+              const text = chunk.text();
+              if (!text) continue;
+              simplifiedLength += text.length;
+              send({ type: 'chunk', text });
+            }
+
+            const reduction = originalLength > 0
+              ? Math.round(((originalLength - simplifiedLength) / originalLength) * 100)
+              : 0;
+            send({ type: 'stats', originalLength, simplifiedLength, reduction: `${reduction}%` });
+          } catch (error) {
+            console.error('Error streaming simplify response:', error);
+            send({ type: 'error', error: "Failed to simplify text. Please try again." });
+          } finally {
+            controller.close();
+          }
+        }
+      });
+
+      return new Response(body, {
+        headers: {
+          'Content-Type': 'application/x-ndjson; charset=utf-8',
+          'Cache-Control': 'no-cache'
+        }
+      });
     }
 
     // Generate response
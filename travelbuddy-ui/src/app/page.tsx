@@ -196,35 +196,66 @@ export default function Home() {
           setChatHistory(prev => [...prev, assistantMessage]);
         }
       } else {
-        // Handle regular text simplification
+        // Handle regular text simplification, streaming the answer in as it is generated
         const res = await fetch("/api/simplify", {
           method: "POST",
           headers: { "Content-Type": "application/json" },
           body: JSON.stringify({ 
             userInput: input,
-            promptType: "general"
+            promptType: "auto",
+            stream: true
           }),
         });
 
-        const data = await res.json();
-
-        if (!res.ok) {
+        if (!res.ok || !res.body) {
+          const data = await res.json();
           throw new Error(data.error || "Failed to simplify text");
         }
 
-        const assistantMessage: ChatMessage = {
-          id: (Date.now() + 1).toString(),
+        const assistantId = (Date.now() + 1).toString();
+        setChatHistory(prev => [...prev, {
+          id: assistantId,
           type: 'assistant',
-          content: data.result,
-          timestamp: new Date(),
-          stats: {
-            originalLength: data.originalLength,
-            simplifiedLength: data.simplifiedLength,
-            reduction: data.reduction
-          }
+          content: '',
+          timestamp: new Date()
+        }]);
+
+        const updateAssistant = (update: (message: ChatMessage) => ChatMessage) => {
+          setChatHistory(prev => prev.map(message => message.id === assistantId ? update(message) : message));
         };
 
-        setChatHistory(prev => [...prev, assistantMessage]);
+        const reader = res.body.getReader();
+        const decoder = new TextDecoder();
+        let buffered = '';
+
+        while (true) {
+          const { done, value } = await reader.read();
+          if (done) break;
+
+          buffered += decoder.decode(value, { stream: true });
+          const lines = buffered.split('\n');
+          buffered = lines.pop() ?? '';
+
+          for (const line of lines) {
+            if (!line.trim()) continue;
+            const event = JSON.parse(line);
+
+            if (event.type === 'chunk') {
+              updateAssistant(message => ({ ...message, content: message.content + event.text }));
+            } else if (event.type === 'stats') {
+              updateAssistant(message => ({
+                ...message,
+                stats: {
+                  originalLength: event.originalLength,
+                  simplifiedLength: event.simplifiedLength,
+                  reduction: event.reduction
+                }
+              }));
+            } else if (event.type === 'error') {
+              throw new Error(event.error);
+            }
+          }
+        }
       }
 
     } catch (err: any) {
@@ -0,0 +1,169 @@
+# validator.py
+# Deterministic local checks for simplified text, replacing the LLM validation call
+
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, FrozenSet, List
+
+from prompts import PROMPT_CONFIGS
+
+_PRICE = re.compile(r'(?P<symbol>[$€£¥₹])\s?(?P<amount>\d[\d,]*(?:\.\d{1,2})?)'
+                    r'|(?P<value>\d[\d,]*(?:\.\d{1,2})?)\s?(?P<code>USD|EUR|GBP|JPY|INR|euros?|dollars?|yen|rupees?)\b')
+# Symbols and written currencies of _PRICE mapped to one code, so "$2.50" and "2.50 USD" compare equal
+_CURRENCIES = {
+    '$': 'USD', 'dollar': 'USD', 'dollars': 'USD',
+    '€': 'EUR', 'euro': 'EUR', 'euros': 'EUR',
+    '£': 'GBP',
+    '¥': 'JPY', 'yen': 'JPY',
+    '₹': 'INR', 'rupee': 'INR', 'rupees': 'INR'
+}
+_PHONE = re.compile(r'(?<![\w$€£¥₹.])\+?\d[\d ().-]{5,}\d(?!\w)')
+_YEAR_RANGE = re.compile(r'^\d{4}\s?[-–]\s?\d{4}$')
+_EMERGENCY = re.compile(r'\b(?:dial|call|phone|ring|number)\s+(\d{2,4})\b', re.I)
+_TIME = re.compile(r'\b(\d{1,2}):(\d{2})\b')
+_WORD = re.compile(r'[^\W_]+(?:[\'’.,-][^\W_]+)*')
+_BULLET = re.compile(r'^\s*(?:[•*-]|\d+[.)])\s+', re.M)
+_VARIATION_SELECTOR = '️'
+
+@dataclass
+class ValidationIssue:
+    """A single failed check"""
+    check: str
+    message: str
+
+@dataclass
+class ValidationReport:
+    """Result of validating a simplified text against its original"""
+    content_type: str
+    word_count: int
+    word_limit: int
+    issues: List[ValidationIssue] = field(default_factory=list)
+    
+    @property
+    def passed(self) -> bool:
+        return not self.issues
+    
+    def messages(self) -> List[str]:
+        return [issue.message for issue in self.issues]
+    
+    def __str__(self) -> str:
+        if self.passed:
+            return f"✅ Passed ({self.word_count}/{self.word_limit} words)"
+        return "❌ " + "\n❌ ".join(self.messages())
+
+def count_words(text: str) -> int:
+    """Count words, ignoring emoji, bullets and format punctuation."""
+    return len(_WORD.findall(text))
+
+def _normalize_price(match: re.Match) -> str:
+    """A price as "<amount> <currency code>" with two decimals, e.g. "$2.5" → "2.50 USD"."""
+    amount = (match['amount'] or match['value']).replace(',', '')
+    currency = match['symbol'] or match['code']
+    return f"{float(amount):.2f} {_CURRENCIES.get(currency, currency)}"
+
+def _digits(text: str) -> str:
+    return re.sub(r'\D', '', text)
+
+@lru_cache(maxsize=256)
+def extract_entities(text: str) -> Dict[str, FrozenSet[str]]:
+    """
+    Pull out the facts a simplification must not garble, normalized for comparison.
+    
+    Results are cached, so re-validating against the same original (for
+    example after an improvement round) skips the scan of the long text.
+    
+    Returns:
+        Dict with "prices", "phone_numbers", "emergency_numbers" and "times"
+    """
+    phone_numbers = set()
+    for match in _PHONE.findall(text):
+        digits = _digits(match)
+        # Year and time ranges look like phone numbers; real ones have 7+ digits
+        if len(digits) >= 7 and not _TIME.search(match) and not _YEAR_RANGE.match(match):
+            phone_numbers.add(digits)
+    
+    return {
+        'prices': frozenset(_normalize_price(price) for price in _PRICE.finditer(text)),
+        'phone_numbers': frozenset(phone_numbers),
+        'emergency_numbers': frozenset(_EMERGENCY.findall(text)),
+        'times': frozenset(f"{int(hour)}:{minute}" for hour, minute in _TIME.findall(text))
+    }
+
+@lru_cache(maxsize=None)
+def _format_markers(content_type: str) -> tuple:
+    """Header marker (leading emoji) and bullet count of a content type's format template."""
+    template = PROMPT_CONFIGS.get(content_type, PROMPT_CONFIGS["general"])["format_template"]
+    first_line = template.strip().splitlines()[0]
+    header = first_line.split(' ', 1)[0].replace(_VARIATION_SELECTOR, '')
+    return header, len(_BULLET.findall(template.replace('•', '- ')))
+
+def validate_simplification(original_text: str, simplified_text: str,
+                            content_type: str = "general") -> ValidationReport:
+    """
+    Check a simplified text locally, without a model call.
+    
+    Checks that it fits the content type's word limit, follows its format
+    template (header marker and bullets), keeps at least one of each kind
+    of key fact from the original (prices, phone numbers, emergency
+    numbers, times), and does not introduce numbers the original lacks.
+    
+    Args:
+        original_text: Text that was simplified
+        simplified_text: Model output
+        content_type: PROMPT_CONFIGS key used for the simplification
+    
+    Returns:
+        ValidationReport listing any failed checks
+    """
+    config = PROMPT_CONFIGS.get(content_type, PROMPT_CONFIGS["general"])
+    report = ValidationReport(
+        content_type=content_type,
+        word_count=count_words(simplified_text),
+        word_limit=config["word_limit"]
+    )
+    
+    if report.word_count > report.word_limit:
+        report.issues.append(ValidationIssue(
+            'word_limit', f"Too long: {report.word_count} words (limit {report.word_limit})"
+        ))
+    
+    header, template_bullets = _format_markers(content_type)
+    if header not in simplified_text.replace(_VARIATION_SELECTOR, ''):
+        report.issues.append(ValidationIssue('format', f"Missing the {header} header from the format"))
+    bullets = len(_BULLET.findall(simplified_text.replace('•', '- ')))
+    if bullets < min(2, template_bullets):
+        report.issues.append(ValidationIssue('format', f"Only {bullets} bullet points; the format uses {template_bullets}"))
+    
+    original_entities = extract_entities(original_text)
+    simplified_entities = extract_entities(simplified_text)
+    simplified_tokens = set(re.findall(r'\d+', simplified_text))
+    labels = {
+        'prices': 'price',
+        'phone_numbers': 'phone number',
+        'emergency_numbers': 'emergency number',
+        'times': 'time'
+    }
+    
+    for kind, label in labels.items():
+        original = original_entities[kind]
+        if not original:
+            continue
+        
+        if kind == 'emergency_numbers':
+            # Simplified text often drops the verb ("🚨 911"), so match the bare number
+            kept = original & simplified_tokens
+        else:
+            kept = original & simplified_entities[kind]
+        if not kept:
+            report.issues.append(ValidationIssue(
+                'entities', f"Lost every {label} from the original (e.g. {sorted(original)[0]})"
+            ))
+        
+        invented = simplified_entities[kind] - original
+        if kind != 'emergency_numbers' and invented:
+            report.issues.append(ValidationIssue(
+                'entities', f"Introduced a {label} not in the original: {sorted(invented)[0]}"
+            ))
+    
+    return report